@@ -0,0 +1,198 @@
+"""
+Catalog of all <pruefid>.csv files of an AHB root directory, collected in a single pass.
+"""
+
+import os
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from pathlib import Path
+from types import MappingProxyType
+
+from efoli import EdifactFormatVersion
+
+_FORMATVERSION_DIR_NAME_LENGTH = 6  # e.g. "FV2504"
+_CSV_SUFFIX = ".csv"
+
+
+@dataclass(frozen=True)
+class AhbFile:
+    """
+    A <pruefid>.csv file with the size and mtime it had when it was catalogued.
+    """
+
+    path: Path
+    size: int
+    mtime_ns: int
+
+
+# <pruefid> -> <pruefid>.csv file
+PruefidFiles = Mapping[str, AhbFile]
+# <nachrichtenformat> -> <pruefid> -> <pruefid>.csv file
+NachrichtenformatFiles = Mapping[str, PruefidFiles]
+
+_NO_FILES: NachrichtenformatFiles = MappingProxyType({})
+
+
+def _is_formatversion_dir(dir_entry: os.DirEntry[str]) -> bool:
+    """
+    Confirm if a directory entry is a <formatversion> directory - for instance "FV2504/".
+    """
+    return (
+        dir_entry.name.startswith("FV") and len(dir_entry.name) == _FORMATVERSION_DIR_NAME_LENGTH and dir_entry.is_dir()
+    )
+
+
+def _scan_csv_dir(csv_dir: str) -> PruefidFiles | None:
+    """
+    Collect all <pruefid>.csv files of a csv directory; returns None if there is no such directory.
+    """
+    pruefid_files = {}
+    try:
+        with os.scandir(csv_dir) as dir_entries:
+            for dir_entry in dir_entries:
+                if dir_entry.name.endswith(_CSV_SUFFIX) and dir_entry.is_file():
+                    file_stat = dir_entry.stat()
+                    pruefid_files[dir_entry.name[: -len(_CSV_SUFFIX)]] = AhbFile(
+                        path=Path(dir_entry.path), size=file_stat.st_size, mtime_ns=file_stat.st_mtime_ns
+                    )
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return MappingProxyType(dict(sorted(pruefid_files.items())))
+
+
+def scan_formatversion_dir(formatversion_dir: Path) -> NachrichtenformatFiles:
+    """
+    Collect the <pruefid>.csv files of all <nachrichtenformat> directories of a <formatversion> directory
+    that contain a csv directory.
+    """
+    nachrichtenformat_files = {}
+    with os.scandir(formatversion_dir) as dir_entries:
+        for dir_entry in dir_entries:
+            if dir_entry.is_dir():
+                pruefid_files = _scan_csv_dir(os.path.join(dir_entry.path, "csv"))
+                if pruefid_files is not None:
+                    nachrichtenformat_files[dir_entry.name] = pruefid_files
+    return MappingProxyType(dict(sorted(nachrichtenformat_files.items())))
+
+
+def _matches_any(name: str, patterns: Iterable[str]) -> bool:
+    return any(fnmatchcase(name, pattern) for pattern in patterns)
+
+
+@dataclass(frozen=True)
+class AhbCatalogFilter:
+    """
+    Glob patterns (e.g. "FV25*" or "5500?") to select formatversions, nachrichtenformate and PIDs.
+    An empty tuple of patterns selects everything.
+    """
+
+    formatversions: tuple[str, ...] = ()
+    nachrichtenformate: tuple[str, ...] = ()
+    pruefids: tuple[str, ...] = ()
+
+    def matches_formatversion(self, formatversion: str) -> bool:
+        """
+        Check if a formatversion matches any of the formatversion patterns.
+        """
+        return not self.formatversions or _matches_any(formatversion, self.formatversions)
+
+    def matches_nachrichtenformat(self, nachrichtenformat: str) -> bool:
+        """
+        Check if a nachrichtenformat matches any of the nachrichtenformat patterns.
+        """
+        return not self.nachrichtenformate or _matches_any(nachrichtenformat, self.nachrichtenformate)
+
+    def matches_pruefid(self, pruefid: str) -> bool:
+        """
+        Check if a PID matches any of the PID patterns.
+        """
+        return not self.pruefids or _matches_any(pruefid, self.pruefids)
+
+
+@dataclass(frozen=True)
+class AhbCatalog:
+    """
+    Immutable mapping of <formatversion> -> <nachrichtenformat> -> <pruefid> -> <pruefid>.csv file
+    of an AHB root directory. Created by a single `os.scandir` walk (see `scan`), so that discovering pairs of
+    formatversions and matching PIDs does not touch the file system again.
+    """
+
+    root_dir: Path
+    formatversions: Mapping[str, NachrichtenformatFiles]
+
+    @classmethod
+    def scan(cls, root_dir: Path) -> "AhbCatalog":
+        """
+        Walks the <formatversion>/<nachrichtenformat>/csv/<pruefid>.csv files of a root directory.
+        """
+        formatversion_files = {}
+        try:
+            with os.scandir(root_dir) as dir_entries:
+                formatversion_dirs = [dir_entry for dir_entry in dir_entries if _is_formatversion_dir(dir_entry)]
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"❌ Submodule / base directory does not exist: {root_dir}") from e
+
+        for formatversion_dir in formatversion_dirs:
+            formatversion_files[formatversion_dir.name] = scan_formatversion_dir(Path(formatversion_dir.path))
+        return cls(root_dir=root_dir, formatversions=MappingProxyType(dict(sorted(formatversion_files.items()))))
+
+    def get_formatversions(self) -> list[EdifactFormatVersion]:
+        """
+        Returns all <formatversion> directories, sorted from latest to oldest.
+        """
+        return sorted([EdifactFormatVersion(fv) for fv in self.formatversions], reverse=True)
+
+    def get_nachrichtenformate(self, formatversion: str) -> NachrichtenformatFiles:
+        """
+        Returns the <nachrichtenformat> directories (that contain a csv directory) of a formatversion.
+        """
+        return self.formatversions.get(formatversion, _NO_FILES)
+
+    def is_formatversion_empty(self, formatversion: str) -> bool:
+        """
+        Check if a formatversion does not contain any <nachrichtenformat> directories (or does not exist at all).
+        """
+        return len(self.get_nachrichtenformate(formatversion)) == 0
+
+    def get_matching_files(
+        self,
+        previous_formatversion: str,
+        subsequent_formatversion: str,
+        catalog_filter: AhbCatalogFilter | None = None,
+    ) -> list[tuple[AhbFile, AhbFile, str, str]]:
+        """
+        Returns the <pruefid>.csv files that exist in the same <nachrichtenformat> of both formatversions,
+        sorted by nachrichtenformat and PID. A `catalog_filter` limits the nachrichtenformate and PIDs.
+        """
+        catalog_filter = catalog_filter or AhbCatalogFilter()
+        previous_nachrichtenformate = self.get_nachrichtenformate(previous_formatversion)
+        subsequent_nachrichtenformate = self.get_nachrichtenformate(subsequent_formatversion)
+
+        matching_files = []
+        for nachrichtentyp in sorted(previous_nachrichtenformate.keys() & subsequent_nachrichtenformate.keys()):
+            if not catalog_filter.matches_nachrichtenformat(nachrichtentyp):
+                continue
+            previous_files = previous_nachrichtenformate[nachrichtentyp]
+            subsequent_files = subsequent_nachrichtenformate[nachrichtentyp]
+            for pruefid in sorted(previous_files.keys() & subsequent_files.keys()):
+                if not catalog_filter.matches_pruefid(pruefid):
+                    continue
+                matching_files.append((previous_files[pruefid], subsequent_files[pruefid], nachrichtentyp, pruefid))
+        return matching_files
+
+    def find_pruefid(self, formatversion: str, pruefid: str) -> tuple[AhbFile, str] | None:
+        """
+        Find the <pruefid>.csv file of a PID and its nachrichtenformat within a formatversion.
+        """
+        for nachrichtentyp, pruefid_files in self.get_nachrichtenformate(formatversion).items():
+            ahb_file = pruefid_files.get(pruefid)
+            if ahb_file is not None:
+                return ahb_file, nachrichtentyp
+        return None
+
+    def get_pruefids(self, formatversion: str) -> list[str]:
+        """
+        Returns all PIDs of a formatversion across all of its nachrichtenformat directories, sorted and unique.
+        """
+        return sorted({pruefid for files in self.get_nachrichtenformate(formatversion).values() for pruefid in files})
@@ -2,160 +2,594 @@
 AHB csv comparison logic.
 """
 
+import logging
+import os
+from bisect import bisect_left
+from collections import defaultdict, deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import groupby, islice
+from typing import TypeVar
+
+from ahlbatross.enums.alignment_algorithms import AlignmentAlgorithm
 from ahlbatross.enums.diff_types import DiffType
-from ahlbatross.models.ahb import AhbRow, AhbRowComparison, AhbRowDiff
-from ahlbatross.utils.string_formatting import normalize_entries
-from ahlbatross.utils.xlsx_formatting import AHB_PROPERTIES
+from ahlbatross.models.ahb import AhbAlignment, AhbRowComparison, AnyAhbRow, _create_ahb_row_comparison
+from ahlbatross.models.ahb_row_data import AhbRowKey
+from ahlbatross.utils.sequence_matching import get_myers_matches, get_patience_matches
+from ahlbatross.utils.xlsx_formatting import AHB_COLUMN_NAMES, AHB_PROPERTIES
+
+logger = logging.getLogger(__name__)
+
+# beyond this number of inserted/removed rows, the Myers alignment falls back to the greedy alignment
+_MYERS_MAX_EDIT_DISTANCE = 5000
+
+# smaller AHBs are aligned block by block within the current process since spawning workers would take longer
+_PARALLEL_BLOCK_ALIGNMENT_MIN_ROWS = 5000
+
+# number of subsequent rows the streaming alignment looks ahead to find a matching row
+_STREAMING_WINDOW_SIZE = 1000
 
+# positions of all compared AHB properties within `AhbRow.normalized_entries`
+_AHB_PROPERTY_COLUMNS = [(AHB_COLUMN_NAMES.index(entry), entry) for entry in AHB_PROPERTIES]
 
-def _compare_ahb_rows(previous_ahb_row: AhbRow, subsequent_ahb_row: AhbRow) -> AhbRowDiff:
+AlignmentKey = tuple[str, AhbRowKey, str | None]
+KeyT = TypeVar("KeyT")
+
+# index pair of aligned rows, -1 marks an empty side (ADDED/REMOVED rows)
+RowPair = tuple[int, int]
+
+
+def _get_changed_columns(previous_ahb_row: AnyAhbRow, subsequent_ahb_row: AnyAhbRow) -> int:
     """
-    Compare two AhbRow objects to identify changes.
+    Compare two AhbRow objects and return a bitmask of changed columns (bit i <=> `AHB_COLUMN_NAMES[i]`).
     """
-    changed_entries = []
+    if previous_ahb_row.fingerprint == subsequent_ahb_row.fingerprint:
+        return 0
+
+    changed_columns = 0
 
     # consider all AHB properties except `section_name` (Segmentname) and `formatversion`
-    for entry in AHB_PROPERTIES:
-        previous_ahb_entry = normalize_entries(getattr(previous_ahb_row, entry, "") or "")
-        subsequent_ahb_entry = normalize_entries(getattr(subsequent_ahb_row, entry, "") or "")
+    for column_idx, _ in _AHB_PROPERTY_COLUMNS:
+        if previous_ahb_row.normalized_entries[column_idx] != subsequent_ahb_row.normalized_entries[column_idx]:
+            changed_columns |= 1 << column_idx
 
-        if (previous_ahb_entry or subsequent_ahb_entry) and previous_ahb_entry != subsequent_ahb_entry:
-            changed_entries.extend(
-                [f"{entry}_{previous_ahb_row.formatversion}", f"{entry}_{subsequent_ahb_row.formatversion}"]
-            )
+    return changed_columns
 
-    return AhbRowDiff(
-        diff_type=DiffType.MODIFIED if changed_entries else DiffType.UNCHANGED, changed_entries=changed_entries
-    )
+
+def _get_alignment_key(ahb_row: AnyAhbRow) -> AlignmentKey:
+    """
+    Fingerprint of a row that identifies corresponding rows of two formatversions:
+    normalized `section_name` (Segmentname), business key and `segment_id`.
+    """
+    return ahb_row.normalized_entries[0], ahb_row.get_key(), ahb_row.segment_id
 
 
-def _add_empty_row(formatversion: str) -> AhbRow:
+@dataclass(frozen=True)
+class _SubsequentRowIndex:
     """
-    Create an empty row.
+    Lookup tables of the rows of the subsequent formatversion, built once per alignment
+    (or updated while the look-ahead window of `iter_align_ahb_rows` moves on).
+    Each table maps a matching criterion to the ascending positions of all rows that fulfill it.
     """
-    return AhbRow(
-        formatversion=formatversion,
-        section_name="",
-        segment_group_key=None,
-        segment_code=None,
-        data_element=None,
-        segment_id=None,
-        value_pool_entry=None,
-        name=None,
-        ahb_expression=None,
-        conditions=None,
+
+    positions_by_key: dict[AlignmentKey, list[int]] = field(default_factory=lambda: defaultdict(list))
+    positions_by_section_name: dict[str, list[int]] = field(default_factory=lambda: defaultdict(list))
+    positions_by_section_name_without_expression: dict[str, list[int]] = field(
+        default_factory=lambda: defaultdict(list)
     )
 
+    def add(self, position: int, row: AnyAhbRow, alignment_key: AlignmentKey) -> None:
+        """
+        Add a row at a position after all rows added so far.
+        """
+        normalized_section_name = alignment_key[0]
+        self.positions_by_key[alignment_key].append(position)
+        self.positions_by_section_name[normalized_section_name].append(position)
+        if row.ahb_expression is None:
+            self.positions_by_section_name_without_expression[normalized_section_name].append(position)
 
-def _find_matching_subsequent_row(
-    current_ahb_row: AhbRow, subsequent_ahb_rows: list[AhbRow], start_idx: int, duplicate_indices: set[int]
-) -> tuple[int, AhbRow | None]:
+    def remove_first(self, position: int, row: AnyAhbRow, alignment_key: AlignmentKey) -> None:
+        """
+        Remove the row at the lowest remaining position, so that the tables only contain the rows of the window.
+        """
+        normalized_section_name = alignment_key[0]
+        _remove_first_position(self.positions_by_key, alignment_key, position)
+        _remove_first_position(self.positions_by_section_name, normalized_section_name, position)
+        if row.ahb_expression is None:
+            _remove_first_position(self.positions_by_section_name_without_expression, normalized_section_name, position)
+
+
+def _remove_first_position(positions_by_criterion: dict[KeyT, list[int]], criterion: KeyT, position: int) -> None:
+    positions = positions_by_criterion[criterion]
+    if positions[0] != position:
+        raise ValueError(f"❌ Row at position {position} is not the first indexed row.")
+    del positions[0]
+    if not positions:
+        del positions_by_criterion[criterion]
+
+
+def _build_subsequent_row_index(subsequent_ahb_rows: Sequence[AnyAhbRow]) -> _SubsequentRowIndex:
     """
-    Find matching row in subsequent version starting from given index by consider all AHB properties
-    within the same `section_name` group.
+    Index subsequent rows by (normalized `section_name`, business key, `segment_id`) and by normalized
+    `section_name` alone.
     """
-    normalized_current = normalize_entries(current_ahb_row.section_name)
-    current_key = current_ahb_row.get_key()
+    subsequent_row_index = _SubsequentRowIndex()
+    for idx, row in enumerate(subsequent_ahb_rows):
+        subsequent_row_index.add(idx, row, _get_alignment_key(row))
+    return subsequent_row_index
 
-    for idx, row in enumerate(subsequent_ahb_rows[start_idx:], start_idx):
-        if idx in duplicate_indices:
-            continue
 
-        if (
-            normalize_entries(row.section_name) == normalized_current
-            and row.get_key() == current_key
-            and row.segment_id == current_ahb_row.segment_id
-        ):
-            return idx, row
+def _next_unused_position(positions: list[int], start_idx: int, duplicate_indices: set[int]) -> int:
+    """
+    Return the first position at or after `start_idx` that has not been matched yet (or -1 if there is none).
+    """
+    for idx in islice(positions, bisect_left(positions, start_idx), None):
+        if idx not in duplicate_indices:
+            return idx
+    return -1
 
-    # in case no match was found, continue by aligning `Segmentname` entries
-    for idx, row in enumerate(subsequent_ahb_rows[start_idx:], start_idx):
-        if idx in duplicate_indices:
-            continue
 
-        if normalize_entries(row.section_name) == normalized_current:
-            if row.ahb_expression is not None and current_ahb_row.ahb_expression is None:
-                continue
-            return idx, row
+def _find_matching_subsequent_row(
+    current_ahb_row: AnyAhbRow, subsequent_row_index: _SubsequentRowIndex, start_idx: int, duplicate_indices: set[int]
+) -> int:
+    """
+    Find the position of the matching row in subsequent version starting from given index by consider all AHB
+    properties within the same `section_name` group (or -1 if there is none).
+    """
+    current_key = _get_alignment_key(current_ahb_row)
+    normalized_current = current_key[0]
+
+    idx = _next_unused_position(
+        subsequent_row_index.positions_by_key.get(current_key, []), start_idx, duplicate_indices
+    )
 
-    return -1, None
+    # in case no match was found, continue by aligning `Segmentname` entries
+    if idx < 0:
+        # rows with an `ahb_expression` must not be aligned with a current row without one
+        section_name_positions = (
+            subsequent_row_index.positions_by_section_name_without_expression
+            if current_ahb_row.ahb_expression is None
+            else subsequent_row_index.positions_by_section_name
+        )
+        idx = _next_unused_position(section_name_positions.get(normalized_current, []), start_idx, duplicate_indices)
 
+    return idx
 
-def align_ahb_rows(previous_ahb_rows: list[AhbRow], subsequent_ahb_rows: list[AhbRow]) -> list[AhbRowComparison]:
+
+def _align_ahb_rows_greedy(
+    previous_ahb_rows: Sequence[AnyAhbRow], subsequent_ahb_rows: Sequence[AnyAhbRow]
+) -> list[RowPair]:
     """
-    Align AHB rows while comparing two formatversions.
+    Align AHB rows by matching every previous row with the next fitting row of the subsequent formatversion.
     """
-    result = []
+    result: list[RowPair] = []
     i = 0
     j = 0
     duplicate_indices: set[int] = set()
+    subsequent_row_index = _build_subsequent_row_index(subsequent_ahb_rows)
 
     while i < len(previous_ahb_rows) or j < len(subsequent_ahb_rows):
         if i >= len(previous_ahb_rows):
             # add remaining rows as "new" if not already used
             if j not in duplicate_indices:
-                result.append(
-                    AhbRowComparison(
-                        previous_formatversion=_add_empty_row(subsequent_ahb_rows[j].formatversion),
-                        diff=AhbRowDiff(diff_type=DiffType.ADDED),
-                        subsequent_formatversion=subsequent_ahb_rows[j],
-                    )
-                )
+                result.append((-1, j))
             j += 1
             continue
 
         if j >= len(subsequent_ahb_rows):
-            result.append(
-                AhbRowComparison(
-                    previous_formatversion=previous_ahb_rows[i],
-                    # label remaining rows of previous AHB as REMOVED
-                    diff=AhbRowDiff(diff_type=DiffType.REMOVED),
-                    subsequent_formatversion=_add_empty_row(previous_ahb_rows[i].formatversion),
-                )
-            )
+            # label remaining rows of previous AHB as REMOVED
+            result.append((i, -1))
             i += 1
             continue
 
         current_row = previous_ahb_rows[i]
-        next_match_idx, matching_row = _find_matching_subsequent_row(
-            current_row, subsequent_ahb_rows, j, duplicate_indices
-        )
+        next_match_idx = _find_matching_subsequent_row(current_row, subsequent_row_index, j, duplicate_indices)
 
-        if next_match_idx >= 0 and matching_row is not None:
+        if next_match_idx >= 0:
             # add new rows until `section_name` (Segmentname) matches
             while j < next_match_idx:
                 if j not in duplicate_indices:
-                    result.append(
-                        AhbRowComparison(
-                            previous_formatversion=_add_empty_row(subsequent_ahb_rows[j].formatversion),
-                            diff=AhbRowDiff(diff_type=DiffType.ADDED),
-                            subsequent_formatversion=subsequent_ahb_rows[j],
-                        )
-                    )
+                    result.append((-1, j))
                 j += 1
 
             # add matching rows with comparison
-            diff = _compare_ahb_rows(current_row, matching_row)
-            result.append(
-                AhbRowComparison(
-                    previous_formatversion=current_row,
-                    diff=diff,
-                    subsequent_formatversion=matching_row,
-                )
-            )
+            result.append((i, next_match_idx))
             duplicate_indices.add(next_match_idx)
             i += 1
             j = next_match_idx + 1
 
         else:
             # if no match found - label as REMOVED
-            result.append(
-                AhbRowComparison(
-                    previous_formatversion=current_row,
-                    diff=AhbRowDiff(diff_type=DiffType.REMOVED),
-                    subsequent_formatversion=_add_empty_row(current_row.formatversion),
-                )
-            )
+            result.append((i, -1))
             i += 1
 
     return result
+
+
+def _pair_matches(previous_length: int, subsequent_length: int, matches: list[tuple[int, int]]) -> list[RowPair]:
+    """
+    Complete ascending index pairs of matching rows with all unmatched rows.
+    Unmatched rows in between two matches are labeled as REMOVED (previous AHB) followed by ADDED (subsequent AHB).
+    """
+    result: list[RowPair] = []
+    i = 0
+    j = 0
+
+    for previous_idx, subsequent_idx in [*matches, (previous_length, subsequent_length)]:
+        result.extend((removed_idx, -1) for removed_idx in range(i, previous_idx))
+        result.extend((-1, added_idx) for added_idx in range(j, subsequent_idx))
+        if previous_idx < previous_length and subsequent_idx < subsequent_length:
+            result.append((previous_idx, subsequent_idx))
+        i = previous_idx + 1
+        j = subsequent_idx + 1
+
+    return result
+
+
+def _shift_row_pairs(row_pairs: list[RowPair], previous_offset: int, subsequent_offset: int) -> list[RowPair]:
+    """
+    Translate index pairs of aligned slices back to indices of the complete AHBs.
+    """
+    return [
+        (
+            previous_idx + previous_offset if previous_idx >= 0 else -1,
+            subsequent_idx + subsequent_offset if subsequent_idx >= 0 else -1,
+        )
+        for previous_idx, subsequent_idx in row_pairs
+    ]
+
+
+def _align_ahb_rows_myers(
+    previous_ahb_rows: Sequence[AnyAhbRow], subsequent_ahb_rows: Sequence[AnyAhbRow]
+) -> list[RowPair]:
+    """
+    Align AHB rows along a shortest edit script between the row fingerprints of both formatversions.
+    Falls back to the greedy alignment if both AHBs differ by too many rows.
+    """
+    matches = get_myers_matches(
+        [_get_alignment_key(row) for row in previous_ahb_rows],
+        [_get_alignment_key(row) for row in subsequent_ahb_rows],
+        max_edit_distance=_MYERS_MAX_EDIT_DISTANCE,
+    )
+    if matches is None:
+        logger.debug("Edit distance exceeds %s rows, falling back to greedy alignment", _MYERS_MAX_EDIT_DISTANCE)
+        return _align_ahb_rows_greedy(previous_ahb_rows, subsequent_ahb_rows)
+
+    return _pair_matches(len(previous_ahb_rows), len(subsequent_ahb_rows), matches)
+
+
+def _align_ahb_rows_patience(
+    previous_ahb_rows: Sequence[AnyAhbRow], subsequent_ahb_rows: Sequence[AnyAhbRow]
+) -> list[RowPair]:
+    """
+    Align AHB rows on anchors, i.e. rows whose fingerprint is unique within both formatversions.
+    Only the (usually short) gaps between two consecutive anchors are aligned by the greedy alignment.
+    """
+    anchors = get_patience_matches(
+        [_get_alignment_key(row) for row in previous_ahb_rows],
+        [_get_alignment_key(row) for row in subsequent_ahb_rows],
+    )
+
+    result: list[RowPair] = []
+    i = 0
+    j = 0
+    for previous_idx, subsequent_idx in [*anchors, (len(previous_ahb_rows), len(subsequent_ahb_rows))]:
+        gap = _align_ahb_rows_greedy(previous_ahb_rows[i:previous_idx], subsequent_ahb_rows[j:subsequent_idx])
+        result.extend(_shift_row_pairs(gap, i, j))
+        if previous_idx < len(previous_ahb_rows) and subsequent_idx < len(subsequent_ahb_rows):
+            result.append((previous_idx, subsequent_idx))
+        i = previous_idx + 1
+        j = subsequent_idx + 1
+
+    return result
+
+
+def _get_section_name_blocks(ahb_rows: Sequence[AnyAhbRow]) -> list[tuple[str, int, int]]:
+    """
+    Split AHB rows into contiguous blocks of the same normalized `section_name` (Segmentname).
+    Returns the normalized `section_name`, start and end index (exclusive) of each block.
+    """
+    blocks: list[tuple[str, int, int]] = []
+    start_idx = 0
+    for section_name, block_rows in groupby(ahb_rows, key=lambda row: row.normalized_entries[0]):
+        end_idx = start_idx + sum(1 for _ in block_rows)
+        blocks.append((section_name, start_idx, end_idx))
+        start_idx = end_idx
+    return blocks
+
+
+def _align_ahb_rows_blockwise(
+    previous_ahb_rows: Sequence[AnyAhbRow], subsequent_ahb_rows: Sequence[AnyAhbRow], max_workers: int | None = None
+) -> list[RowPair]:
+    """
+    Align the `section_name` (Segmentname) blocks of both formatversions first, then align the rows of each pair of
+    matching blocks (and of the unmatched blocks in between) independently of each other.
+    Large AHBs are aligned in a pool of worker processes.
+    """
+    previous_blocks = _get_section_name_blocks(previous_ahb_rows)
+    subsequent_blocks = _get_section_name_blocks(subsequent_ahb_rows)
+    block_matches = get_myers_matches(
+        [section_name for section_name, _, _ in previous_blocks],
+        [section_name for section_name, _, _ in subsequent_blocks],
+    )
+    # empty sentinel blocks behind the last rows collect all unmatched blocks at the end of both AHBs
+    previous_blocks.append(("", len(previous_ahb_rows), len(previous_ahb_rows)))
+    subsequent_blocks.append(("", len(subsequent_ahb_rows), len(subsequent_ahb_rows)))
+
+    # start indices of all independent parts within both AHBs
+    offsets: list[tuple[int, int]] = []
+    previous_slices: list[Sequence[AnyAhbRow]] = []
+    subsequent_slices: list[Sequence[AnyAhbRow]] = []
+    i = 0
+    j = 0
+    for previous_block_idx, subsequent_block_idx in [
+        *(block_matches or []),
+        (len(previous_blocks) - 1, len(subsequent_blocks) - 1),
+    ]:
+        _, previous_start, previous_end = previous_blocks[previous_block_idx]
+        _, subsequent_start, subsequent_end = subsequent_blocks[subsequent_block_idx]
+        # unmatched blocks in between two matching blocks
+        if i < previous_start or j < subsequent_start:
+            offsets.append((i, j))
+            previous_slices.append(previous_ahb_rows[i:previous_start])
+            subsequent_slices.append(subsequent_ahb_rows[j:subsequent_start])
+        if previous_start < previous_end or subsequent_start < subsequent_end:
+            offsets.append((previous_start, subsequent_start))
+            previous_slices.append(previous_ahb_rows[previous_start:previous_end])
+            subsequent_slices.append(subsequent_ahb_rows[subsequent_start:subsequent_end])
+        i = previous_end
+        j = subsequent_end
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if (
+        max_workers > 1
+        and len(previous_slices) > 1
+        and len(previous_ahb_rows) + len(subsequent_ahb_rows) >= _PARALLEL_BLOCK_ALIGNMENT_MIN_ROWS
+    ):
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            aligned_blocks = list(executor.map(_align_ahb_rows_greedy, previous_slices, subsequent_slices))
+    else:
+        aligned_blocks = [
+            _align_ahb_rows_greedy(previous_slice, subsequent_slice)
+            for previous_slice, subsequent_slice in zip(previous_slices, subsequent_slices, strict=True)
+        ]
+
+    return [
+        row_pair
+        for (previous_offset, subsequent_offset), aligned_block in zip(offsets, aligned_blocks, strict=True)
+        for row_pair in _shift_row_pairs(aligned_block, previous_offset, subsequent_offset)
+    ]
+
+
+def have_identical_content(previous_ahb_rows: Sequence[AnyAhbRow], subsequent_ahb_rows: Sequence[AnyAhbRow]) -> bool:
+    """
+    Check if both AHBs consist of the same rows in the same order, ignoring whitespaces.
+    """
+    return len(previous_ahb_rows) == len(subsequent_ahb_rows) and all(
+        previous_row.fingerprint == subsequent_row.fingerprint
+        for previous_row, subsequent_row in zip(previous_ahb_rows, subsequent_ahb_rows, strict=True)
+    )
+
+
+def align_identical_ahb_rows(
+    previous_ahb_rows: Sequence[AnyAhbRow], subsequent_ahb_rows: Sequence[AnyAhbRow]
+) -> list[AhbRowComparison]:
+    """
+    Pair the rows of two AHBs with identical content (see `have_identical_content`) without aligning them.
+    """
+    alignment = AhbAlignment(previous_ahb_rows, subsequent_ahb_rows)
+    for idx in range(len(previous_ahb_rows)):
+        alignment.append(idx, idx, DiffType.UNCHANGED)
+    return list(alignment)
+
+
+def _count_common_rows(
+    previous_ahb_rows: Sequence[AnyAhbRow], subsequent_ahb_rows: Sequence[AnyAhbRow]
+) -> tuple[int, int]:
+    """
+    Count the rows with identical content at the start (prefix) and at the end (suffix) of both AHBs.
+    """
+    max_common_rows = min(len(previous_ahb_rows), len(subsequent_ahb_rows))
+
+    prefix_length = 0
+    while (
+        prefix_length < max_common_rows
+        and previous_ahb_rows[prefix_length].fingerprint == subsequent_ahb_rows[prefix_length].fingerprint
+    ):
+        prefix_length += 1
+
+    suffix_length = 0
+    while (
+        suffix_length < max_common_rows - prefix_length
+        and previous_ahb_rows[-1 - suffix_length].fingerprint == subsequent_ahb_rows[-1 - suffix_length].fingerprint
+    ):
+        suffix_length += 1
+
+    return prefix_length, suffix_length
+
+
+def _detect_moved_rows(alignment: AhbAlignment) -> AhbAlignment:
+    """
+    Merge REMOVED and ADDED rows with identical content (i.e. rows that were relocated) into MOVED rows.
+    Both rows are paired in a single pass over the alignment via a hash map of their fingerprints;
+    each MOVED row takes the position of the ADDED row within the subsequent formatversion.
+    """
+    unpaired_positions: dict[tuple[DiffType, int], deque[int]] = defaultdict(deque)
+    moved_previous_indices: dict[int, int] = {}
+    paired_removed_positions: set[int] = set()
+
+    for position in range(len(alignment)):
+        diff_type = alignment.get_diff_type(position)
+        if diff_type == DiffType.REMOVED:
+            counterpart_type = DiffType.ADDED
+            fingerprint = alignment.previous_ahb_rows[alignment.previous_indices[position]].fingerprint
+        elif diff_type == DiffType.ADDED:
+            counterpart_type = DiffType.REMOVED
+            fingerprint = alignment.subsequent_ahb_rows[alignment.subsequent_indices[position]].fingerprint
+        else:
+            continue
+
+        counterpart_positions = unpaired_positions.get((counterpart_type, fingerprint))
+        if not counterpart_positions:
+            unpaired_positions[(diff_type, fingerprint)].append(position)
+            continue
+
+        counterpart_position = counterpart_positions.popleft()
+        added_position, removed_position = (
+            (position, counterpart_position) if diff_type == DiffType.ADDED else (counterpart_position, position)
+        )
+        moved_previous_indices[added_position] = alignment.previous_indices[removed_position]
+        paired_removed_positions.add(removed_position)
+
+    if not moved_previous_indices:
+        return alignment
+
+    result = AhbAlignment(alignment.previous_ahb_rows, alignment.subsequent_ahb_rows)
+    for position in range(len(alignment)):
+        if position in paired_removed_positions:
+            continue
+        if position in moved_previous_indices:
+            result.append(moved_previous_indices[position], alignment.subsequent_indices[position], DiffType.MOVED)
+            continue
+        result.append(
+            alignment.previous_indices[position],
+            alignment.subsequent_indices[position],
+            alignment.get_diff_type(position),
+            alignment.changed_columns[position],
+        )
+
+    return result
+
+
+def align_ahb_rows_compact(
+    previous_ahb_rows: Sequence[AnyAhbRow],
+    subsequent_ahb_rows: Sequence[AnyAhbRow],
+    algorithm: AlignmentAlgorithm = AlignmentAlgorithm.GREEDY,
+    max_workers: int | None = None,
+    detect_moved_rows: bool = False,
+) -> AhbAlignment:
+    """
+    Align AHB rows while comparing two formatversions using the given alignment algorithm.
+    Identical rows at the start and at the end of both AHBs are labeled as UNCHANGED beforehand,
+    so only the rows in between have to be aligned.
+    `max_workers` limits the number of worker processes of algorithms that align independent parts in parallel.
+    If `detect_moved_rows` is set, relocated rows are labeled as MOVED instead of REMOVED and ADDED.
+    """
+    prefix_length, suffix_length = _count_common_rows(previous_ahb_rows, subsequent_ahb_rows)
+    previous_end = len(previous_ahb_rows) - suffix_length
+    subsequent_end = len(subsequent_ahb_rows) - suffix_length
+    previous_window = previous_ahb_rows[prefix_length:previous_end]
+    subsequent_window = subsequent_ahb_rows[prefix_length:subsequent_end]
+
+    if algorithm == AlignmentAlgorithm.MYERS:
+        aligned_window = _align_ahb_rows_myers(previous_window, subsequent_window)
+    elif algorithm == AlignmentAlgorithm.PATIENCE:
+        aligned_window = _align_ahb_rows_patience(previous_window, subsequent_window)
+    elif algorithm == AlignmentAlgorithm.BLOCKWISE:
+        aligned_window = _align_ahb_rows_blockwise(previous_window, subsequent_window, max_workers)
+    else:
+        aligned_window = _align_ahb_rows_greedy(previous_window, subsequent_window)
+
+    alignment = AhbAlignment(previous_ahb_rows, subsequent_ahb_rows)
+    for idx in range(prefix_length):
+        alignment.append(idx, idx, DiffType.UNCHANGED)
+
+    for previous_idx, subsequent_idx in _shift_row_pairs(aligned_window, prefix_length, prefix_length):
+        if previous_idx < 0:
+            alignment.append(previous_idx, subsequent_idx, DiffType.ADDED)
+        elif subsequent_idx < 0:
+            alignment.append(previous_idx, subsequent_idx, DiffType.REMOVED)
+        else:
+            changed_columns = _get_changed_columns(previous_ahb_rows[previous_idx], subsequent_ahb_rows[subsequent_idx])
+            alignment.append(
+                previous_idx,
+                subsequent_idx,
+                DiffType.MODIFIED if changed_columns else DiffType.UNCHANGED,
+                changed_columns,
+            )
+
+    for offset in range(suffix_length):
+        alignment.append(previous_end + offset, subsequent_end + offset, DiffType.UNCHANGED)
+
+    if detect_moved_rows:
+        return _detect_moved_rows(alignment)
+    return alignment
+
+
+def align_ahb_rows(
+    previous_ahb_rows: Sequence[AnyAhbRow],
+    subsequent_ahb_rows: Sequence[AnyAhbRow],
+    algorithm: AlignmentAlgorithm = AlignmentAlgorithm.GREEDY,
+    max_workers: int | None = None,
+    detect_moved_rows: bool = False,
+) -> list[AhbRowComparison]:
+    """
+    Align AHB rows while comparing two formatversions using the given alignment algorithm
+    (see `align_ahb_rows_compact` for a memory-efficient representation of the result).
+    """
+    return list(
+        align_ahb_rows_compact(previous_ahb_rows, subsequent_ahb_rows, algorithm, max_workers, detect_moved_rows)
+    )
+
+
+def iter_align_ahb_rows(
+    previous_ahb_rows: Iterable[AnyAhbRow],
+    subsequent_ahb_rows: Iterable[AnyAhbRow],
+    window_size: int = _STREAMING_WINDOW_SIZE,
+) -> Iterator[AhbRowComparison]:
+    """
+    Align AHB rows of two formatversions like the greedy alignment, but consume both row iterables lazily and
+    yield the comparisons one by one. Matching rows are only searched within a look-ahead window of the next
+    `window_size` subsequent rows, so memory usage does not grow with the length of the AHBs.
+    The result equals the greedy `align_ahb_rows` as long as every match lies within the window.
+    This is part of the library API only: `process_ahb_files` does not stream, because it needs the configured
+    alignment algorithm, the compaction of unchanged blocks and the moved row detection, and it exports the CSV and
+    XLSX files from the same list of comparisons.
+    """
+    if window_size < 1:
+        raise ValueError(f"❌ Invalid look-ahead window size: {window_size}")
+
+    subsequent_iterator = iter(subsequent_ahb_rows)
+    # the window holds the subsequent rows at the positions `window_start` to `window_start + len(window) - 1`
+    window: deque[tuple[AnyAhbRow, AlignmentKey]] = deque()
+    window_index = _SubsequentRowIndex()
+    window_start = 0
+    # all rows before `window_start` have been consumed, rows within the window have not been matched yet
+    no_duplicate_indices: set[int] = set()
+
+    def pop_window_row() -> AnyAhbRow:
+        nonlocal window_start
+        subsequent_row, alignment_key = window.popleft()
+        window_index.remove_first(window_start, subsequent_row, alignment_key)
+        window_start += 1
+        return subsequent_row
+
+    for previous_row in previous_ahb_rows:
+        for subsequent_row in islice(subsequent_iterator, window_size - len(window)):
+            alignment_key = _get_alignment_key(subsequent_row)
+            window_index.add(window_start + len(window), subsequent_row, alignment_key)
+            window.append((subsequent_row, alignment_key))
+        match_idx = _find_matching_subsequent_row(previous_row, window_index, window_start, no_duplicate_indices)
+
+        if match_idx < 0:
+            yield _create_ahb_row_comparison(previous_row, None, DiffType.REMOVED)
+            continue
+
+        # add new rows until `section_name` (Segmentname) matches
+        while window_start < match_idx:
+            yield _create_ahb_row_comparison(None, pop_window_row(), DiffType.ADDED)
+
+        subsequent_row = pop_window_row()
+        changed_columns = _get_changed_columns(previous_row, subsequent_row)
+        yield _create_ahb_row_comparison(
+            previous_row,
+            subsequent_row,
+            DiffType.MODIFIED if changed_columns else DiffType.UNCHANGED,
+            changed_columns,
+        )
+
+    for subsequent_row, _ in window:
+        yield _create_ahb_row_comparison(None, subsequent_row, DiffType.ADDED)
+    for subsequent_row in subsequent_iterator:
+        yield _create_ahb_row_comparison(None, subsequent_row, DiffType.ADDED)
@@ -0,0 +1,123 @@
+"""
+Manifest of the output tree of `process_ahb_files` to compare only changed PIDs on later runs.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from dataclasses import asdict, dataclass
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE_NAME = "manifest.json"
+# increase whenever the layout of the manifest changes
+_MANIFEST_FORMAT_VERSION = 1
+# <subsequent formatversion>_<previous formatversion>/<nachrichtenformat>/<pruefid>.<csv|xlsx>
+_OUTPUT_FILE_PATTERNS = ["FV*_FV*/*/*.csv", "FV*_FV*/*/*.xlsx"]
+
+
+def get_tool_version() -> str:
+    """
+    Returns the installed version of ahlbatross.
+    """
+    try:
+        return version("ahlbatross")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    """
+    Inputs and settings the outputs of one PID comparison were created with.
+    The content hashes of the inputs are only known for incremental runs and comparisons that did not fail.
+    """
+
+    previous_hash: str | None
+    subsequent_hash: str | None
+    settings: str  # tool version, alignment algorithm and all options that affect the outputs
+    outputs: tuple[str, ...] = ()  # paths relative to the output directory
+
+
+class AhbManifest:
+    """
+    Maps every PID comparison (`<subsequent formatversion>_<previous formatversion>/<nachrichtenformat>/<pruefid>`)
+    to the content hashes of its input csv files, the settings and the output files it was created with.
+    """
+
+    def __init__(self, entries: dict[str, ManifestEntry] | None = None) -> None:
+        self.entries: dict[str, ManifestEntry] = entries or {}
+
+    @classmethod
+    def load(cls, output_dir: Path) -> "AhbManifest":
+        """
+        Loads the manifest of an output directory; missing or invalid manifests yield an empty manifest.
+        """
+        manifest_path = output_dir / MANIFEST_FILE_NAME
+        if not manifest_path.exists():
+            return cls()
+        try:
+            content = json.loads(manifest_path.read_text(encoding="utf-8"))
+            if content["version"] != _MANIFEST_FORMAT_VERSION:
+                return cls()
+            return cls(
+                {
+                    key: ManifestEntry(
+                        previous_hash=entry["previous_hash"],
+                        subsequent_hash=entry["subsequent_hash"],
+                        settings=entry["settings"],
+                        outputs=tuple(entry["outputs"]),
+                    )
+                    for key, entry in content["entries"].items()
+                }
+            )
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("❗️ Ignoring invalid manifest %s: %s", manifest_path, str(e))
+            return cls()
+
+    def save(self, output_dir: Path) -> None:
+        """
+        Writes the manifest into the output directory.
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        content = {
+            "version": _MANIFEST_FORMAT_VERSION,
+            "entries": {key: asdict(entry) for key, entry in sorted(self.entries.items())},
+        }
+        # write to a temporary file first, so that an aborted run never leaves a partially written manifest behind
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=output_dir, suffix=".tmp", delete=False
+        ) as manifest_file:
+            json.dump(content, manifest_file, indent=2, ensure_ascii=False)
+        os.replace(manifest_file.name, output_dir / MANIFEST_FILE_NAME)
+
+    def is_up_to_date(self, key: str, entry: ManifestEntry, output_dir: Path) -> bool:
+        """
+        Checks if the outputs of a PID comparison were created from the same inputs with the same settings
+        and still exist.
+        """
+        manifest_entry = self.entries.get(key)
+        return (
+            manifest_entry is not None
+            and entry.previous_hash is not None
+            and entry.subsequent_hash is not None
+            and manifest_entry.previous_hash == entry.previous_hash
+            and manifest_entry.subsequent_hash == entry.subsequent_hash
+            and manifest_entry.settings == entry.settings
+            and all((output_dir / output).exists() for output in manifest_entry.outputs)
+        )
+
+    def get_orphans(self, output_dir: Path) -> list[Path]:
+        """
+        Returns all output files that do not belong to any PID comparison of the manifest.
+        """
+        outputs = {output for entry in self.entries.values() for output in entry.outputs}
+        return sorted(
+            output_path
+            for pattern in _OUTPUT_FILE_PATTERNS
+            for output_path in output_dir.glob(pattern)
+            if output_path.relative_to(output_dir).as_posix() not in outputs
+        )
@@ -12,39 +12,43 @@ import typer
 from rich.console import Console
 from rich.prompt import Prompt
 
+from ahlbatross.core.ahb_catalog import AhbCatalog
 from ahlbatross.core.ahb_comparison import align_ahb_rows
-from ahlbatross.core.ahb_processing import _get_formatversion_dirs, _get_nachrichtenformat_dirs
-from ahlbatross.formats.csv import get_csv_files, load_csv_files
+from ahlbatross.core.ahb_processing import _get_formatversion_dirs
+from ahlbatross.enums.alignment_algorithms import AlignmentAlgorithm
+from ahlbatross.formats.csv import load_csv_files
 from ahlbatross.formats.xlsx import export_to_xlsx_multicompare
+from ahlbatross.utils.string_pool import StringPool
 
 logger = logging.getLogger(__name__)
 console = Console()
 
-_FORMATVERSION_PID_CACHE: dict[str, dict[str, tuple[Path, str]]] = {}
+_CATALOG_CACHE: dict[Path, AhbCatalog] = {}
+
+
+def _get_catalog(root_dir: Path) -> AhbCatalog:
+    """
+    Scan a root directory once and reuse its catalog for all further prompts.
+    """
+    catalog = _CATALOG_CACHE.get(root_dir)
+    if catalog is None:
+        catalog = _CATALOG_CACHE[root_dir] = AhbCatalog.scan(root_dir)
+    return catalog
 
 
 def find_pid(root_dir: Path, formatversion: str, pruefid: str) -> tuple[Path, str] | None:
     """
     Find a PID file across all nachrichtenformat directories in a given FV.
     """
-    # Store the locations of all PIDs after the initial scan/prompt of a FV directory
-    if formatversion not in _FORMATVERSION_PID_CACHE:
-        formatversion_dir = root_dir / formatversion
-        if not formatversion_dir.exists():
-            return None
-
-        nachrichtenformat_dirs = _get_nachrichtenformat_dirs(formatversion_dir)
-        _FORMATVERSION_PID_CACHE[formatversion] = {}
-
-        for nf_dir in nachrichtenformat_dirs:
-            csv_dir = nf_dir / "csv"
-            if not csv_dir.exists():
-                continue
-
-            for file in get_csv_files(csv_dir):
-                _FORMATVERSION_PID_CACHE[formatversion][file.stem] = (file, nf_dir.name)
+    try:
+        match = _get_catalog(root_dir).find_pruefid(formatversion, pruefid)
+    except FileNotFoundError:
+        return None
+    if match is None:
+        return None
 
-    return _FORMATVERSION_PID_CACHE[formatversion].get(pruefid)
+    ahb_file, nachrichtentyp = match
+    return ahb_file.path, nachrichtentyp
 
 
 def get_pids(root_dir: Path, formatversion: str) -> list[str]:
@@ -52,10 +56,10 @@ def get_pids(root_dir: Path, formatversion: str) -> list[str]:
     Get all available PIDs across all nachrichtenformat directories for a given FV.
     The result is sorted and contains every PID once at max.
     """
-    if formatversion not in _FORMATVERSION_PID_CACHE:
-        find_pid(root_dir, formatversion, "")
-
-    return sorted(list(_FORMATVERSION_PID_CACHE.get(formatversion, {}).keys()))
+    try:
+        return _get_catalog(root_dir).get_pruefids(formatversion)
+    except FileNotFoundError:
+        return []
 
 
 # pylint:disable=too-many-locals, too-many-branches, too-many-statements
@@ -64,6 +68,7 @@ def multicompare_command(
     output_dir: Path = typer.Option(
         ..., "--output-dir", "-o", help="Destination path to output directory containing merged xlsx files."
     ),
+    algorithm: AlignmentAlgorithm = AlignmentAlgorithm.GREEDY,
 ) -> None:
     """
     Interactive command to compare two PIDs across different FVs.
@@ -73,7 +78,7 @@ def multicompare_command(
             logger.error("❌ Input directory does not exist: %s", input_dir.absolute())
             sys.exit(1)
 
-        formatversions = _get_formatversion_dirs(input_dir)
+        formatversions = _get_formatversion_dirs(input_dir, _get_catalog(input_dir))
         if not formatversions:
             logger.error("❌ No format versions found in input directory")
             sys.exit(1)
@@ -114,6 +119,7 @@ def multicompare_command(
 
         comparison_groups = []
         comparison_names = []
+        string_pool = StringPool()
 
         comparison_number = 2
         while True:
@@ -156,8 +162,8 @@ def multicompare_command(
             next_file_path, _ = next_file
 
             try:
-                first_rows, next_rows = load_csv_files(first_file_path, next_file_path, first_fv, next_fv)
-                comparisons = align_ahb_rows(first_rows, next_rows)
+                first_rows, next_rows = load_csv_files(first_file_path, next_file_path, first_fv, next_fv, string_pool)
+                comparisons = align_ahb_rows(first_rows, next_rows, algorithm)
 
                 comparison_groups.append(comparisons)
                 comparison_names.append(f"{first_pruefid}_{next_pruefid}")
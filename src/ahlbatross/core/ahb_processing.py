@@ -2,31 +2,50 @@
 AHB file handling as well as data fetching and parsing logic.
 """
 
+import filecmp
 import logging
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from itertools import groupby
 from pathlib import Path
 
 from efoli import EdifactFormatVersion
 
-from ahlbatross.core.ahb_comparison import align_ahb_rows
-from ahlbatross.formats.csv import export_to_csv, get_csv_files, load_csv_files
+from ahlbatross.core.ahb_catalog import AhbCatalog, AhbCatalogFilter, scan_formatversion_dir
+from ahlbatross.core.ahb_comparison import align_ahb_rows, align_identical_ahb_rows, have_identical_content
+from ahlbatross.core.ahb_manifest import AhbManifest, ManifestEntry, get_tool_version
+from ahlbatross.core.ahb_rows_cache import AhbRowsCache, AhbRowsKey
+from ahlbatross.enums.alignment_algorithms import AlignmentAlgorithm
+from ahlbatross.formats.csv import (
+    close_mapped_file,
+    export_to_csv,
+    read_csv_content,
+    read_csv_mapped,
+    read_csv_rows,
+    share_mapped_records,
+)
+from ahlbatross.formats.csv_cache import CsvParseCache, _get_content_hash
 from ahlbatross.formats.xlsx import export_to_xlsx
+from ahlbatross.models.ahb import AhbRowComparison, AnyAhbRow
+from ahlbatross.utils.pipeline import Pipeline, PipelineStage
+from ahlbatross.utils.prefetching import Prefetcher
+from ahlbatross.utils.string_pool import StringPool
 
 logger = logging.getLogger(__name__)
 
-_FORMATVERSION_DIR_NAME_LENGTH = 6  # e.g. "FV2504"
+_PACKAGE_LOGGER_NAME = "ahlbatross"
 
 
-def _is_formatversion_dir(path: Path) -> bool:
-    """
-    Confirm if path is a <formatversion> directory - for instance "FV2504/".
-    """
-    return path.is_dir() and path.name.startswith("FV") and len(path.name) == _FORMATVERSION_DIR_NAME_LENGTH
-
-
-def _is_formatversion_dir_empty(root_dir: Path, formatversion: EdifactFormatVersion) -> bool:
+def _is_formatversion_dir_empty(
+    root_dir: Path, formatversion: EdifactFormatVersion, catalog: AhbCatalog | None = None
+) -> bool:
     """
     Check if a <formatversion> directory does not contain any <nachrichtenformat> directories.
     """
+    if catalog is not None:
+        return catalog.is_formatversion_empty(formatversion)
+
     formatversion_dir = root_dir / str(formatversion)
     if not formatversion_dir.exists():
         return True
@@ -34,15 +53,13 @@ def _is_formatversion_dir_empty(root_dir: Path, formatversion: EdifactFormatVers
     return len(_get_nachrichtenformat_dirs(formatversion_dir)) == 0
 
 
-def _get_formatversion_dirs(root_dir: Path) -> list[EdifactFormatVersion]:
+def _get_formatversion_dirs(root_dir: Path, catalog: AhbCatalog | None = None) -> list[EdifactFormatVersion]:
     """
     Fetch all available <formatversion> directories, sorted from latest to oldest.
     """
-    if not root_dir.exists():
-        raise FileNotFoundError(f"❌ Submodule / base directory does not exist: {root_dir}")
-
-    formatversion_dirs = [d.name for d in root_dir.iterdir() if _is_formatversion_dir(d)]
-    return sorted([EdifactFormatVersion(fv) for fv in formatversion_dirs], reverse=True)
+    if catalog is None:
+        catalog = AhbCatalog.scan(root_dir)
+    return catalog.get_formatversions()
 
 
 def _get_nachrichtenformat_dirs(formatversion_dir: Path) -> list[Path]:
@@ -52,23 +69,35 @@ def _get_nachrichtenformat_dirs(formatversion_dir: Path) -> list[Path]:
     if not formatversion_dir.exists():
         raise FileNotFoundError(f"❌ FV directory not found: {formatversion_dir.absolute()}")
 
-    return [d for d in formatversion_dir.iterdir() if d.is_dir() and (d / "csv").exists() and (d / "csv").is_dir()]
+    return [formatversion_dir / nachrichtentyp for nachrichtentyp in scan_formatversion_dir(formatversion_dir)]
 
 
-def get_formatversion_pairs(root_dir: Path) -> list[tuple[EdifactFormatVersion, EdifactFormatVersion]]:
+def get_formatversion_pairs(
+    root_dir: Path, catalog: AhbCatalog | None = None, catalog_filter: AhbCatalogFilter | None = None
+) -> list[tuple[EdifactFormatVersion, EdifactFormatVersion]]:
     """
     Generate pairs of consecutive <formatversion> directories.
+    Without a `catalog`, the root directory is scanned (see `AhbCatalog.scan`).
+    A `catalog_filter` keeps the pairs of which at least one formatversion matches; pairs are still built from
+    all formatversions, so that filtering never pairs formatversions that are not consecutive.
     """
-    formatversion_list = _get_formatversion_dirs(root_dir)
+    if catalog is None:
+        catalog = AhbCatalog.scan(root_dir)
+    formatversion_list = catalog.get_formatversions()
     logger.debug("Found formatversions: %s", formatversion_list)
 
     consecutive_formatversions = []
     for i in range(len(formatversion_list) - 1):
         subsequent_formatversion = formatversion_list[i]
         previous_formatversion = formatversion_list[i + 1]
+        if catalog_filter is not None and not (
+            catalog_filter.matches_formatversion(subsequent_formatversion)
+            or catalog_filter.matches_formatversion(previous_formatversion)
+        ):
+            continue
 
-        is_subsequent_empty = _is_formatversion_dir_empty(root_dir, subsequent_formatversion)
-        is_previous_empty = _is_formatversion_dir_empty(root_dir, previous_formatversion)
+        is_subsequent_empty = catalog.is_formatversion_empty(subsequent_formatversion)
+        is_previous_empty = catalog.is_formatversion_empty(previous_formatversion)
         logger.debug(
             "⌛ Checking pair %s -> %s (empty: %s, %s)",
             subsequent_formatversion,
@@ -91,102 +120,618 @@ def get_formatversion_pairs(root_dir: Path) -> list[tuple[EdifactFormatVersion,
     return consecutive_formatversions
 
 
-# pylint:disable=too-many-locals
 def get_matching_csv_files(
-    root_dir: Path, previous_formatversion: str, subsequent_formatversion: str
+    root_dir: Path,
+    previous_formatversion: str,
+    subsequent_formatversion: str,
+    catalog: AhbCatalog | None = None,
+    catalog_filter: AhbCatalogFilter | None = None,
 ) -> list[tuple[Path, Path, str, str]]:
     """
     Find matching <pruefid>.csv files across <formatversion>/<nachrichtenformat> directories.
+    Without a `catalog`, the root directory is scanned (see `AhbCatalog.scan`).
+    A `catalog_filter` limits the nachrichtenformate and PIDs.
     """
-    previous_formatversion_dir = root_dir / previous_formatversion
-    subsequent_formatversion_dir = root_dir / subsequent_formatversion
+    if catalog is None:
+        catalog = AhbCatalog.scan(root_dir)
 
-    if not all(d.exists() for d in [previous_formatversion_dir, subsequent_formatversion_dir]):
+    if not all(fv in catalog.formatversions for fv in [previous_formatversion, subsequent_formatversion]):
         logger.error("❌ At least one FV directory does not exist.")
         return []
 
-    matching_files = []
+    return [
+        (previous_file.path, subsequent_file.path, nachrichtentyp, pruefid)
+        for previous_file, subsequent_file, nachrichtentyp, pruefid in catalog.get_matching_files(
+            previous_formatversion, subsequent_formatversion, catalog_filter
+        )
+    ]
 
-    previous_nachrichtenformat_dirs = _get_nachrichtenformat_dirs(previous_formatversion_dir)
-    subsequent_nachrichtenformat_dirs = _get_nachrichtenformat_dirs(subsequent_formatversion_dir)
 
-    previous_nachrichtenformat_names = {d.name: d for d in previous_nachrichtenformat_dirs}
-    subsequent_nachrichtenformat_names = {d.name: d for d in subsequent_nachrichtenformat_dirs}
+@dataclass(frozen=True)
+class PruefidComparison:
+    """
+    Comparison of the <pruefid>.csv files of one PID between two consecutive formatversions.
+    """
 
-    common_nachrichtentyp = set(previous_nachrichtenformat_names.keys()) & set(
-        subsequent_nachrichtenformat_names.keys()
-    )
+    subsequent_formatversion: str
+    previous_formatversion: str
+    nachrichtentyp: str
+    pruefid: str
+    previous_path: Path
+    subsequent_path: Path
+
+    def get_previous_key(self) -> AhbRowsKey:
+        """
+        Returns the key of the previous rows within an `AhbRowsCache`.
+        """
+        return self.previous_formatversion, self.nachrichtentyp, self.pruefid
+
+    def get_pruefid_key(self) -> tuple[str, str]:
+        """
+        Returns the nachrichtenformat and PID of the comparison.
+        """
+        return self.nachrichtentyp, self.pruefid
+
+    def get_output_key(self) -> str:
+        """
+        Returns the path of the outputs (without suffix) relative to the output directory.
+        """
+        return f"{self.subsequent_formatversion}_{self.previous_formatversion}/{self.nachrichtentyp}/{self.pruefid}"
+
+    def get_subsequent_key(self) -> AhbRowsKey:
+        """
+        Returns the key of the subsequent rows within an `AhbRowsCache`.
+        """
+        return self.subsequent_formatversion, self.nachrichtentyp, self.pruefid
+
+
+def get_pruefid_comparisons(
+    input_dir: Path,
+    consecutive_formatversions: Sequence[tuple[str, str]],
+    catalog: AhbCatalog | None = None,
+    catalog_filter: AhbCatalogFilter | None = None,
+) -> list[PruefidComparison]:
+    """
+    Collect the comparisons of all matching <pruefid>.csv files of all consecutive <formatversion> pairs.
+    Comparisons are scheduled PID by PID (from latest to oldest formatversion pair), so that the rows of every
+    formatversion are used by both of their comparisons in direct succession.
+    """
+    if catalog is None:
+        catalog = AhbCatalog.scan(input_dir)
+    comparisons: list[tuple[int, PruefidComparison]] = []
+    for pair_idx, (subsequent_formatversion, previous_formatversion) in enumerate(consecutive_formatversions):
+        logger.info("⌛ Processing consecutive FVs: %s -> %s", subsequent_formatversion, previous_formatversion)
+
+        try:
+            matching_files = get_matching_csv_files(
+                input_dir, previous_formatversion, subsequent_formatversion, catalog, catalog_filter
+            )
+        except (OSError, ValueError) as e:
+            logger.error(
+                "❌ Error processing FVs %s -> %s: %s",
+                subsequent_formatversion,
+                previous_formatversion,
+                str(e),
+            )
+            continue
 
-    for nachrichtentyp in sorted(common_nachrichtentyp):
-        previous_csv_dir = previous_nachrichtenformat_names[nachrichtentyp] / "csv"
-        subsequent_csv_dir = subsequent_nachrichtenformat_names[nachrichtentyp] / "csv"
+        if not matching_files:
+            logger.warning("No matching files found to compare")
+            continue
 
-        previous_files = {f.stem: f for f in get_csv_files(previous_csv_dir)}
-        subsequent_files = {f.stem: f for f in get_csv_files(subsequent_csv_dir)}
+        for previous_path, subsequent_path, nachrichtentyp, pruefid in matching_files:
+            comparison = PruefidComparison(
+                subsequent_formatversion=subsequent_formatversion,
+                previous_formatversion=previous_formatversion,
+                nachrichtentyp=nachrichtentyp,
+                pruefid=pruefid,
+                previous_path=previous_path,
+                subsequent_path=subsequent_path,
+            )
+            comparisons.append((pair_idx, comparison))
 
-        common_ahbs = set(previous_files.keys()) & set(subsequent_files.keys())
+    comparisons.sort(key=lambda entry: (*entry[1].get_pruefid_key(), entry[0]))
+    return [comparison for _, comparison in comparisons]
 
-        for pruefid in sorted(common_ahbs):
-            matching_files.append((previous_files[pruefid], subsequent_files[pruefid], nachrichtentyp, pruefid))
 
-    return matching_files
+@dataclass(frozen=True)
+class PipelineConcurrency:
+    """
+    Number of threads of every stage of the pipeline mode of `process_ahb_files`.
+    """
+
+    load: int = 2
+    align: int = 1
+    export: int = 2
 
 
-def process_ahb_files(input_dir: Path, output_dir: Path) -> None:
+@dataclass(frozen=True)
+class ProcessingOptions:
     """
-    Process all matching ahb/<pruefid>.csv files between two <formatversion> directories including respective
-    subdirectories of all valid consecutive <formatversion> pairs.
+    Options of `process_ahb_files` that apply to the comparisons of all PIDs.
     """
-    logger.info("Found AHB root directory at: %s", input_dir.absolute())
-    logger.info("Output directory: %s", output_dir.absolute())
 
-    consecutive_formatversions = get_formatversion_pairs(input_dir)
-    if not consecutive_formatversions:
-        logger.warning("❗️ No valid consecutive FVs subdirectories found to compare.")
-        return
+    output_dir: Path
+    algorithm: AlignmentAlgorithm = AlignmentAlgorithm.GREEDY
+    skip_unchanged: bool = False
+    detect_moved_rows: bool = False
+    trusted_input: bool = False
+    memory_map: bool = False
+    cache_dir: Path | None = None
+    prefetch_depth: int = 0
+    alignment_workers: int | None = None
+    pipeline: PipelineConcurrency | None = None
 
-    for subsequent_formatversion, previous_formatversion in consecutive_formatversions:
-        logger.info("⌛ Processing consecutive FVs: %s -> %s", subsequent_formatversion, previous_formatversion)
 
-        try:
-            matching_files = get_matching_csv_files(input_dir, previous_formatversion, subsequent_formatversion)
+@dataclass
+class ProcessingStatistics:
+    """
+    Statistics about loading the csv files of PID comparisons, summed up over all worker processes.
+    """
 
-            if not matching_files:
-                logger.warning("No matching files found to compare")
-                continue
+    loaded_files: int = 0
+    reused_files: int = 0
+    stall_time: float = 0.0
+    parse_cache_hits: int = 0
+    parse_cache_misses: int = 0
 
-            for previous_pruefid, subsequent_pruefid, nachrichtentyp, pruefid in matching_files:
-                logger.info("Processing %s - %s", nachrichtentyp, pruefid)
+    def add(self, other: "ProcessingStatistics") -> None:
+        """
+        Adds the statistics of another (worker) run.
+        """
+        self.loaded_files += other.loaded_files
+        self.reused_files += other.reused_files
+        self.stall_time += other.stall_time
+        self.parse_cache_hits += other.parse_cache_hits
+        self.parse_cache_misses += other.parse_cache_misses
 
-                try:
-                    previous_rows, subsequent_rows = load_csv_files(
-                        previous_pruefid, subsequent_pruefid, previous_formatversion, subsequent_formatversion
-                    )
 
-                    comparisons = align_ahb_rows(previous_rows, subsequent_rows)
+class _LogRecordCollector(logging.Handler):
+    """
+    Collects the log records of a worker process, so that they can be replayed by the main process.
+    """
 
-                    output_dir_path = (
-                        output_dir / f"{subsequent_formatversion}_{previous_formatversion}" / nachrichtentyp
-                    )
-                    output_dir_path.mkdir(parents=True, exist_ok=True)
+    def __init__(self) -> None:
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
 
-                    csv_path = output_dir_path / f"{pruefid}.csv"
-                    xlsx_path = output_dir_path / f"{pruefid}.xlsx"
+    def emit(self, record: logging.LogRecord) -> None:
+        # arguments and tracebacks are not necessarily picklable: format them within the worker process
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        self.records.append(record)
 
-                    export_to_csv(comparisons, csv_path)
-                    export_to_xlsx(comparisons, str(xlsx_path))
 
-                    logger.info("✅ Successfully processed %s/%s", nachrichtentyp, pruefid)
+# (is byte identical, previous rows, subsequent rows)
+_LoadedComparison = tuple[bool, Sequence[AnyAhbRow], Sequence[AnyAhbRow]]
 
-                except (OSError, ValueError) as e:
-                    logger.error("❌ Error processing %s/%s: %s", nachrichtentyp, pruefid, str(e))
-                    continue
 
+def _log_processing(comparison: PruefidComparison) -> None:
+    logger.info(
+        "Processing %s -> %s: %s - %s",
+        comparison.subsequent_formatversion,
+        comparison.previous_formatversion,
+        comparison.nachrichtentyp,
+        comparison.pruefid,
+    )
+
+
+def _are_byte_identical(previous_path: Path, subsequent_path: Path, parse_cache: CsvParseCache | None) -> bool:
+    """
+    Returns whether two csv files have the same content. Files of different sizes are never read and the content
+    hashes of the parse cache are used if both files are cached, so only the remaining files are compared byte by byte.
+    """
+    if previous_path.stat().st_size != subsequent_path.stat().st_size:
+        return False
+    if parse_cache is not None:
+        previous_hash = parse_cache.get_content_hash(previous_path)
+        subsequent_hash = parse_cache.get_content_hash(subsequent_path)
+        if previous_hash is not None and subsequent_hash is not None:
+            return previous_hash == subsequent_hash
+    return filecmp.cmp(previous_path, subsequent_path, shallow=False)
+
+
+def _get_pipeline(
+    concurrency: PipelineConcurrency,
+    load_comparison: Callable[[PruefidComparison], _LoadedComparison],
+    align_comparison: Callable[[bool, Sequence[AnyAhbRow], Sequence[AnyAhbRow]], list[AhbRowComparison] | None],
+    export_comparison: Callable[[PruefidComparison, list[AhbRowComparison]], None],
+    release_rows: Callable[[PruefidComparison, _LoadedComparison | None], None],
+) -> Pipeline:
+    """
+    Connects loading, aligning and exporting of PID comparisons to a pipeline, which returns all comparisons that
+    were completed without errors. An error only aborts the comparison it occurred in.
+    """
+
+    def load_stage(comparison: PruefidComparison) -> tuple[PruefidComparison, _LoadedComparison] | None:
+        _log_processing(comparison)
+        try:
+            return comparison, load_comparison(comparison)
         except (OSError, ValueError) as e:
-            logger.error(
-                "❌ Error processing FVs %s -> %s: %s",
-                subsequent_formatversion,
-                previous_formatversion,
-                str(e),
+            logger.error("❌ Error processing %s/%s: %s", comparison.nachrichtentyp, comparison.pruefid, str(e))
+            release_rows(comparison, None)
+            return None
+
+    def align_stage(
+        loaded: tuple[PruefidComparison, _LoadedComparison],
+    ) -> tuple[PruefidComparison, list[AhbRowComparison] | None] | None:
+        comparison, loaded_comparison = loaded
+        try:
+            aligned_rows = align_comparison(*loaded_comparison)
+        except (OSError, ValueError) as e:
+            logger.error("❌ Error processing %s/%s: %s", comparison.nachrichtentyp, comparison.pruefid, str(e))
+            return None
+        finally:
+            # the aligned rows do not need the loaded rows anymore
+            release_rows(comparison, loaded_comparison)
+        if aligned_rows is None:
+            logger.info("⏭️ Skipping unchanged %s/%s", comparison.nachrichtentyp, comparison.pruefid)
+        return comparison, aligned_rows
+
+    def export_stage(aligned: tuple[PruefidComparison, list[AhbRowComparison] | None]) -> PruefidComparison | None:
+        comparison, aligned_rows = aligned
+        if aligned_rows is None:
+            return comparison
+        try:
+            export_comparison(comparison, aligned_rows)
+        except (OSError, ValueError) as e:
+            logger.error("❌ Error processing %s/%s: %s", comparison.nachrichtentyp, comparison.pruefid, str(e))
+            return None
+        logger.info("✅ Successfully processed %s/%s", comparison.nachrichtentyp, comparison.pruefid)
+        return comparison
+
+    return Pipeline(
+        [
+            PipelineStage("load", load_stage, concurrency.load),
+            PipelineStage("align", align_stage, concurrency.align),
+            PipelineStage("export", export_stage, concurrency.export),
+        ]
+    )
+
+
+def _process_pruefid_comparisons(
+    pruefid_comparisons: Sequence[PruefidComparison], options: ProcessingOptions
+) -> tuple[ProcessingStatistics, list[PruefidComparison]]:
+    """
+    Load, align and export the given PID comparisons one after another (see `process_ahb_files`).
+    An error only aborts the comparison it occurred in. Returns all comparisons that were completed without errors.
+    """
+    completed_comparisons: list[PruefidComparison] = []
+    # cell values repeat across rows, PIDs and formatversions: keep a single string object per value for the whole run
+    string_pool = StringPool()
+    parse_cache = CsvParseCache(options.cache_dir) if options.cache_dir is not None else None
+
+    def load_rows(file_path: Path, formatversion: str) -> Callable[[], Sequence[AnyAhbRow]]:
+        if options.memory_map:
+            return lambda: read_csv_mapped(file_path, formatversion, string_pool)
+        if options.trusted_input:
+            # trusted rows are aligned as lightweight AhbRowData and only converted into AhbRow's for export
+            return lambda: read_csv_rows(file_path, formatversion, string_pool, parse_cache)
+        return lambda: read_csv_content(file_path, formatversion, string_pool, parse_cache=parse_cache)
+
+    rows_cache = AhbRowsCache(
+        (
+            key
+            for comparison in pruefid_comparisons
+            for key in (comparison.get_previous_key(), comparison.get_subsequent_key())
+        ),
+        # memory-mapped files are closed as soon as their rows are aligned for the last time
+        close_rows=close_mapped_file if options.memory_map else None,
+    )
+
+    def load_comparison(comparison: PruefidComparison) -> tuple[bool, Sequence[AnyAhbRow], Sequence[AnyAhbRow]]:
+        # identical files are only detected before loading if they are skipped, otherwise their loaded rows are compared
+        is_byte_identical = options.skip_unchanged and _are_byte_identical(
+            comparison.previous_path, comparison.subsequent_path, parse_cache
+        )
+        if is_byte_identical:
+            return is_byte_identical, [], []
+        previous_rows = rows_cache.get_rows(
+            comparison.get_previous_key(),
+            load_rows(comparison.previous_path, comparison.previous_formatversion),
+        )
+        try:
+            subsequent_rows = rows_cache.get_rows(
+                comparison.get_subsequent_key(),
+                load_rows(comparison.subsequent_path, comparison.subsequent_formatversion),
             )
+        except BaseException:
+            # the caller only finishes the uses of both keys, since it never gets the previous rows
+            rows_cache.discard(comparison.get_previous_key(), previous_rows)
+            raise
+        return is_byte_identical, previous_rows, subsequent_rows
+
+    def align_comparison(
+        is_byte_identical: bool, previous_rows: Sequence[AnyAhbRow], subsequent_rows: Sequence[AnyAhbRow]
+    ) -> list[AhbRowComparison] | None:
+        """
+        Returns the aligned rows of a loaded comparison or None if it is skipped as unchanged.
+        """
+        if is_byte_identical:
+            return None
+
+        if options.memory_map:
+            share_mapped_records(previous_rows, subsequent_rows)
+
+        if have_identical_content(previous_rows, subsequent_rows):
+            if options.skip_unchanged:
+                return None
+            return align_identical_ahb_rows(previous_rows, subsequent_rows)
+        return align_ahb_rows(
+            previous_rows,
+            subsequent_rows,
+            options.algorithm,
+            max_workers=options.alignment_workers,
+            detect_moved_rows=options.detect_moved_rows,
+        )
+
+    def export_comparison(comparison: PruefidComparison, aligned_rows: list[AhbRowComparison]) -> None:
+        output_path = options.output_dir / comparison.get_output_key()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        csv_path = output_path.with_suffix(".csv")
+        xlsx_path = output_path.with_suffix(".xlsx")
+
+        export_to_csv(aligned_rows, csv_path)
+        export_to_xlsx(aligned_rows, str(xlsx_path))
+
+    def release_rows(comparison: PruefidComparison, loaded_comparison: _LoadedComparison | None) -> None:
+        _, previous_rows, subsequent_rows = loaded_comparison or (False, None, None)
+        rows_cache.release(comparison.get_previous_key(), previous_rows)
+        rows_cache.release(comparison.get_subsequent_key(), subsequent_rows)
+
+    if options.pipeline is not None:
+        pipeline = _get_pipeline(options.pipeline, load_comparison, align_comparison, export_comparison, release_rows)
+        completed_comparisons.extend(pipeline.run(pruefid_comparisons))
+        # the time the alignment stage waited for loaded comparisons
+        stall_time = pipeline.wait_times[1]
+    else:
+        # the next comparisons are loaded in the background while the current one is aligned and exported
+        prefetcher = Prefetcher(load_comparison, options.prefetch_depth)
+        for comparison, get_loaded_comparison in prefetcher.iter_loaded(pruefid_comparisons):
+            nachrichtentyp, pruefid = comparison.nachrichtentyp, comparison.pruefid
+            _log_processing(comparison)
+            loaded_comparison = None
+
+            try:
+                loaded_comparison = get_loaded_comparison()
+                aligned_rows = align_comparison(*loaded_comparison)
+                if aligned_rows is None:
+                    logger.info("⏭️ Skipping unchanged %s/%s", nachrichtentyp, pruefid)
+                else:
+                    export_comparison(comparison, aligned_rows)
+                    logger.info("✅ Successfully processed %s/%s", nachrichtentyp, pruefid)
+                completed_comparisons.append(comparison)
+
+            except (OSError, ValueError) as e:
+                logger.error("❌ Error processing %s/%s: %s", nachrichtentyp, pruefid, str(e))
+                continue
+
+            finally:
+                release_rows(comparison, loaded_comparison)
+        stall_time = prefetcher.stall_time
+
+    statistics = ProcessingStatistics(
+        loaded_files=rows_cache.loads,
+        reused_files=rows_cache.hits,
+        stall_time=stall_time,
+        parse_cache_hits=parse_cache.hits if parse_cache is not None else 0,
+        parse_cache_misses=parse_cache.misses if parse_cache is not None else 0,
+    )
+    return statistics, completed_comparisons
+
+
+def _process_pruefid_comparisons_in_worker(
+    pruefid_comparisons: Sequence[PruefidComparison], options: ProcessingOptions, log_level: int
+) -> tuple[ProcessingStatistics, list[PruefidComparison], list[logging.LogRecord]]:
+    """
+    Process PID comparisons within a worker process and return their log records instead of emitting them.
+    """
+    package_logger = logging.getLogger(_PACKAGE_LOGGER_NAME)
+    log_record_collector = _LogRecordCollector()
+    package_logger.handlers = [log_record_collector]
+    package_logger.propagate = False
+    package_logger.setLevel(log_level)
+
+    statistics, completed_comparisons = _process_pruefid_comparisons(pruefid_comparisons, options)
+    return statistics, completed_comparisons, log_record_collector.records
+
+
+def _process_pruefid_comparisons_in_pool(
+    pruefid_comparisons: Sequence[PruefidComparison], options: ProcessingOptions, jobs: int
+) -> tuple[ProcessingStatistics, list[PruefidComparison]]:
+    """
+    Process PID comparisons in a pool of `jobs` worker processes. Every PID (with the comparisons of all its
+    formatversion pairs) is a separate task, whose log records are replayed in the order of all PIDs.
+    """
+    statistics = ProcessingStatistics()
+    completed_comparisons: list[PruefidComparison] = []
+    log_level = logging.getLogger(_PACKAGE_LOGGER_NAME).getEffectiveLevel()
+    pruefid_tasks = [
+        list(comparisons)
+        for _, comparisons in groupby(pruefid_comparisons, key=lambda comparison: comparison.get_pruefid_key())
+    ]
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(_process_pruefid_comparisons_in_worker, comparisons, options, log_level)
+            for comparisons in pruefid_tasks
+        ]
+        for comparisons, future in zip(pruefid_tasks, futures, strict=True):
+            nachrichtentyp, pruefid = comparisons[0].get_pruefid_key()
+            try:
+                worker_statistics, worker_completed_comparisons, log_records = future.result()
+            except Exception as e:  # pylint:disable=broad-exception-caught
+                # e.g. a crashed worker process: only the PID of this task is affected
+                logger.error("❌ Error processing %s/%s: %s", nachrichtentyp, pruefid, str(e))
+                continue
+            for log_record in log_records:
+                logging.getLogger(log_record.name).handle(log_record)
+            statistics.add(worker_statistics)
+            completed_comparisons.extend(worker_completed_comparisons)
+
+    return statistics, completed_comparisons
+
+
+def _get_manifest_settings(options: ProcessingOptions) -> str:
+    """
+    Describes the tool version and all options that affect the outputs of a PID comparison.
+    """
+    return (
+        f"ahlbatross {get_tool_version()}; algorithm: {options.algorithm.value}; "
+        f"detect_moved_rows: {options.detect_moved_rows}; skip_unchanged: {options.skip_unchanged}"
+    )
+
+
+def _get_manifest_entries(pruefid_comparisons: Sequence[PruefidComparison], settings: str) -> dict[str, ManifestEntry]:
+    """
+    Create the manifest entries (without outputs) including the content hashes of all PID comparisons whose input
+    files can be read.
+    """
+    content_hashes: dict[Path, str] = {}
+    manifest_entries = {}
+    for comparison in pruefid_comparisons:
+        try:
+            for file_path in (comparison.previous_path, comparison.subsequent_path):
+                if file_path not in content_hashes:
+                    content_hashes[file_path] = _get_content_hash(file_path)
+        except OSError as e:
+            logger.warning("❗️ Could not hash the input files of %s: %s", comparison.get_output_key(), str(e))
             continue
+        manifest_entries[comparison.get_output_key()] = ManifestEntry(
+            previous_hash=content_hashes[comparison.previous_path],
+            subsequent_hash=content_hashes[comparison.subsequent_path],
+            settings=settings,
+        )
+    return manifest_entries
+
+
+def _get_outputs(output_dir: Path, key: str) -> tuple[str, ...]:
+    """
+    Returns the existing output files of a PID comparison, relative to the output directory.
+    """
+    return tuple(f"{key}{suffix}" for suffix in (".csv", ".xlsx") if (output_dir / f"{key}{suffix}").exists())
+
+
+def process_ahb_files(
+    input_dir: Path,
+    output_dir: Path,
+    *,
+    algorithm: AlignmentAlgorithm = AlignmentAlgorithm.GREEDY,
+    skip_unchanged: bool = False,
+    detect_moved_rows: bool = False,
+    trusted_input: bool = False,
+    memory_map: bool = False,
+    cache_dir: Path | None = None,
+    prefetch_depth: int = 0,
+    jobs: int = 1,
+    incremental: bool = False,
+    prune_orphans: bool = False,
+    pipeline: PipelineConcurrency | None = None,
+    catalog_filter: AhbCatalogFilter | None = None,
+) -> None:
+    """
+    Process all matching ahb/<pruefid>.csv files between two <formatversion> directories including respective
+    subdirectories of all valid consecutive <formatversion> pairs. All options are keyword-only.
+    PIDs without any (non-whitespace) changes are not aligned at all and, if `skip_unchanged` is set, not exported.
+    If `detect_moved_rows` is set, relocated rows are labeled as MOVED instead of REMOVED and ADDED.
+    If `trusted_input` is set, csv rows are loaded without validation.
+    If `memory_map` is set, csv files are memory-mapped and rows are only decoded when needed (implies `trusted_input`).
+    If a `cache_dir` is given, parsed csv files are cached there and only parsed again if they changed
+    (not used for memory-mapped files).
+    The input directory is scanned once up front (see `AhbCatalog`).
+    The rows of every formatversion are loaded once and shared by both of their comparisons (see `AhbRowsCache`).
+    If `prefetch_depth` is set, the files of as many upcoming comparisons are loaded in background threads.
+    If `jobs` is greater than 1, PIDs are processed in as many worker processes; the log output keeps its order.
+    If a `pipeline` concurrency is given, loading, aligning and exporting run as concurrent stages with bounded queues
+    in between (see `Pipeline`) instead of one comparison after another. `prefetch_depth` is not used then and the
+    log output of different PIDs interleaves.
+    A `catalog_filter` limits the run to matching formatversion pairs, nachrichtenformate and PIDs before any file
+    is read. Such selective runs keep the manifest entries of all other PIDs and do not check for orphaned outputs.
+    A manifest of the settings and outputs of all PIDs is written into the output directory (see `AhbManifest`).
+    If `incremental` is set, the input files are hashed and PIDs whose inputs and settings did not change since the
+    last incremental run are skipped. Output files that do not belong to any PID of the manifest are reported or,
+    if `prune_orphans` is set, removed.
+    """
+    logger.info("Found AHB root directory at: %s", input_dir.absolute())
+    logger.info("Output directory: %s", output_dir.absolute())
+    logger.info("Alignment algorithm: %s", algorithm.value)
+
+    catalog = AhbCatalog.scan(input_dir)
+    consecutive_formatversions = get_formatversion_pairs(input_dir, catalog, catalog_filter)
+    if not consecutive_formatversions:
+        logger.warning("❗️ No valid consecutive FVs subdirectories found to compare.")
+        return
+
+    options = ProcessingOptions(
+        output_dir=output_dir,
+        algorithm=algorithm,
+        skip_unchanged=skip_unchanged,
+        detect_moved_rows=detect_moved_rows,
+        trusted_input=trusted_input,
+        memory_map=memory_map,
+        cache_dir=cache_dir,
+        prefetch_depth=prefetch_depth,
+        # worker processes must not spawn further processes, memory-mapped rows cannot be sent to any and processes
+        # must not be forked while prefetching or pipeline threads are running
+        alignment_workers=1 if jobs > 1 or memory_map or prefetch_depth > 0 or pipeline is not None else None,
+        pipeline=pipeline,
+    )
+    pruefid_comparisons = get_pruefid_comparisons(input_dir, consecutive_formatversions, catalog, catalog_filter)
+    settings = _get_manifest_settings(options)
+    # the input files are only hashed if the hashes are compared
+    manifest_entries = _get_manifest_entries(pruefid_comparisons, settings) if incremental else {}
+    manifest = AhbManifest()
+    previous_manifest = AhbManifest.load(output_dir) if incremental or catalog_filter is not None else AhbManifest()
+    if catalog_filter is not None:
+        # the outputs of all PIDs that are not selected by the filter stay as they are
+        manifest.entries = {
+            key: entry for key, entry in previous_manifest.entries.items() if key not in manifest_entries
+        }
+    if incremental:
+        outdated_comparisons = []
+        for comparison in pruefid_comparisons:
+            key = comparison.get_output_key()
+            manifest_entry = manifest_entries.get(key)
+            if manifest_entry is not None and previous_manifest.is_up_to_date(key, manifest_entry, output_dir):
+                manifest.entries[key] = previous_manifest.entries[key]
+            else:
+                outdated_comparisons.append(comparison)
+        logger.info("⏭️ Skipping %d up-to-date PID comparisons", len(pruefid_comparisons) - len(outdated_comparisons))
+        pruefid_comparisons = outdated_comparisons
+
+    if jobs > 1:
+        statistics, completed_comparisons = _process_pruefid_comparisons_in_pool(pruefid_comparisons, options, jobs)
+    else:
+        statistics, completed_comparisons = _process_pruefid_comparisons(pruefid_comparisons, options)
+
+    completed_keys = {comparison.get_output_key() for comparison in completed_comparisons}
+    for comparison in pruefid_comparisons:
+        key = comparison.get_output_key()
+        manifest_entry = manifest_entries.get(key)
+        if manifest_entry is None or key not in completed_keys:
+            # failed comparisons keep their existing outputs (which are thus no orphans), but without input hashes
+            # they are processed again by the next incremental run
+            manifest_entry = ManifestEntry(previous_hash=None, subsequent_hash=None, settings=settings)
+        manifest.entries[key] = replace(manifest_entry, outputs=_get_outputs(output_dir, key))
+    if manifest.entries or output_dir.exists():
+        manifest.save(output_dir)
+
+    # outputs of PIDs that are not selected by a filter are not necessarily part of the manifest
+    orphan_paths = manifest.get_orphans(output_dir) if catalog_filter is None else []
+    if catalog_filter is not None and prune_orphans:
+        logger.warning("❗️ Orphaned output files are not pruned by runs with filters")
+    for orphan_path in orphan_paths:
+        if prune_orphans:
+            orphan_path.unlink()
+            logger.info("🗑️ Removed orphaned output file: %s", orphan_path)
+        else:
+            logger.warning("❗️ Orphaned output file: %s", orphan_path)
+
+    logger.info("Loaded rows of %d csv files, reused them %d times", statistics.loaded_files, statistics.reused_files)
+    logger.info("Waited %.2fs for loading csv files (prefetch depth: %d)", statistics.stall_time, prefetch_depth)
+    if cache_dir is not None:
+        logger.info("Parse cache: %d hits, %d misses", statistics.parse_cache_hits, statistics.parse_cache_misses)
@@ -0,0 +1,145 @@
+"""
+Run-scoped cache of loaded AHB rows.
+"""
+
+import logging
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import Future
+
+from ahlbatross.models.ahb import AnyAhbRow
+
+logger = logging.getLogger(__name__)
+
+# (formatversion, nachrichtenformat, pruefid)
+AhbRowsKey = tuple[str, str, str]
+
+_DEFAULT_MAX_CACHED_ROWS = 1_000_000
+
+
+class AhbRowsCache:
+    """
+    Keeps the loaded rows of one PID of one formatversion in memory from their first until their last scheduled use,
+    e.g. the rows of FV2410 that are compared to FV2504 first and to FV2404 afterwards.
+    All uses are announced on creation and every use is finished by `release`; keys without further uses are evicted.
+    At most `max_rows` rows are cached, rows that do not fit anymore are loaded again when they are used.
+    If `close_rows` is given, it is called for all loaded rows (e.g. of memory-mapped files) as soon as they are
+    neither cached nor used anymore. Hence, all rows returned by `get_rows` have to be passed to `release` or, if
+    their use is aborted before the use of the key is finished, to `discard`.
+    """
+
+    def __init__(
+        self,
+        scheduled_keys: Iterable[AhbRowsKey],
+        max_rows: int = _DEFAULT_MAX_CACHED_ROWS,
+        close_rows: Callable[[Sequence[AnyAhbRow]], None] | None = None,
+    ) -> None:
+        self.max_rows = max_rows
+        self.close_rows = close_rows
+        self.loads = 0
+        self.hits = 0
+        self._remaining_uses = Counter(scheduled_keys)
+        self._rows: dict[AhbRowsKey, Sequence[AnyAhbRow]] = {}
+        self._cached_row_count = 0
+        # returned rows (by identity) with their number of unfinished uses; the reference to the rows keeps their
+        # identity from being reused while they are in use
+        self._users: dict[int, tuple[Sequence[AnyAhbRow], int]] = {}
+        self._pending_rows: dict[AhbRowsKey, Future[Sequence[AnyAhbRow]]] = {}
+        self._lock = threading.Lock()
+
+    def get_rows(self, key: AhbRowsKey, load_rows: Callable[[], Sequence[AnyAhbRow]]) -> Sequence[AnyAhbRow]:
+        """
+        Returns the cached rows of a key or loads them and keeps them if they are used again later on.
+        Thread-safe: concurrent requests of the same key (e.g. by a `Prefetcher`) wait for a single load.
+        """
+        with self._lock:
+            ahb_rows = self._rows.get(key)
+            if ahb_rows is not None:
+                self.hits += 1
+                self._add_user(ahb_rows)
+                return ahb_rows
+            pending_rows = self._pending_rows.get(key)
+            if pending_rows is None:
+                self._pending_rows[key] = loading_rows = Future[Sequence[AnyAhbRow]]()
+
+        if pending_rows is not None:
+            ahb_rows = pending_rows.result()
+            with self._lock:
+                self.hits += 1
+                self._add_user(ahb_rows)
+            return ahb_rows
+
+        try:
+            ahb_rows = load_rows()
+        except BaseException as e:
+            with self._lock:
+                del self._pending_rows[key]
+            loading_rows.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._pending_rows[key]
+            self.loads += 1
+            self._add_user(ahb_rows)
+            if self._remaining_uses[key] > 1:
+                if self._cached_row_count + len(ahb_rows) <= self.max_rows:
+                    self._rows[key] = ahb_rows
+                    self._cached_row_count += len(ahb_rows)
+                else:
+                    logger.debug("Not caching %s rows of %s: cache is full", len(ahb_rows), key)
+        loading_rows.set_result(ahb_rows)
+        return ahb_rows
+
+    def _add_user(self, ahb_rows: Sequence[AnyAhbRow]) -> None:
+        _, users = self._users.get(id(ahb_rows), (ahb_rows, 0))
+        self._users[id(ahb_rows)] = ahb_rows, users + 1
+
+    def _remove_user(self, key: AhbRowsKey, ahb_rows: Sequence[AnyAhbRow]) -> bool:
+        """
+        Removes a user of rows returned by `get_rows` and returns whether they are neither used nor cached anymore.
+        """
+        _, users = self._users.get(id(ahb_rows), (ahb_rows, 0))
+        if users == 0:
+            # e.g. rows that were not returned by `get_rows`
+            return False
+        if users > 1:
+            self._users[id(ahb_rows)] = ahb_rows, users - 1
+            return False
+        del self._users[id(ahb_rows)]
+        return self._rows.get(key) is not ahb_rows
+
+    def _close(self, unused_rows: Iterable[Sequence[AnyAhbRow]]) -> None:
+        if self.close_rows is not None:
+            for ahb_rows in unused_rows:
+                self.close_rows(ahb_rows)
+
+    def release(self, key: AhbRowsKey, ahb_rows: Sequence[AnyAhbRow] | None = None) -> None:
+        """
+        Finishes a use of a key (and of the `ahb_rows` returned for it) and evicts its rows after the last use.
+        """
+        unused_rows = []
+        with self._lock:
+            self._remaining_uses[key] -= 1
+            if self._remaining_uses[key] <= 0:
+                del self._remaining_uses[key]
+                cached_rows = self._rows.pop(key, None)
+                if cached_rows is not None:
+                    self._cached_row_count -= len(cached_rows)
+                    if cached_rows is not ahb_rows and id(cached_rows) not in self._users:
+                        unused_rows.append(cached_rows)
+            if ahb_rows is not None and self._remove_user(key, ahb_rows):
+                unused_rows.append(ahb_rows)
+        self._close(unused_rows)
+
+    def discard(self, key: AhbRowsKey, ahb_rows: Sequence[AnyAhbRow]) -> None:
+        """
+        Stops using rows returned by `get_rows` without finishing the use of their key, e.g. if loading the other rows
+        of a comparison failed. The use of the key still has to be finished by `release`.
+        """
+        with self._lock:
+            is_unused = self._remove_user(key, ahb_rows)
+        self._close([ahb_rows] if is_unused else [])
+
+    def __len__(self) -> int:
+        return len(self._rows)
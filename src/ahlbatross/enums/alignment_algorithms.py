@@ -0,0 +1,16 @@
+"""
+Available algorithms to align the AhbRow's of two formatversions.
+"""
+
+from enum import StrEnum
+
+
+class AlignmentAlgorithm(StrEnum):
+    """
+    Algorithms to align the rows of two AHBs before comparing them row by row.
+    """
+
+    GREEDY = "greedy"  # match each previous row with the next fitting subsequent row
+    MYERS = "myers"  # shortest edit script over row fingerprints (Myers' O((N+M)·D) diff)
+    PATIENCE = "patience"  # anchor on rows with unique fingerprints, align the gaps in between greedily
+    BLOCKWISE = "blockwise"  # align `Segmentname` blocks first, then the rows within each pair of matching blocks
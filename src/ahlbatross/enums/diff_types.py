@@ -14,3 +14,4 @@ class DiffType(StrEnum):
     MODIFIED = "ÄNDERUNG"
     REMOVED = "ENTFÄLLT"
     ADDED = "NEU"
+    MOVED = "VERSCHOBEN"
@@ -3,9 +3,38 @@ Functions for reading and writing csv files.
 """
 
 import csv
+import mmap
+import os
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from itertools import chain
 from pathlib import Path
 
-from ahlbatross.models.ahb import AhbRow, AhbRowComparison
+from pydantic import TypeAdapter
+
+from ahlbatross.formats.csv_cache import CsvParseCache
+from ahlbatross.models.ahb import AhbRow, AhbRowComparison, AnyAhbRow
+from ahlbatross.models.ahb_row_data import AhbRowData, DecodedRecord, LazyAhbRowData, _get_fingerprint
+from ahlbatross.utils.string_formatting import normalize_entries
+from ahlbatross.utils.string_pool import StringPool
+from ahlbatross.utils.xlsx_formatting import AHB_COLUMN_NAMES
+
+# csv headers of all AHB properties ordered like `AHB_COLUMN_NAMES`
+_AHB_CSV_HEADERS = [
+    "Segmentname",
+    "Segmentgruppe",
+    "Segment",
+    "Datenelement",
+    "Segment ID",
+    "Code",
+    "Beschreibung",
+    "Bedingungsausdruck",
+    "Bedingung",
+]
+_VALUE_POOL_ENTRY_COLUMN = _AHB_CSV_HEADERS.index("Code")
+_AHB_EXPRESSION_COLUMN = _AHB_CSV_HEADERS.index("Bedingungsausdruck")
+
+_AHB_ROWS_ADAPTER = TypeAdapter(list[AhbRow])
 
 
 def get_csv_files(csv_dir: Path) -> list[Path]:
@@ -17,14 +46,234 @@ def get_csv_files(csv_dir: Path) -> list[Path]:
     return sorted(csv_dir.glob("*.csv"))
 
 
-def read_csv_content(file_path: Path, formatversion: str) -> list[AhbRow]:
+def _get_column_indices(header: Sequence[str]) -> tuple[list[int], int]:
     """
-    Read and convert AHB csv content to AhbRow models.
+    Resolve the position of every AHB property (ordered like `AHB_COLUMN_NAMES`) and of `Qualifier` within the header
+    once instead of looking up each entry by its name. Missing columns are marked with -1.
+    """
+    if "Segmentname" not in header:
+        raise KeyError("Segmentname")
+    column_indices = [header.index(name) if name in header else -1 for name in _AHB_CSV_HEADERS]
+    qualifier_idx = header.index("Qualifier") if "Qualifier" in header else -1
+    return column_indices, qualifier_idx
+
+
+def _get_entries(record: Sequence[str], column_indices: Sequence[int], qualifier_idx: int) -> list[str | None]:
+    """
+    Pick the entries of all AHB properties out of a csv record.
+    Missing columns yield None entries; `Code` falls back to `Qualifier` like in `iter_csv_content`.
+    """
+    entries: list[str | None] = [record[idx] if 0 <= idx < len(record) else None for idx in column_indices]
+    if not entries[_VALUE_POOL_ENTRY_COLUMN]:
+        entries[_VALUE_POOL_ENTRY_COLUMN] = record[qualifier_idx] if 0 <= qualifier_idx < len(record) else None
+    # the only transformation the validation of `AhbLine` applies to its entries
+    ahb_expression = entries[_AHB_EXPRESSION_COLUMN]
+    if ahb_expression is not None:
+        entries[_AHB_EXPRESSION_COLUMN] = ahb_expression.strip()
+    return entries
+
+
+def _iter_csv_entries(file_path: Path) -> Iterator[list[str | None]]:
+    """
+    Read AHB csv content as plain lists of entries ordered like `AHB_COLUMN_NAMES`.
     """
-    rows = []
+    with open(file_path, encoding="utf-8", newline="") as csvfile:
+        reader = csv.reader(csvfile)
+        column_indices, qualifier_idx = _get_column_indices(next(reader, []))
+        for record in reader:
+            if record:
+                yield _get_entries(record, column_indices, qualifier_idx)
+
+
+def _index_csv_records(data: "mmap.mmap | bytes") -> tuple["array[int]", "array[int]"]:
+    """
+    Find the start and end offsets (without line terminator) of all non-empty csv records in a single pass.
+    Line breaks within quoted entries do not end a record. Like `csv.reader`, only a quote at the start of an entry
+    begins a quoted entry, quotes within an unquoted entry are taken literally.
+    """
+    starts = array("Q")
+    ends = array("Q")
+    size = len(data)
+    record_start = 0
+    while record_start < size:
+        position = record_start
+        line_end = data.find(b"\n", position)
+        after_quoted_entry = False
+        while True:
+            if line_end == -1:
+                line_end = size
+            quote_start = data.find(b'"', position, line_end)
+            if quote_start == -1:
+                break
+            # escaped quotes `""` close the quoted entry and immediately reopen it
+            reopened = after_quoted_entry and quote_start == position
+            if quote_start != record_start and not reopened and data[quote_start - 1 : quote_start] != b",":
+                position = quote_start + 1
+                after_quoted_entry = False
+                continue
+            # skip the quoted entry
+            quote_end = data.find(b'"', quote_start + 1)
+            position = size if quote_end == -1 else quote_end + 1
+            line_end = data.find(b"\n", position)
+            after_quoted_entry = True
+
+        record_end = line_end
+        if record_end > record_start and data[record_end - 1 : record_end] == b"\r":
+            record_end -= 1
+        if record_end > record_start:
+            starts.append(record_start)
+            ends.append(record_end)
+        record_start = line_end + 1
+    return starts, ends
+
+
+class MappedCsvFile:
+    """
+    Memory-mapped AHB csv file of one PID that only indexes the offsets of its records while loading.
+    Records are decoded when a row is accessed (see `LazyAhbRowData`) and cached by their raw bytes, so records that
+    were seen before (e.g. unchanged rows of the previous formatversion, see `share_records`) are neither decoded
+    nor normalized and fingerprinted again.
+    """
+
+    def __init__(self, file_path: Path, formatversion: str, string_pool: StringPool | None = None) -> None:
+        self.formatversion = string_pool.intern(formatversion) if string_pool is not None else formatversion
+        self.string_pool = string_pool
+        with open(file_path, "rb") as file:
+            # empty files cannot be mapped
+            self.data: mmap.mmap | bytes = (
+                mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(file.fileno()).st_size else b""
+            )
+        starts, ends = _index_csv_records(self.data)
+        header = next(csv.reader([self.data[starts[0] : ends[0]].decode("utf-8")])) if starts else []
+        self.column_indices, self.qualifier_idx = _get_column_indices(header)
+        self.header = bytes(self.data[starts[0] : ends[0]])
+        self.starts = starts[1:]
+        self.ends = ends[1:]
+        self.records: dict[bytes, DecodedRecord] = {}
+
+    def close(self) -> None:
+        """
+        Releases the memory mapping; records that were not decoded before cannot be accessed anymore.
+        """
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __enter__(self) -> "MappedCsvFile":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def share_records(self, other: "MappedCsvFile") -> bool:
+        """
+        Share the decoded records with another file if both files have identical headers (i.e. identical raw
+        records have identical entries), keeping the records both files decoded so far. Returns whether they are shared.
+        """
+        if self.header != other.header:
+            return False
+        if self.records is not other.records:
+            other.records.update(self.records)
+            self.records = other.records
+        return True
+
+    def get_record(self, record_idx: int) -> DecodedRecord:
+        """
+        Returns the entries, normalized entries and fingerprint of a record; records are cached by their raw bytes,
+        so only records with unknown content are decoded.
+        """
+        raw_record = self.data[self.starts[record_idx] : self.ends[record_idx]]
+        decoded_record = self.records.get(raw_record)
+        if decoded_record is None:
+            record = next(csv.reader([raw_record.decode("utf-8")]))
+            entries = _get_entries(record, self.column_indices, self.qualifier_idx)
+            if self.string_pool is not None:
+                entries = self.string_pool.intern_entries(entries)
+            normalized_entries = tuple(map(normalize_entries, entries))
+            decoded_record = tuple(entries), normalized_entries, _get_fingerprint(normalized_entries)
+            self.records[raw_record] = decoded_record
+        return decoded_record
+
+    def get_rows(self) -> list[LazyAhbRowData]:
+        """
+        Returns a lazy row for every record.
+        """
+        return [LazyAhbRowData(self, record_idx) for record_idx in range(len(self))]
+
+
+def iter_csv_rows(file_path: Path, formatversion: str, string_pool: StringPool | None = None) -> Iterator[AhbRowData]:
+    """
+    Lazily read AHB csv content as lightweight AhbRowData without validation, one row at a time.
+    """
+    if string_pool is not None:
+        formatversion = string_pool.intern(formatversion)
+
+    records: Iterable[list[str | None]] = _iter_csv_entries(file_path)
+    if string_pool is not None:
+        records = map(string_pool.intern_entries, records)
+    for entries in records:
+        yield AhbRowData.from_entries(formatversion, entries)
+
+
+def _read_cached_rows(
+    file_path: Path, formatversion: str, string_pool: StringPool | None, parse_cache: CsvParseCache, validated: bool
+) -> list[AhbRowData] | None:
+    """
+    Create the rows of a csv file from its parse cache entry, if there is a valid one.
+    """
+    rows_entries = parse_cache.get(file_path, validated)
+    if rows_entries is None:
+        return None
+    if string_pool is not None:
+        formatversion = string_pool.intern(formatversion)
+        rows_entries = list(map(string_pool.intern_entries, rows_entries))
+    return [AhbRowData.from_entries(formatversion, entries) for entries in rows_entries]
+
+
+def read_csv_rows(
+    file_path: Path,
+    formatversion: str,
+    string_pool: StringPool | None = None,
+    parse_cache: CsvParseCache | None = None,
+) -> list[AhbRowData]:
+    """
+    Read AHB csv content as lightweight AhbRowData without validation.
+    If a `parse_cache` is given, the csv file is only parsed if it has no valid cache entry.
+    """
+    if parse_cache is None:
+        return list(iter_csv_rows(file_path, formatversion, string_pool))
+
+    ahb_rows = _read_cached_rows(file_path, formatversion, string_pool, parse_cache, validated=False)
+    if ahb_rows is None:
+        ahb_rows = list(iter_csv_rows(file_path, formatversion, string_pool))
+        parse_cache.put(file_path, [row.get_entries() for row in ahb_rows], validated=False)
+    return ahb_rows
+
+
+def iter_csv_content(
+    file_path: Path, formatversion: str, string_pool: StringPool | None = None, trusted: bool = False
+) -> Iterator[AhbRow]:
+    """
+    Lazily read and convert AHB csv content to AhbRow models, one row at a time.
+    If a `string_pool` is given, all rows share a single string object per distinct cell value.
+    If the input is `trusted` (e.g. generated by kohlr_AHB_i), rows are read as plain lists and constructed without
+    pydantic validation, but with the same stripping and rejection of empty ahb_expressions as validated rows.
+    """
+    if string_pool is not None:
+        formatversion = string_pool.intern(formatversion)
+
+    if trusted:
+        yield from map(AhbRow.from_row_data, iter_csv_rows(file_path, formatversion, string_pool))
+        return
+
     with open(file_path, encoding="utf-8", newline="") as csvfile:
         reader = csv.DictReader(csvfile)
-        for row in reader:
+        rows: Iterable[Mapping[str, str | None]] = (
+            reader if string_pool is None else map(string_pool.intern_values, reader)
+        )
+        for row in rows:
             ahb_row = AhbRow(
                 formatversion=formatversion,
                 section_name=row["Segmentname"],
@@ -37,30 +286,146 @@ def read_csv_content(file_path: Path, formatversion: str) -> list[AhbRow]:
                 ahb_expression=row.get("Bedingungsausdruck"),
                 conditions=row.get("Bedingung"),
             )
-            rows.append(ahb_row)
-    return rows
+            # normalize and fingerprint each row once while loading instead of during every comparison
+            _ = ahb_row.fingerprint
+            yield ahb_row
+
+
+def read_csv_content(
+    file_path: Path,
+    formatversion: str,
+    string_pool: StringPool | None = None,
+    trusted: bool = False,
+    parse_cache: CsvParseCache | None = None,
+) -> list[AhbRow]:
+    """
+    Read and convert AHB csv content to AhbRow models.
+    If a `parse_cache` is given, the csv file is only parsed if it has no valid cache entry. Cached rows are not
+    validated again, but entries stored without validation (`trusted`) are only used for trusted input.
+    """
+    if parse_cache is None:
+        return list(iter_csv_content(file_path, formatversion, string_pool, trusted))
+
+    cached_rows = _read_cached_rows(file_path, formatversion, string_pool, parse_cache, validated=not trusted)
+    if cached_rows is not None:
+        return list(map(AhbRow.from_row_data, cached_rows))
+
+    ahb_rows = list(iter_csv_content(file_path, formatversion, string_pool, trusted))
+    parse_cache.put(
+        file_path,
+        [[getattr(ahb_row, entry) for entry in AHB_COLUMN_NAMES] for ahb_row in ahb_rows],
+        validated=not trusted,
+    )
+    return ahb_rows
+
+
+def validate_ahb_rows(ahb_rows: Sequence[AhbRow]) -> None:
+    """
+    Validate rows that were created without validation (e.g. by `AhbRow.model_construct`) in a single batch.
+    Raises a pydantic ValidationError (a ValueError) listing all invalid rows.
+    Rows loaded by `iter_csv_content` already satisfy the constraints of validated rows, hence `process_ahb_files`
+    does not call this function; it is part of the library API only.
+    """
+    _AHB_ROWS_ADAPTER.validate_python([ahb_row.model_dump() for ahb_row in ahb_rows])
 
 
 def load_csv_files(
-    previous_ahb_path: Path, subsequent_ahb_path: Path, previous_formatversion: str, subsequent_formatversion: str
+    previous_ahb_path: Path,
+    subsequent_ahb_path: Path,
+    previous_formatversion: str,
+    subsequent_formatversion: str,
+    string_pool: StringPool | None = None,
+    trusted: bool = False,
+    parse_cache: CsvParseCache | None = None,
 ) -> tuple[list[AhbRow], list[AhbRow]]:
     """
     Load AHB csv content.
     """
 
-    previous_ahb_rows = read_csv_content(previous_ahb_path, previous_formatversion)
-    subsequent_ahb_rows = read_csv_content(subsequent_ahb_path, subsequent_formatversion)
+    previous_ahb_rows = read_csv_content(previous_ahb_path, previous_formatversion, string_pool, trusted, parse_cache)
+    subsequent_ahb_rows = read_csv_content(
+        subsequent_ahb_path, subsequent_formatversion, string_pool, trusted, parse_cache
+    )
 
     return previous_ahb_rows, subsequent_ahb_rows
 
 
-def export_to_csv(comparisons: list[AhbRowComparison], csv_path: Path) -> None:
+def read_csv_mapped(file_path: Path, formatversion: str, string_pool: StringPool | None = None) -> list[LazyAhbRowData]:
+    """
+    Read AHB csv content as a memory-mapped file without validation; rows are only decoded when accessed.
+    """
+    return MappedCsvFile(file_path, formatversion, string_pool).get_rows()
+
+
+def share_mapped_records(previous_ahb_rows: Sequence[AnyAhbRow], subsequent_ahb_rows: Sequence[AnyAhbRow]) -> None:
+    """
+    Share the decoded records of the memory-mapped files of two AHBs (see `MappedCsvFile.share_records`).
+    Rows that were not read from memory-mapped files are ignored.
+    """
+    if not previous_ahb_rows or not subsequent_ahb_rows:
+        return
+    previous_file = getattr(previous_ahb_rows[0], "source", None)
+    subsequent_file = getattr(subsequent_ahb_rows[0], "source", None)
+    if isinstance(previous_file, MappedCsvFile) and isinstance(subsequent_file, MappedCsvFile):
+        subsequent_file.share_records(previous_file)
+
+
+def close_mapped_file(ahb_rows: Sequence[AnyAhbRow]) -> None:
+    """
+    Close the memory-mapped file that the rows of an AHB were read from (see `MappedCsvFile.close`).
+    Rows that were not read from a memory-mapped file are ignored.
+    """
+    source = getattr(ahb_rows[0], "source", None) if ahb_rows else None
+    if isinstance(source, MappedCsvFile):
+        source.close()
+
+
+def load_csv_mapped(
+    previous_ahb_path: Path,
+    subsequent_ahb_path: Path,
+    previous_formatversion: str,
+    subsequent_formatversion: str,
+    string_pool: StringPool | None = None,
+) -> tuple[list[LazyAhbRowData], list[LazyAhbRowData]]:
+    """
+    Load AHB csv content as memory-mapped files without validation; rows are only decoded when accessed.
+    """
+    previous_ahb_rows = read_csv_mapped(previous_ahb_path, previous_formatversion, string_pool)
+    subsequent_ahb_rows = read_csv_mapped(subsequent_ahb_path, subsequent_formatversion, string_pool)
+    share_mapped_records(previous_ahb_rows, subsequent_ahb_rows)
+
+    return previous_ahb_rows, subsequent_ahb_rows
+
+
+def load_csv_rows(
+    previous_ahb_path: Path,
+    subsequent_ahb_path: Path,
+    previous_formatversion: str,
+    subsequent_formatversion: str,
+    string_pool: StringPool | None = None,
+    parse_cache: CsvParseCache | None = None,
+) -> tuple[list[AhbRowData], list[AhbRowData]]:
+    """
+    Load AHB csv content as lightweight AhbRowData without validation.
+    """
+    previous_ahb_rows = read_csv_rows(previous_ahb_path, previous_formatversion, string_pool, parse_cache)
+    subsequent_ahb_rows = read_csv_rows(subsequent_ahb_path, subsequent_formatversion, string_pool, parse_cache)
+
+    return previous_ahb_rows, subsequent_ahb_rows
+
+
+def export_to_csv(comparisons: Iterable[AhbRowComparison], csv_path: Path) -> None:
     """
     Exports the merged AHBs as csv.
+    Comparisons are written one by one, so they can also be passed as a generator (see `iter_align_ahb_rows`).
     """
+    comparisons_iterator = iter(comparisons)
+    first_comp = next(comparisons_iterator, None)
+    if first_comp is None:
+        raise ValueError(f"❌ No comparisons to export to {csv_path}")
+
     with open(csv_path, "w", encoding="utf-8", newline="") as f:
         writer = csv.writer(f)
-        first_comp = comparisons[0]
         previous_fv = first_comp.previous_formatversion.formatversion
         subsequent_fv = first_comp.subsequent_formatversion.formatversion
 
@@ -88,7 +453,7 @@ def export_to_csv(comparisons: list[AhbRowComparison], csv_path: Path) -> None:
         ]
         writer.writerow(headers)
 
-        for row_num, comp in enumerate(comparisons, start=1):
+        for row_num, comp in enumerate(chain([first_comp], comparisons_iterator), start=1):
             row = [
                 str(row_num),  # column for row numbering to preserve the AHB properties order
                 comp.previous_formatversion.section_name or "",
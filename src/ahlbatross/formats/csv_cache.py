@@ -0,0 +1,241 @@
+"""
+Persistent on-disk cache of parsed AHB csv files.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from ahlbatross.utils.xlsx_formatting import AHB_COLUMN_NAMES
+
+logger = logging.getLogger(__name__)
+
+# increase whenever the layout of cache entries or the parsing of csv files changes
+_CACHE_FORMAT_VERSION = 2
+# magic bytes, format version and length of the json metadata at the start of every entry
+_CACHE_ENTRY_HEADER = struct.Struct("<8sIQ")
+_CACHE_ENTRY_MAGIC = b"AHBCACHE"
+_CACHE_ENTRY_SUFFIX = ".ahbcache"
+_DEFAULT_MAX_CACHE_SIZE = 512 * 1024 * 1024  # bytes
+_READ_CHUNK_SIZE = 1024 * 1024  # bytes
+
+
+def _get_content_hash(file_path: Path) -> str:
+    """
+    Returns the blake2b hash of the content of a file.
+    """
+    content_hash = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as file:
+        while chunk := file.read(_READ_CHUNK_SIZE):
+            content_hash.update(chunk)
+    return content_hash.hexdigest()
+
+
+def _serialize_entry(metadata: dict[str, Any], codes: "array[int]") -> bytes:
+    """
+    Serializes a cache entry: a fixed header, the json metadata (including the string table) and the codes as
+    little-endian unsigned integers.
+    """
+    encoded_metadata = json.dumps(metadata, ensure_ascii=False).encode("utf-8")
+    if sys.byteorder == "big":
+        codes = array(codes.typecode, codes)
+        codes.byteswap()
+    return (
+        _CACHE_ENTRY_HEADER.pack(_CACHE_ENTRY_MAGIC, _CACHE_FORMAT_VERSION, len(encoded_metadata))
+        + encoded_metadata
+        + codes.tobytes()
+    )
+
+
+def _deserialize_entry(content: bytes) -> tuple[dict[str, Any], "array[int]"]:
+    """
+    Deserializes a cache entry; raises a ValueError if it has an unknown format or is incomplete.
+    """
+    try:
+        magic, cache_format_version, metadata_length = _CACHE_ENTRY_HEADER.unpack_from(content)
+    except struct.error as e:
+        raise ValueError("truncated cache entry header") from e
+    if magic != _CACHE_ENTRY_MAGIC or cache_format_version != _CACHE_FORMAT_VERSION:
+        raise ValueError("unknown cache entry format")
+    metadata_end = _CACHE_ENTRY_HEADER.size + metadata_length
+    metadata = json.loads(content[_CACHE_ENTRY_HEADER.size : metadata_end])
+    codes = array("I")
+    codes.frombytes(content[metadata_end:])
+    if sys.byteorder == "big":
+        codes.byteswap()
+    if not isinstance(metadata, dict) or any(code >= len(metadata["strings"]) for code in codes):
+        raise ValueError("inconsistent cache entry")
+    return metadata, codes
+
+
+class CsvParseCache:
+    """
+    Stores the parsed entries of AHB csv files (ordered like `AHB_COLUMN_NAMES`) in a cache directory, so that
+    repeated runs over the same files skip parsing. Every file gets its own entry, which consists of json metadata
+    with a string table and an array of codes into it; entries contain data only and are never unpickled.
+    Entries are keyed by the path of the csv file and only used if size and mtime of the file are unchanged or,
+    if the mtime changed (e.g. on a fresh checkout), its content hash is unchanged.
+    If the cache exceeds `max_size` bytes, the least recently used entries are evicted. The size of the cache is
+    determined once when it is opened and then tracked in memory.
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int = _DEFAULT_MAX_CACHE_SIZE) -> None:
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self._entry_sizes = {entry_path: size for _, size, entry_path in self._scan_entries()}
+        self._cache_size = sum(self._entry_sizes.values())
+
+    def _get_entry_path(self, file_path: Path) -> Path:
+        path_hash = hashlib.blake2b(str(file_path.resolve()).encode("utf-8"), digest_size=16).hexdigest()
+        return self.cache_dir / f"{path_hash}{_CACHE_ENTRY_SUFFIX}"
+
+    def get(self, file_path: Path, validated: bool = True) -> list[list[str | None]] | None:
+        """
+        Returns the cached entries of all rows of a csv file or None if there is no valid cache entry.
+        If `validated` is set, only entries of rows that passed validation when they were stored are returned.
+        """
+        entry_path = self._get_entry_path(file_path)
+        try:
+            metadata, codes = _deserialize_entry(entry_path.read_bytes())
+            strings: list[str | None] = metadata["strings"]
+            file_stat = file_path.stat()
+            is_current = (
+                metadata["file_path"] == str(file_path.resolve())
+                and metadata["size"] == file_stat.st_size
+                and (metadata["validated"] or not validated)
+            )
+            mtime_ns = file_stat.st_mtime_ns
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.debug("Ignoring invalid cache entry %s: %s", entry_path, str(e))
+            self.misses += 1
+            return None
+
+        if not is_current or (
+            mtime_ns != metadata["mtime_ns"] and metadata["content_hash"] != _get_content_hash(file_path)
+        ):
+            self.misses += 1
+            return None
+        try:
+            if mtime_ns != metadata["mtime_ns"]:
+                # remember the new mtime to skip hashing next time
+                self._write_entry(entry_path, {**metadata, "mtime_ns": mtime_ns}, codes)
+            else:
+                # mark the entry as recently used
+                os.utime(entry_path)
+        except OSError as e:
+            logger.debug("Could not update cache entry %s: %s", entry_path, str(e))
+
+        self.hits += 1
+        column_count = len(AHB_COLUMN_NAMES)
+        return [
+            [strings[code] for code in codes[row_start : row_start + column_count]]
+            for row_start in range(0, len(codes), column_count)
+        ]
+
+    def get_content_hash(self, file_path: Path) -> str | None:
+        """
+        Returns the content hash stored for a csv file if its size and mtime are unchanged, otherwise None.
+        Only the metadata of the cache entry is read and the hit and miss counts are not changed.
+        """
+        entry_path = self._get_entry_path(file_path)
+        try:
+            with open(entry_path, "rb") as entry_file:
+                magic, cache_format_version, metadata_length = _CACHE_ENTRY_HEADER.unpack(
+                    entry_file.read(_CACHE_ENTRY_HEADER.size)
+                )
+                if magic != _CACHE_ENTRY_MAGIC or cache_format_version != _CACHE_FORMAT_VERSION:
+                    return None
+                metadata = json.loads(entry_file.read(metadata_length))
+            file_stat = file_path.stat()
+            if (
+                metadata["file_path"] != str(file_path.resolve())
+                or metadata["size"] != file_stat.st_size
+                or metadata["mtime_ns"] != file_stat.st_mtime_ns
+            ):
+                return None
+            content_hash: str = metadata["content_hash"]
+        except (OSError, ValueError, KeyError, TypeError, struct.error) as e:
+            logger.debug("No content hash cached for %s: %s", file_path, str(e))
+            return None
+        return content_hash
+
+    def put(self, file_path: Path, rows_entries: Sequence[Sequence[str | None]], validated: bool = True) -> None:
+        """
+        Stores the entries of all rows of a csv file and evicts the least recently used entries if the cache is full.
+        """
+        strings: list[str | None] = [None]
+        string_codes: dict[str | None, int] = {None: 0}
+        codes = array("I")
+        for entries in rows_entries:
+            for value in entries:
+                code = string_codes.get(value)
+                if code is None:
+                    code = string_codes[value] = len(strings)
+                    strings.append(value)
+                codes.append(code)
+
+        try:
+            file_stat = file_path.stat()
+            metadata = {
+                "file_path": str(file_path.resolve()),
+                "size": file_stat.st_size,
+                "mtime_ns": file_stat.st_mtime_ns,
+                "content_hash": _get_content_hash(file_path),
+                "validated": validated,
+                "strings": strings,
+            }
+            self._write_entry(self._get_entry_path(file_path), metadata, codes)
+            if self._cache_size > self.max_size:
+                self._evict()
+        except OSError as e:
+            logger.warning("❗️ Could not write cache entry for %s: %s", file_path, str(e))
+
+    def _write_entry(self, entry_path: Path, metadata: dict[str, Any], codes: "array[int]") -> None:
+        content = _serialize_entry(metadata, codes)
+        # write to a temporary file first, so that concurrent runs never read partially written entries
+        with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as entry_file:
+            entry_file.write(content)
+        os.replace(entry_file.name, entry_path)
+        self._cache_size += len(content) - self._entry_sizes.get(str(entry_path), 0)
+        self._entry_sizes[str(entry_path)] = len(content)
+
+    def _scan_entries(self) -> list[tuple[int, int, str]]:
+        """
+        Returns the mtime, size and path of all entries in the cache directory.
+        """
+        entries = []
+        with os.scandir(self.cache_dir) as dir_entries:
+            for dir_entry in dir_entries:
+                if dir_entry.name.endswith(_CACHE_ENTRY_SUFFIX):
+                    entry_stat = dir_entry.stat()
+                    entries.append((entry_stat.st_mtime_ns, entry_stat.st_size, dir_entry.path))
+        return entries
+
+    def _evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache does not exceed its maximum size.
+        The cache directory is scanned again, since other runs may have added or removed entries meanwhile.
+        """
+        entries = self._scan_entries()
+        self._entry_sizes = {entry_path: size for _, size, entry_path in entries}
+        self._cache_size = sum(self._entry_sizes.values())
+        for _, size, entry_path in sorted(entries):
+            if self._cache_size <= self.max_size:
+                break
+            Path(entry_path).unlink(missing_ok=True)
+            del self._entry_sizes[entry_path]
+            self._cache_size -= size
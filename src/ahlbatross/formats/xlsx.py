@@ -12,6 +12,7 @@ from xlsxwriter.worksheet import Worksheet  # type: ignore
 from ahlbatross.enums.diff_types import DiffType
 from ahlbatross.logger import logger
 from ahlbatross.models.ahb import AhbRow, AhbRowComparison, AhbRowDiff
+from ahlbatross.utils.string_formatting import TextSegment, get_intra_cell_diff
 from ahlbatross.utils.xlsx_formatting import (
     ADDED_LABEL_FORMAT,
     ADDED_LABEL_HIGHLIGHTING,
@@ -24,15 +25,22 @@ from ahlbatross.utils.xlsx_formatting import (
     HEADER_FORMAT,
     MODIFIED_LABEL_FORMAT,
     MODIFIED_LABEL_HIGHLIGHTING,
+    MOVED_LABEL_FORMAT,
+    MOVED_LABEL_HIGHLIGHTING,
+    PREVIOUS_TEXT_CHANGE_FORMAT,
     REMOVED_LABEL_FORMAT,
     REMOVED_LABEL_HIGHLIGHTING,
     ROW_NUMBERING_FORMAT,
+    SUBSEQUENT_TEXT_CHANGE_FORMAT,
 )
 
 FormatDict = dict[str, Format]
 
 _DEFAULT_COLUMN_INDEX_THRESHOLD = 10
 
+# columns with free text whose modified cells are highlighted word by word
+_INTRA_CELL_DIFF_COLUMN_INDICES = {AHB_COLUMN_NAMES.index("name"), AHB_COLUMN_NAMES.index("conditions")}
+
 
 def _format_headers_during_comparison(sample: AhbRowComparison) -> list[str]:
     """
@@ -110,24 +118,17 @@ def _write_row_entries(
     highlight_segmentname: FormatDict,
     base_format: Format,
     _is_previous_formatversion: bool = True,
+    counterpart_row: AhbRow | None = None,
+    changed_text_format: Format | None = None,
 ) -> None:
     """
     Writes entries to cells row by row.
+    Modified text cells are written as rich strings that highlight the changed words compared to `counterpart_row`.
     """
+    values = _get_row_values(row)
+    counterpart_values = _get_row_values(counterpart_row) if counterpart_row is not None else None
 
-    values = [
-        row.section_name or "",
-        row.segment_group_key or "",
-        row.segment_code or "",
-        row.data_element or "",
-        row.segment_id or "",
-        row.value_pool_entry or "",
-        row.name or "",
-        row.ahb_expression or "",
-        row.conditions or "",
-    ]
-
-    for col_offset, (column_name, value) in enumerate(zip(AHB_COLUMN_NAMES, values, strict=True)):
+    for col_offset, value in enumerate(values):
         col = start_col + col_offset
         is_segmentname = col_offset == 0
         format_to_use = _determine_segmentname_format(
@@ -138,12 +139,65 @@ def _write_row_entries(
             highlight_segmentname=highlight_segmentname,
             base_format=base_format,
             is_previous_formatversion=_is_previous_formatversion,
-            column_name=f"{column_name}_{row.formatversion}",
-            changed_entries=diff.changed_entries,
+            column_index=col_offset,
+            changed_columns=diff.changed_columns,
         )
+        if (
+            counterpart_values is not None
+            and changed_text_format is not None
+            and diff.diff_type == DiffType.MODIFIED
+            and col_offset in _INTRA_CELL_DIFF_COLUMN_INDICES
+            and diff.changed_columns & (1 << col_offset)
+        ):
+            intra_cell_diff = (
+                get_intra_cell_diff(value, counterpart_values[col_offset])
+                if _is_previous_formatversion
+                else get_intra_cell_diff(counterpart_values[col_offset], value)
+            )
+            if intra_cell_diff is not None:
+                segments = intra_cell_diff[0] if _is_previous_formatversion else intra_cell_diff[1]
+                if len(segments) > 1:
+                    _write_rich_text(worksheet, row_num, col, segments, changed_text_format, format_to_use)
+                    continue
         worksheet.write(row_num, col, str(value), format_to_use)
 
 
+def _get_row_values(row: AhbRow) -> list[str]:
+    """
+    Returns the cell texts of a row in the order of `AHB_COLUMN_NAMES`.
+    """
+    return [
+        row.section_name or "",
+        row.segment_group_key or "",
+        row.segment_code or "",
+        row.data_element or "",
+        row.segment_id or "",
+        row.value_pool_entry or "",
+        row.name or "",
+        row.ahb_expression or "",
+        row.conditions or "",
+    ]
+
+
+def _write_rich_text(
+    worksheet: Worksheet,
+    row_num: int,
+    col: int,
+    segments: tuple[TextSegment, ...],
+    changed_text_format: Format,
+    cell_format: Format,
+) -> None:
+    """
+    Writes a cell as rich string in which the changed text segments are highlighted.
+    """
+    fragments: list[Format | str] = []
+    for text, is_changed in segments:
+        if is_changed:
+            fragments.append(changed_text_format)
+        fragments.append(text)
+    worksheet.write_rich_string(row_num, col, *fragments, cell_format)
+
+
 # pylint:disable=too-many-arguments, too-many-positional-arguments, too-many-return-statements
 def _determine_segmentname_format(
     diff_type: str,
@@ -153,8 +207,8 @@ def _determine_segmentname_format(
     highlight_segmentname: FormatDict,
     base_format: Format,
     is_previous_formatversion: bool = True,
-    column_name: str = "",
-    changed_entries: list[str] | None = None,
+    column_index: int = -1,
+    changed_columns: int = 0,
 ) -> Format:
     """
     Determines the appropriate format for `Segmentname` cells depending on whether they are affected by DIFFs
@@ -170,10 +224,15 @@ def _determine_segmentname_format(
             return highlight_segmentname[diff_type]
         return diff_formats[diff_type]
 
+    if diff_type == DiffType.MOVED.value:
+        # relocated rows are highlighted on both sides since their content is identical
+        if is_segmentname and is_new_segment:
+            return highlight_segmentname[diff_type]
+        return diff_formats[diff_type]
+
     if diff_type == DiffType.MODIFIED.value:
-        changed_entries = changed_entries or []
         # always highlighted modified cells yellow, regardless of whether it's a new segment or not
-        if column_name in changed_entries:
+        if column_index >= 0 and changed_columns & (1 << column_index):
             return diff_formats[diff_type]
 
     if is_new_segment:
@@ -193,6 +252,7 @@ def _create_diff_label_highlighting_formats(workbook: Workbook) -> FormatDict:
         DiffType.ADDED.value: workbook.add_format(ADDED_LABEL_HIGHLIGHTING),
         DiffType.REMOVED.value: workbook.add_format(REMOVED_LABEL_HIGHLIGHTING),
         DiffType.MODIFIED.value: workbook.add_format(MODIFIED_LABEL_HIGHLIGHTING),
+        DiffType.MOVED.value: workbook.add_format(MOVED_LABEL_HIGHLIGHTING),
         "segmentname_changed": workbook.add_format(ALTERING_SEGMENTNAME_FORMAT),
         "": workbook.add_format(CELL_FORMAT),
     }
@@ -206,6 +266,7 @@ def _create_diff_label_text_formats(workbook: Workbook) -> FormatDict:
         DiffType.ADDED.value: workbook.add_format(ADDED_LABEL_FORMAT),
         DiffType.REMOVED.value: workbook.add_format(REMOVED_LABEL_FORMAT),
         DiffType.MODIFIED.value: workbook.add_format(MODIFIED_LABEL_FORMAT),
+        DiffType.MOVED.value: workbook.add_format(MOVED_LABEL_FORMAT),
         "": workbook.add_format(DIFF_COLUMN_FORMAT),
     }
 
@@ -218,6 +279,7 @@ def _create_segmentname_highlight_formats(workbook: Workbook) -> FormatDict:
         DiffType.ADDED.value: workbook.add_format({**ADDED_LABEL_HIGHLIGHTING, "bold": True}),
         DiffType.REMOVED.value: workbook.add_format({**REMOVED_LABEL_HIGHLIGHTING, "bold": True}),
         DiffType.MODIFIED.value: workbook.add_format({**MODIFIED_LABEL_HIGHLIGHTING, "bold": True}),
+        DiffType.MOVED.value: workbook.add_format({**MOVED_LABEL_HIGHLIGHTING, "bold": True}),
         "segmentname_changed": workbook.add_format({**ALTERING_SEGMENTNAME_FORMAT, "bold": True}),
         "": workbook.add_format({**CELL_FORMAT, "bold": True}),
     }
@@ -264,6 +326,8 @@ def _process_worksheet(
     diff_formats = _create_diff_label_highlighting_formats(workbook)
     highlight_segmentname = _create_segmentname_highlight_formats(workbook)
     diff_text_formats = _create_diff_label_text_formats(workbook)
+    previous_text_change_format = workbook.add_format(PREVIOUS_TEXT_CHANGE_FORMAT)
+    subsequent_text_change_format = workbook.add_format(SUBSEQUENT_TEXT_CHANGE_FORMAT)
 
     # Write headers
     for col, header in enumerate(headers):
@@ -289,6 +353,8 @@ def _process_worksheet(
             highlight_segmentname=highlight_segmentname,
             base_format=base_format,
             _is_previous_formatversion=True,
+            counterpart_row=comp.subsequent_formatversion,
+            changed_text_format=previous_text_change_format,
         )
 
         # DIFF column
@@ -307,6 +373,8 @@ def _process_worksheet(
             highlight_segmentname=highlight_segmentname,
             base_format=base_format,
             _is_previous_formatversion=False,
+            counterpart_row=comp.previous_formatversion,
+            changed_text_format=subsequent_text_change_format,
         )
 
     _set_column_widths(worksheet, headers)
@@ -9,14 +9,18 @@ from pathlib import Path
 import typer
 from rich.console import Console
 
+from ahlbatross.core.ahb_catalog import AhbCatalogFilter
 from ahlbatross.core.ahb_multicomparison import multicompare_command
-from ahlbatross.core.ahb_processing import process_ahb_files
+from ahlbatross.core.ahb_processing import PipelineConcurrency, process_ahb_files
+from ahlbatross.enums.alignment_algorithms import AlignmentAlgorithm
 
 logger = logging.getLogger(__name__)
 
 app = typer.Typer(help="ahlbatross diffs machine-readable AHBs")
 err_console = Console(stderr=True)  # https://typer.tiangolo.com/tutorial/printing/#printing-to-standard-error
 
+_ALGORITHM_HELP = "Algorithm used to align the rows of two AHBs before comparing them."
+
 
 @app.command()
 def compare(
@@ -24,6 +28,62 @@ def compare(
     output_dir: Path = typer.Option(
         ..., "--output-dir", "-o", help="Destination path to output directory containing processed files."
     ),
+    algorithm: AlignmentAlgorithm = typer.Option(AlignmentAlgorithm.GREEDY, "--algorithm", "-a", help=_ALGORITHM_HELP),
+    skip_unchanged: bool = typer.Option(
+        False, "--skip-unchanged", help="Do not export PIDs without any changes between two formatversions."
+    ),
+    detect_moved_rows: bool = typer.Option(
+        False, "--detect-moves", help="Label relocated rows as moved instead of removed and added."
+    ),
+    trusted_input: bool = typer.Option(
+        False, "--trusted-input", help="Skip the validation of csv rows, e.g. for AHBs generated by kohlr_AHB_i."
+    ),
+    memory_map: bool = typer.Option(
+        False,
+        "--memory-map",
+        help="Memory-map csv files and only decode rows when needed (implies --trusted-input), e.g. for large AHBs.",
+    ),
+    cache_dir: Path | None = typer.Option(
+        None,
+        "--cache-dir",
+        help="Directory to cache parsed csv files in, so that unchanged files are not parsed again.",
+    ),
+    prefetch_depth: int = typer.Option(
+        0,
+        "--prefetch",
+        min=0,
+        help="Number of upcoming PIDs to load in the background while the current one is compared.",
+    ),
+    jobs: int = typer.Option(1, "--jobs", "-j", min=1, help="Number of worker processes to compare PIDs in parallel."),
+    incremental: bool = typer.Option(
+        False, "--incremental", help="Skip PIDs whose inputs and settings did not change since the last run."
+    ),
+    prune_orphans: bool = typer.Option(
+        False, "--prune-orphans", help="Remove output files that do not belong to any compared PID."
+    ),
+    pipeline: bool = typer.Option(
+        False, "--pipeline", help="Load, align and export PIDs in concurrent stages instead of one after another."
+    ),
+    load_workers: int = typer.Option(
+        2, "--load-workers", min=1, help="Number of threads loading csv files with --pipeline."
+    ),
+    align_workers: int = typer.Option(
+        1, "--align-workers", min=1, help="Number of threads aligning PIDs with --pipeline."
+    ),
+    export_workers: int = typer.Option(
+        2, "--export-workers", min=1, help="Number of threads exporting csv and xlsx files with --pipeline."
+    ),
+    formatversions: list[str] | None = typer.Option(
+        None,
+        "--formatversion",
+        help="Only compare pairs of consecutive formatversions of which one matches this glob pattern (repeatable).",
+    ),
+    nachrichtenformate: list[str] | None = typer.Option(
+        None, "--nachrichtenformat", help="Only compare nachrichtenformate matching this glob pattern (repeatable)."
+    ),
+    pruefids: list[str] | None = typer.Option(
+        None, "--pruefid", help="Only compare PIDs matching this glob pattern, e.g. 5500? (repeatable)."
+    ),
 ) -> None:
     """
     Main entrypoint for AHlBatross.
@@ -32,7 +92,32 @@ def compare(
         if not input_dir.exists():
             logger.error("❌ Input directory does not exist: %s", input_dir.absolute())
             sys.exit(1)
-        process_ahb_files(input_dir, output_dir)
+        process_ahb_files(
+            input_dir,
+            output_dir,
+            algorithm=algorithm,
+            skip_unchanged=skip_unchanged,
+            detect_moved_rows=detect_moved_rows,
+            trusted_input=trusted_input,
+            memory_map=memory_map,
+            cache_dir=cache_dir,
+            prefetch_depth=prefetch_depth,
+            jobs=jobs,
+            incremental=incremental,
+            prune_orphans=prune_orphans,
+            pipeline=(
+                PipelineConcurrency(load=load_workers, align=align_workers, export=export_workers) if pipeline else None
+            ),
+            catalog_filter=(
+                AhbCatalogFilter(
+                    formatversions=tuple(formatversions or ()),
+                    nachrichtenformate=tuple(nachrichtenformate or ()),
+                    pruefids=tuple(pruefids or ()),
+                )
+                if formatversions or nachrichtenformate or pruefids
+                else None
+            ),
+        )
     except FileNotFoundError as e:
         logger.error("❌ Path error: %s", str(e))
         sys.exit(1)
@@ -53,11 +138,12 @@ def multicompare(
     output_dir: Path = typer.Option(
         ..., "--output-dir", "-o", help="Destination path to output directory containing processed files."
     ),
+    algorithm: AlignmentAlgorithm = typer.Option(AlignmentAlgorithm.GREEDY, "--algorithm", "-a", help=_ALGORITHM_HELP),
 ) -> None:
     """
     Interactive command to compare two PIDs within the same format version.
     """
-    multicompare_command(input_dir, output_dir)
+    multicompare_command(input_dir, output_dir, algorithm)
 
 
 def cli() -> None:
@@ -2,23 +2,18 @@
 Classes that are used to compare AHBs between two formatversions row by row and assemble the output table.
 """
 
-from dataclasses import dataclass
+from array import array
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
 
 from kohlrahbi.models.anwendungshandbuch import AhbLine
 from pydantic import BaseModel, Field
 
 from ahlbatross.enums.diff_types import DiffType
-
-
-@dataclass(frozen=True)
-class AhbRowKey:
-    """
-    Business key to identify corresponding AhbRow's between formatversions.
-    """
-
-    segment_group_key: str | None
-    segment_code: str | None
-    data_element: str | None
+from ahlbatross.models.ahb_row_data import AhbRowData, AhbRowKey, LazyAhbRowData, _get_fingerprint
+from ahlbatross.utils.string_formatting import normalize_entries
+from ahlbatross.utils.xlsx_formatting import AHB_COLUMN_NAMES
 
 
 class AhbRow(AhbLine):
@@ -46,6 +41,70 @@ class AhbRow(AhbLine):
             segment_group_key=self.segment_group_key, segment_code=self.segment_code, data_element=self.data_element
         )
 
+    @classmethod
+    def from_row_data(cls, row_data: AhbRowData | LazyAhbRowData) -> "AhbRow":
+        """
+        Converts an `AhbRowData` (or `LazyAhbRowData`) into an AhbRow without validating it again, including its
+        normalized entries and fingerprint.
+        """
+        ahb_expression = row_data.ahb_expression
+        if ahb_expression is not None:
+            # the only transformation (and constraint) the validation of `AhbLine` applies to its entries
+            ahb_expression = ahb_expression.strip()
+            if not ahb_expression:
+                raise ValueError(f"❌ Invalid empty ahb_expression in row: {row_data.get_entries()}")
+        entries: dict[str, str | None] = dict(zip(AHB_COLUMN_NAMES, row_data.get_entries(), strict=True))
+        entries["ahb_expression"] = ahb_expression
+        ahb_row = cls.model_construct(None, formatversion=row_data.formatversion, **entries)
+        # prime the cached properties `normalized_entries` and `fingerprint`
+        vars(ahb_row).update(normalized_entries=row_data.normalized_entries, fingerprint=row_data.fingerprint)
+        return ahb_row
+
+    @cached_property
+    def normalized_entries(self) -> tuple[str, ...]:
+        """
+        Returns the entries of all AHB properties (ordered like `AHB_COLUMN_NAMES`) without whitespaces.
+        Computed once per row, hence rows must not be modified after accessing it.
+        """
+        return tuple(normalize_entries(getattr(self, entry)) for entry in AHB_COLUMN_NAMES)
+
+    @cached_property
+    def fingerprint(self) -> int:
+        """
+        Returns a 64-bit fingerprint of the normalized entries; rows with equal fingerprints have equal content.
+        """
+        return _get_fingerprint(self.normalized_entries)
+
+
+# rows of either representation are accepted while aligning AHBs
+AnyAhbRow = AhbRow | AhbRowData | LazyAhbRowData
+
+
+@lru_cache(maxsize=4096)
+def _get_changed_entries(changed_columns: int, formatversions: tuple[str, str]) -> tuple[str, ...]:
+    """
+    Returns the changed entries (e.g. ("name_FV2410", "name_FV2504")) of a bitmask of changed columns.
+    """
+    return tuple(
+        f"{column_name}_{formatversion}"
+        for column_idx, column_name in enumerate(AHB_COLUMN_NAMES)
+        if changed_columns & (1 << column_idx)
+        for formatversion in formatversions
+    )
+
+
+@lru_cache(maxsize=4096)
+def _get_changed_columns_of_entries(changed_entries: tuple[str, ...]) -> int:
+    """
+    Returns the bitmask of changed columns of changed entries (e.g. ("name_FV2410", "name_FV2504")).
+    """
+    changed_columns = 0
+    for changed_entry in changed_entries:
+        column_name = changed_entry.rpartition("_")[0]
+        if column_name in AHB_COLUMN_NAMES:
+            changed_columns |= 1 << AHB_COLUMN_NAMES.index(column_name)
+    return changed_columns
+
 
 class AhbRowDiff(BaseModel):
     """
@@ -60,6 +119,25 @@ class AhbRowDiff(BaseModel):
         description="List of entries (single cells) that changed between two formatversions within a single row.",
     )
 
+    @property
+    def changed_columns(self) -> int:
+        """
+        Bitmask of entries (single cells) that changed within a single row: bit i is set if the column
+        `AHB_COLUMN_NAMES[i]` changed. Derived from `changed_entries`; entries of unknown columns are ignored.
+        """
+        return _get_changed_columns_of_entries(tuple(self.changed_entries))
+
+    @classmethod
+    def from_changed_columns(
+        cls, diff_type: DiffType, changed_columns: int, formatversions: tuple[str, str]
+    ) -> "AhbRowDiff":
+        """
+        Creates the diff of a bitmask of changed columns (see `changed_columns`) without validating it again.
+        """
+        return cls.model_construct(
+            diff_type=diff_type, changed_entries=list(_get_changed_entries(changed_columns, formatversions))
+        )
+
 
 class AhbRowComparison(BaseModel):
     """
@@ -76,3 +154,103 @@ class AhbRowComparison(BaseModel):
         Returns the business key for a given AhbRowComparison (previous_FV key should be equivalent to subsequent_FV).
         """
         return self.previous_formatversion.get_key()
+
+
+def _create_empty_row(formatversion: str) -> AhbRow:
+    """
+    Create an empty row (counterpart of ADDED and REMOVED rows).
+    """
+    return AhbRow(
+        formatversion=formatversion,
+        section_name="",
+        segment_group_key=None,
+        segment_code=None,
+        data_element=None,
+        segment_id=None,
+        value_pool_entry=None,
+        name=None,
+        ahb_expression=None,
+        conditions=None,
+    )
+
+
+def _create_ahb_row_comparison(
+    previous_row: AnyAhbRow | None, subsequent_row: AnyAhbRow | None, diff_type: DiffType, changed_columns: int = 0
+) -> AhbRowComparison:
+    """
+    Create the comparison of two aligned rows, where None marks an empty side (ADDED and REMOVED rows).
+    """
+    if isinstance(previous_row, (AhbRowData, LazyAhbRowData)):
+        previous_row = AhbRow.from_row_data(previous_row)
+    if isinstance(subsequent_row, (AhbRowData, LazyAhbRowData)):
+        subsequent_row = AhbRow.from_row_data(subsequent_row)
+
+    # empty rows carry the formatversion of their non-empty counterpart
+    if previous_row is None:
+        if subsequent_row is None:
+            raise ValueError("❌ Aligned row has neither a previous nor a subsequent row.")
+        previous_row = _create_empty_row(subsequent_row.formatversion)
+    elif subsequent_row is None:
+        subsequent_row = _create_empty_row(previous_row.formatversion)
+
+    return AhbRowComparison(
+        previous_formatversion=previous_row,
+        diff=AhbRowDiff.from_changed_columns(
+            diff_type, changed_columns, (previous_row.formatversion, subsequent_row.formatversion)
+        ),
+        subsequent_formatversion=subsequent_row,
+    )
+
+
+_DIFF_TYPES = list(DiffType)
+_DIFF_TYPE_CODES = {diff_type: code for code, diff_type in enumerate(_DIFF_TYPES)}
+
+
+@dataclass
+class AhbAlignment:
+    """
+    Compact alignment of two AHBs that refers back to the loaded rows of both formatversions.
+    Each aligned row consists of the entries at the same position of four parallel arrays:
+    row index of the previous and subsequent formatversion (-1 marks an empty side), diff type code
+    and bitmask of changed columns (bit i is set if `AHB_COLUMN_NAMES[i]` changed).
+    `AhbRowComparison` objects are only created when iterating over or indexing the alignment.
+    """
+
+    previous_ahb_rows: Sequence[AnyAhbRow]
+    subsequent_ahb_rows: Sequence[AnyAhbRow]
+    previous_indices: "array[int]" = field(default_factory=lambda: array("q"))
+    subsequent_indices: "array[int]" = field(default_factory=lambda: array("q"))
+    diff_codes: "array[int]" = field(default_factory=lambda: array("B"))
+    changed_columns: "array[int]" = field(default_factory=lambda: array("H"))
+
+    def append(self, previous_idx: int, subsequent_idx: int, diff_type: DiffType, changed_columns: int = 0) -> None:
+        """
+        Add an aligned row.
+        """
+        self.previous_indices.append(previous_idx)
+        self.subsequent_indices.append(subsequent_idx)
+        self.diff_codes.append(_DIFF_TYPE_CODES[diff_type])
+        self.changed_columns.append(changed_columns)
+
+    def get_diff_type(self, position: int) -> DiffType:
+        """
+        Returns the diff type of the aligned row at the given position.
+        """
+        return _DIFF_TYPES[self.diff_codes[position]]
+
+    def __len__(self) -> int:
+        return len(self.diff_codes)
+
+    def __getitem__(self, position: int) -> AhbRowComparison:
+        previous_idx = self.previous_indices[position]
+        subsequent_idx = self.subsequent_indices[position]
+        return _create_ahb_row_comparison(
+            self.previous_ahb_rows[previous_idx] if previous_idx >= 0 else None,
+            self.subsequent_ahb_rows[subsequent_idx] if subsequent_idx >= 0 else None,
+            self.get_diff_type(position),
+            self.changed_columns[position],
+        )
+
+    def __iter__(self) -> Iterator[AhbRowComparison]:
+        for position in range(len(self)):
+            yield self[position]
@@ -0,0 +1,290 @@
+"""
+Lightweight representation of AHB rows that is used to load and align AHBs without pydantic models.
+"""
+
+import hashlib
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Protocol
+
+from ahlbatross.utils.string_formatting import normalize_entries
+from ahlbatross.utils.xlsx_formatting import AHB_COLUMN_NAMES
+
+if TYPE_CHECKING:
+    from kohlrahbi.models.anwendungshandbuch import AhbLine
+
+    from ahlbatross.models.ahb import AhbRow
+
+# never part of a normalized entry since `normalize_entries` removes it as whitespace
+_FINGERPRINT_SEPARATOR = "\x1f"
+
+
+def _get_fingerprint(normalized_entries: Sequence[str]) -> int:
+    """
+    Returns a 64-bit fingerprint of the normalized entries of a row (see `AhbRow.fingerprint`).
+    """
+    content = _FINGERPRINT_SEPARATOR.join(normalized_entries).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(content, digest_size=8).digest())
+
+
+@dataclass(frozen=True)
+class AhbRowKey:
+    """
+    Business key to identify corresponding AhbRow's between formatversions.
+    """
+
+    segment_group_key: str | None
+    segment_code: str | None
+    data_element: str | None
+
+
+# pylint:disable=too-many-instance-attributes
+class AhbRowData:
+    """
+    Slotted counterpart of `AhbRow` that holds the same AHB properties without validation and without depending on
+    kohlrahbi. Normalized entries and fingerprint are computed on construction, hence rows must not be modified.
+    Use `AhbRowData.from_ahb_row` and `AhbRow.from_row_data` to convert between both representations.
+    """
+
+    __slots__ = (
+        "ahb_expression",
+        "conditions",
+        "data_element",
+        "fingerprint",
+        "formatversion",
+        "name",
+        "normalized_entries",
+        "section_name",
+        "segment_code",
+        "segment_group_key",
+        "segment_id",
+        "value_pool_entry",
+    )
+
+    # pylint:disable=too-many-arguments
+    def __init__(
+        self,
+        formatversion: str,
+        section_name: str | None = None,
+        segment_group_key: str | None = None,
+        segment_code: str | None = None,
+        data_element: str | None = None,
+        segment_id: str | None = None,
+        value_pool_entry: str | None = None,
+        name: str | None = None,
+        ahb_expression: str | None = None,
+        conditions: str | None = None,
+    ) -> None:
+        self.formatversion = formatversion
+        self.section_name = section_name
+        self.segment_group_key = segment_group_key
+        self.segment_code = segment_code
+        self.data_element = data_element
+        self.segment_id = segment_id
+        self.value_pool_entry = value_pool_entry
+        self.name = name
+        self.ahb_expression = ahb_expression
+        self.conditions = conditions
+        self.normalized_entries = tuple(map(normalize_entries, self.get_entries()))
+        self.fingerprint = _get_fingerprint(self.normalized_entries)
+
+    @classmethod
+    def from_entries(cls, formatversion: str, entries: Sequence[str | None]) -> "AhbRowData":
+        """
+        Creates a row of entries ordered like `AHB_COLUMN_NAMES`.
+        """
+        return cls(formatversion, *entries)
+
+    @classmethod
+    def from_ahb_line(cls, ahb_line: "AhbLine", formatversion: str) -> "AhbRowData":
+        """
+        Creates a row of a kohlrahbi `AhbLine`, which does not know its formatversion.
+        """
+        return cls(formatversion, *(getattr(ahb_line, entry) for entry in AHB_COLUMN_NAMES))
+
+    @classmethod
+    def from_ahb_row(cls, ahb_row: "AhbRow") -> "AhbRowData":
+        """
+        Creates a row of an `AhbRow`.
+        """
+        return cls.from_ahb_line(ahb_row, ahb_row.formatversion)
+
+    def get_entries(self) -> tuple[str | None, ...]:
+        """
+        Returns the entries of all AHB properties ordered like `AHB_COLUMN_NAMES`.
+        """
+        return (
+            self.section_name,
+            self.segment_group_key,
+            self.segment_code,
+            self.data_element,
+            self.segment_id,
+            self.value_pool_entry,
+            self.name,
+            self.ahb_expression,
+            self.conditions,
+        )
+
+    def get_key(self) -> AhbRowKey:
+        """
+        Returns the business key to identify rows.
+        """
+        return AhbRowKey(
+            segment_group_key=self.segment_group_key, segment_code=self.segment_code, data_element=self.data_element
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, AhbRowData):
+            return NotImplemented
+        return self.formatversion == other.formatversion and self.get_entries() == other.get_entries()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        entries = ", ".join(
+            f"{entry}={value!r}" for entry, value in zip(AHB_COLUMN_NAMES, self.get_entries(), strict=True)
+        )
+        return f"AhbRowData(formatversion={self.formatversion!r}, {entries})"
+
+
+# entries, normalized entries and fingerprint of a decoded record
+DecodedRecord = tuple[tuple[str | None, ...], tuple[str, ...], int]
+
+
+class AhbRecordSource(Protocol):
+    """
+    Storage of undecoded AHB rows (records), e.g. a memory-mapped csv file, that `LazyAhbRowData` refers to.
+    """
+
+    formatversion: str
+
+    def get_record(self, record_idx: int) -> DecodedRecord:
+        """
+        Returns the entries (ordered like `AHB_COLUMN_NAMES`), normalized entries and fingerprint of a record.
+        """
+
+
+class LazyAhbRowData:
+    """
+    Read-only counterpart of `AhbRowData` that only refers to a record of an `AhbRecordSource`.
+    The record is materialized on first access of any of its properties; the source may share decoded records
+    between rows with identical raw content, so that these are only decoded once.
+    """
+
+    __slots__ = ("_entries", "_fingerprint", "_normalized_entries", "record_idx", "source")
+
+    def __init__(self, source: AhbRecordSource, record_idx: int) -> None:
+        self.source = source
+        self.record_idx = record_idx
+        self._entries: tuple[str | None, ...] = ()
+        self._normalized_entries: tuple[str, ...] = ()
+        self._fingerprint = 0
+
+    def _materialize(self) -> tuple[str | None, ...]:
+        self._entries, self._normalized_entries, self._fingerprint = self.source.get_record(self.record_idx)
+        return self._entries
+
+    @property
+    def formatversion(self) -> str:
+        """
+        Formatversion of the source.
+        """
+        return self.source.formatversion
+
+    def get_entries(self) -> tuple[str | None, ...]:
+        """
+        Returns the entries of all AHB properties ordered like `AHB_COLUMN_NAMES`.
+        """
+        return self._entries or self._materialize()
+
+    @property
+    def normalized_entries(self) -> tuple[str, ...]:
+        """
+        Returns the entries of all AHB properties (ordered like `AHB_COLUMN_NAMES`) without whitespaces.
+        """
+        if not self._entries:
+            self._materialize()
+        return self._normalized_entries
+
+    @property
+    def fingerprint(self) -> int:
+        """
+        Returns a 64-bit fingerprint of the normalized entries (see `AhbRow.fingerprint`).
+        """
+        if not self._entries:
+            self._materialize()
+        return self._fingerprint
+
+    @property
+    def section_name(self) -> str | None:
+        """
+        Segmentname
+        """
+        return (self._entries or self._materialize())[0]
+
+    @property
+    def segment_group_key(self) -> str | None:
+        """
+        Segmentgruppe
+        """
+        return (self._entries or self._materialize())[1]
+
+    @property
+    def segment_code(self) -> str | None:
+        """
+        Segment
+        """
+        return (self._entries or self._materialize())[2]
+
+    @property
+    def data_element(self) -> str | None:
+        """
+        Datenelement
+        """
+        return (self._entries or self._materialize())[3]
+
+    @property
+    def segment_id(self) -> str | None:
+        """
+        Segment ID
+        """
+        return (self._entries or self._materialize())[4]
+
+    @property
+    def value_pool_entry(self) -> str | None:
+        """
+        Code
+        """
+        return (self._entries or self._materialize())[5]
+
+    @property
+    def name(self) -> str | None:
+        """
+        Beschreibung
+        """
+        return (self._entries or self._materialize())[6]
+
+    @property
+    def ahb_expression(self) -> str | None:
+        """
+        Bedingungsausdruck
+        """
+        return (self._entries or self._materialize())[7]
+
+    @property
+    def conditions(self) -> str | None:
+        """
+        Bedingung
+        """
+        return (self._entries or self._materialize())[8]
+
+    def get_key(self) -> AhbRowKey:
+        """
+        Returns the business key to identify rows.
+        """
+        return AhbRowKey(
+            segment_group_key=self.segment_group_key, segment_code=self.segment_code, data_element=self.data_element
+        )
+
+    def __repr__(self) -> str:
+        return f"LazyAhbRowData(formatversion={self.formatversion!r}, record_idx={self.record_idx})"
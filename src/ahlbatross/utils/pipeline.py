@@ -0,0 +1,92 @@
+"""
+Staged processing of work items, connected by bounded asyncio queues.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+# signals the workers of a stage that there are no further items
+_END_OF_ITEMS = object()
+
+
+@dataclass(frozen=True)
+class PipelineStage:
+    """
+    A stage of a `Pipeline`: `process` is called for every item in up to `concurrency` threads at once.
+    If `process` returns None, the item is dropped, otherwise its result is passed on to the next stage.
+    """
+
+    name: str
+    process: Callable[[Any], Any]
+    concurrency: int = 1
+
+
+class Pipeline:
+    """
+    Passes items through consecutive stages, e.g. loading, aligning and exporting, so that all stages work at the
+    same time. Every stage runs its blocking `process` calls in its own thread pool. The stages are connected by
+    bounded queues (of `queue_size` or, by default, as many items as the next stage has workers): a stage waits
+    while the next one is busy, so at most a fixed number of items is in progress at any time.
+    `wait_times` sums up the seconds the workers of every stage spent waiting for items.
+    Results of the last stage are returned in the order they were completed.
+    """
+
+    def __init__(self, stages: Sequence[PipelineStage], queue_size: int | None = None) -> None:
+        self.stages = stages
+        self.queue_size = queue_size
+        self.wait_times = [0.0 for _ in stages]
+
+    def run(self, items: Iterable[Any]) -> list[Any]:
+        """
+        Processes all items and returns the results of the last stage. The first unexpected error aborts the run.
+        """
+        return asyncio.run(self._run(items))
+
+    async def _run(self, items: Iterable[Any]) -> list[Any]:
+        loop = asyncio.get_running_loop()
+        queues: list[asyncio.Queue[Any]] = [
+            asyncio.Queue(maxsize=self.queue_size or stage.concurrency) for stage in self.stages
+        ]
+        executors = [
+            ThreadPoolExecutor(max_workers=stage.concurrency, thread_name_prefix=stage.name) for stage in self.stages
+        ]
+        results: list[Any] = []
+
+        async def feed() -> None:
+            for item in items:
+                await queues[0].put(item)
+            for _ in range(self.stages[0].concurrency):
+                await queues[0].put(_END_OF_ITEMS)
+
+        async def work(stage_idx: int) -> None:
+            stage = self.stages[stage_idx]
+            while True:
+                start_time = time.perf_counter()
+                item = await queues[stage_idx].get()
+                self.wait_times[stage_idx] += time.perf_counter() - start_time
+                if item is _END_OF_ITEMS:
+                    return
+                result = await loop.run_in_executor(executors[stage_idx], stage.process, item)
+                if result is None:
+                    continue
+                if stage_idx + 1 < len(self.stages):
+                    await queues[stage_idx + 1].put(result)
+                else:
+                    results.append(result)
+
+        async def run_stage(stage_idx: int) -> None:
+            await asyncio.gather(*(work(stage_idx) for _ in range(self.stages[stage_idx].concurrency)))
+            if stage_idx + 1 < len(self.stages):
+                for _ in range(self.stages[stage_idx + 1].concurrency):
+                    await queues[stage_idx + 1].put(_END_OF_ITEMS)
+
+        try:
+            await asyncio.gather(feed(), *(run_stage(stage_idx) for stage_idx in range(len(self.stages))))
+        finally:
+            for executor in executors:
+                executor.shutdown(wait=True, cancel_futures=True)
+        return results
@@ -0,0 +1,59 @@
+"""
+Loading of upcoming work items in background threads.
+"""
+
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Generic, TypeVar
+
+ItemT = TypeVar("ItemT")
+ValueT = TypeVar("ValueT")
+
+_MAX_PREFETCH_WORKERS = 4
+
+
+class Prefetcher(Generic[ItemT, ValueT]):
+    """
+    Loads the values of the next `depth` items in a thread pool while the current item is processed, so that I/O and
+    parsing overlap with the processing. With a `depth` of 0 every value is loaded on demand.
+    `stall_time` sums up the seconds spent waiting for values that were not loaded yet.
+    """
+
+    def __init__(self, load: Callable[[ItemT], ValueT], depth: int = 0) -> None:
+        self.load = load
+        self.depth = depth
+        self.stall_time = 0.0
+
+    def _wait_for(self, get_value: Callable[[], ValueT]) -> ValueT:
+        start_time = time.perf_counter()
+        try:
+            return get_value()
+        finally:
+            self.stall_time += time.perf_counter() - start_time
+
+    def iter_loaded(self, items: Iterable[ItemT]) -> Iterator[tuple[ItemT, Callable[[], ValueT]]]:
+        """
+        Yields every item with a function that returns its loaded value (or raises the exception raised by `load`).
+        At most `depth` values are loaded ahead of the current item.
+        """
+        if self.depth <= 0:
+            for item in items:
+                yield item, partial(self._wait_for, partial(self.load, item))
+            return
+
+        executor = ThreadPoolExecutor(max_workers=min(self.depth, _MAX_PREFETCH_WORKERS))
+        pending: deque[tuple[ItemT, Future[ValueT]]] = deque()
+        try:
+            for item in items:
+                pending.append((item, executor.submit(self.load, item)))
+                if len(pending) > self.depth:
+                    current_item, future = pending.popleft()
+                    yield current_item, partial(self._wait_for, future.result)
+            while pending:
+                current_item, future = pending.popleft()
+                yield current_item, partial(self._wait_for, future.result)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,119 @@
+"""
+Generic algorithms to match the elements of two sequences of hashable fingerprints.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Hashable, Sequence
+
+
+# pylint:disable=too-many-locals
+def get_myers_matches(
+    previous: Sequence[Hashable], subsequent: Sequence[Hashable], max_edit_distance: int | None = None
+) -> list[tuple[int, int]] | None:
+    """
+    Find the index pairs of equal elements along a shortest edit script between two sequences
+    (E. Myers, "An O(N·D) Difference Algorithm and Its Variations", 1986).
+    Runtime and memory grow with the number of edits D instead of the product of both sequence lengths.
+    Returns None if more than `max_edit_distance` insertions/deletions would be required.
+    """
+    previous_length = len(previous)
+    subsequent_length = len(subsequent)
+    max_d = previous_length + subsequent_length
+    if max_edit_distance is not None:
+        max_d = min(max_d, max_edit_distance)
+
+    # furthest reaching x per diagonal k = x - y, stored at index `offset + k`
+    offset = max_d + 1
+    furthest_x = [0] * (2 * max_d + 3)
+    # snapshots of the diagonals -d-1 ... d+1 before each step d (required to backtrack the edit script)
+    trace: list[list[int]] = []
+
+    for d in range(max_d + 1):
+        trace.append(furthest_x[offset - d - 1 : offset + d + 2])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and furthest_x[offset + k - 1] < furthest_x[offset + k + 1]):
+                x = furthest_x[offset + k + 1]  # insertion (move down)
+            else:
+                x = furthest_x[offset + k - 1] + 1  # deletion (move right)
+            y = x - k
+            while x < previous_length and y < subsequent_length and previous[x] == subsequent[y]:
+                x += 1
+                y += 1
+            furthest_x[offset + k] = x
+            if x >= previous_length and y >= subsequent_length:
+                return _backtrack_myers_trace(trace, previous_length, subsequent_length)
+
+    return None
+
+
+def _backtrack_myers_trace(trace: list[list[int]], x: int, y: int) -> list[tuple[int, int]]:
+    """
+    Walk the recorded Myers trace back from (x, y) to (0, 0) and collect all diagonal moves (= matches).
+    """
+    matches: list[tuple[int, int]] = []
+
+    for d in range(len(trace) - 1, -1, -1):
+        snapshot = trace[d]
+        # the snapshot of step d starts at diagonal -d-1
+        snapshot_offset = d + 1
+        k = x - y
+        if k == -d or (k != d and snapshot[snapshot_offset + k - 1] < snapshot[snapshot_offset + k + 1]):
+            previous_k = k + 1
+        else:
+            previous_k = k - 1
+        previous_x = snapshot[snapshot_offset + previous_k]
+        previous_y = previous_x - previous_k
+
+        while x > previous_x and y > previous_y:
+            x -= 1
+            y -= 1
+            matches.append((x, y))
+
+        if d > 0:
+            x, y = previous_x, previous_y
+
+    matches.reverse()
+    return matches
+
+
+def get_patience_matches(previous: Sequence[Hashable], subsequent: Sequence[Hashable]) -> list[tuple[int, int]]:
+    """
+    Find anchors between two sequences as in patience diff: elements that occur exactly once in both sequences,
+    reduced to their longest increasing subsequence so that all anchors keep the order of both sequences.
+    """
+    previous_counts = Counter(previous)
+    subsequent_positions: dict[Hashable, int] = {}
+    subsequent_counts = Counter(subsequent)
+    for idx, element in enumerate(subsequent):
+        if subsequent_counts[element] == 1:
+            subsequent_positions[element] = idx
+
+    candidates = [
+        (idx, subsequent_positions[element])
+        for idx, element in enumerate(previous)
+        if previous_counts[element] == 1 and element in subsequent_positions
+    ]
+
+    # patience sorting: `pile_tops[p]` holds the candidate with the smallest subsequent index ending a run of length p+1
+    pile_tops: list[int] = []
+    pile_top_values: list[int] = []
+    predecessors: list[int] = []
+    for candidate_idx, (_, subsequent_idx) in enumerate(candidates):
+        pile = bisect_left(pile_top_values, subsequent_idx)
+        predecessors.append(pile_tops[pile - 1] if pile > 0 else -1)
+        if pile == len(pile_tops):
+            pile_tops.append(candidate_idx)
+            pile_top_values.append(subsequent_idx)
+        else:
+            pile_tops[pile] = candidate_idx
+            pile_top_values[pile] = subsequent_idx
+
+    anchors: list[tuple[int, int]] = []
+    candidate_idx = pile_tops[-1] if pile_tops else -1
+    while candidate_idx >= 0:
+        anchors.append(candidates[candidate_idx])
+        candidate_idx = predecessors[candidate_idx]
+
+    anchors.reverse()
+    return anchors
@@ -3,12 +3,64 @@ Utility functions for string operations.
 """
 
 import re
+from functools import lru_cache
+from itertools import groupby
 
+from ahlbatross.utils.sequence_matching import get_myers_matches
 
+# words, runs of whitespaces and single punctuation characters (e.g. brackets of condition references like "[12]")
+_TOKEN_PATTERN = re.compile(r"\s+|\w+|[^\w\s]")
+
+# budget per cell: longer texts or texts with more inserted/removed tokens are highlighted as a whole
+_MAX_INTRA_CELL_DIFF_TOKENS = 2000
+_MAX_INTRA_CELL_DIFF_EDITS = 200
+
+# consecutive text of a cell together with a flag whether it differs from the other formatversion
+TextSegment = tuple[str, bool]
+
+
+@lru_cache(maxsize=65536)
 def normalize_entries(value: str | None) -> str:
     """
     Normalizes strings of AHB parameters like `Segmentname` by removing all whitespaces, tabs, newlines, etc.
+    Results are cached, so recurring cell values share a single normalized string object.
     """
     if value is None:
         return ""
     return re.sub(r"\s+", "", value)
+
+
+def _merge_tokens(tokens: list[str], matched_indices: set[int]) -> tuple[TextSegment, ...]:
+    """
+    Join consecutive tokens that are either all unchanged or all changed. Whitespaces are never marked as changed.
+    """
+    return tuple(
+        ("".join(token for _, token in group), is_changed)
+        for is_changed, group in groupby(
+            enumerate(tokens), key=lambda entry: entry[0] not in matched_indices and not entry[1].isspace()
+        )
+    )
+
+
+@lru_cache(maxsize=4096)
+def get_intra_cell_diff(
+    previous_text: str, subsequent_text: str
+) -> tuple[tuple[TextSegment, ...], tuple[TextSegment, ...]] | None:
+    """
+    Compare the texts of a cell of two formatversions word by word and split both texts into changed and unchanged
+    segments. Results are cached since the same text changes usually recur across many rows and PIDs.
+    Returns None if the texts exceed the per-cell budget of tokens or edits.
+    """
+    previous_tokens = _TOKEN_PATTERN.findall(previous_text)
+    subsequent_tokens = _TOKEN_PATTERN.findall(subsequent_text)
+    if len(previous_tokens) + len(subsequent_tokens) > _MAX_INTRA_CELL_DIFF_TOKENS:
+        return None
+
+    matches = get_myers_matches(previous_tokens, subsequent_tokens, max_edit_distance=_MAX_INTRA_CELL_DIFF_EDITS)
+    if matches is None:
+        return None
+
+    return (
+        _merge_tokens(previous_tokens, {previous_idx for previous_idx, _ in matches}),
+        _merge_tokens(subsequent_tokens, {subsequent_idx for _, subsequent_idx in matches}),
+    )
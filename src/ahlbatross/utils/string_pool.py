@@ -0,0 +1,42 @@
+"""
+Run-wide dictionary of AHB cell values.
+"""
+
+from collections.abc import Mapping, Sequence
+
+
+class StringPool:
+    """
+    Maps every distinct cell value (e.g. `Bedingung`, `Beschreibung` or `Segmentname`) to a single shared string object.
+    Values that repeat across rows, PIDs and formatversions are stored only once per run and comparisons of pooled
+    values are resolved by identity.
+    """
+
+    def __init__(self) -> None:
+        self._strings: dict[str, str] = {}
+
+    def intern(self, value: str) -> str:
+        """
+        Returns the shared string object that equals the given value.
+        """
+        return self._strings.setdefault(value, value)
+
+    def intern_values(self, entries: Mapping[str, str | None]) -> dict[str, str | None]:
+        """
+        Returns a copy of the given csv row with all values replaced by their shared string objects.
+        """
+        strings = self._strings
+        return {key: strings.setdefault(value, value) if value is not None else None for key, value in entries.items()}
+
+    def intern_entries(self, entries: Sequence[str | None]) -> list[str | None]:
+        """
+        Returns a copy of the given entries with all values replaced by their shared string objects.
+        """
+        strings = self._strings
+        return [strings.setdefault(entry, entry) if entry is not None else None for entry in entries]
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def __contains__(self, value: object) -> bool:
+        return value in self._strings
@@ -16,6 +16,7 @@ class FormattingOptions(TypedDict, total=False):
     align: str
     text_wrap: bool
     font_color: str
+    font_strikeout: bool
 
 
 CELL_FORMAT: FormattingOptions = {
@@ -51,6 +52,11 @@ MODIFIED_LABEL_HIGHLIGHTING: FormattingOptions = {
     "bg_color": "#F5DC98",
 }
 
+MOVED_LABEL_HIGHLIGHTING: FormattingOptions = {
+    **CELL_FORMAT,
+    "bg_color": "#DDEBF7",
+}
+
 ALTERING_SEGMENTNAME_FORMAT: FormattingOptions = {
     **CELL_FORMAT,
     "bg_color": "#D9D9D9",
@@ -76,6 +82,22 @@ MODIFIED_LABEL_FORMAT: FormattingOptions = {
     "font_color": "#B8860B",
 }
 
+MOVED_LABEL_FORMAT: FormattingOptions = {
+    **TEXT_FORMAT_BASE,
+    "font_color": "#2F75B5",
+}
+
+# fonts of changed words within modified text cells
+PREVIOUS_TEXT_CHANGE_FORMAT: FormattingOptions = {
+    "font_color": "#E94C74",
+    "font_strikeout": True,
+}
+
+SUBSEQUENT_TEXT_CHANGE_FORMAT: FormattingOptions = {
+    "bold": True,
+    "font_color": "#7AAB8A",
+}
+
 ROW_NUMBERING_FORMAT: FormattingOptions = {
     **CELL_FORMAT,
     "align": "center",
@@ -0,0 +1,121 @@
+from pathlib import Path
+
+import pytest
+from efoli import EdifactFormatVersion
+
+from ahlbatross.core.ahb_catalog import AhbCatalog, AhbCatalogFilter
+
+
+def _write_files(root_dir: Path, submodule: dict[str, dict[str, list[str] | None]]) -> None:
+    for formatversion, nachrichtenformate in submodule.items():
+        (root_dir / formatversion).mkdir()
+        for nachrichtenformat, pruefids in nachrichtenformate.items():
+            if pruefids is None:
+                (root_dir / formatversion / nachrichtenformat).mkdir()
+                continue
+            csv_dir = root_dir / formatversion / nachrichtenformat / "csv"
+            csv_dir.mkdir(parents=True)
+            for pruefid in pruefids:
+                (csv_dir / f"{pruefid}.csv").write_text(f"content_{pruefid}")
+
+
+def test_scan_catalog(tmp_path: Path) -> None:
+    """
+    test that the catalog contains all <pruefid>.csv files with their size and mtime and
+    ignores other directories and files.
+    """
+    _write_files(
+        tmp_path,
+        {
+            "FV2504": {"nachrichtenformat_1": ["pruefid_2", "pruefid_1"], "nachrichtenformat_2": None},
+            "FV2410": {"nachrichtenformat_1": ["pruefid_1"], "nachrichtenformat_2": ["pruefid_3"]},
+            "FV2404": {},
+            "not_a_formatversion": {"nachrichtenformat_1": ["pruefid_1"]},
+        },
+    )
+    (tmp_path / "FV2504" / "nachrichtenformat_1" / "csv" / "readme.txt").write_text("no csv")
+
+    catalog = AhbCatalog.scan(tmp_path)
+
+    assert catalog.get_formatversions() == [
+        EdifactFormatVersion.FV2504,
+        EdifactFormatVersion.FV2410,
+        EdifactFormatVersion.FV2404,
+    ]
+    assert list(catalog.get_nachrichtenformate("FV2504")) == ["nachrichtenformat_1"]
+    assert list(catalog.get_nachrichtenformate("FV2504")["nachrichtenformat_1"]) == ["pruefid_1", "pruefid_2"]
+    assert catalog.is_formatversion_empty("FV2404")
+    assert catalog.is_formatversion_empty("FV2310")
+
+    ahb_file = catalog.get_nachrichtenformate("FV2410")["nachrichtenformat_2"]["pruefid_3"]
+    assert ahb_file.path == tmp_path / "FV2410" / "nachrichtenformat_2" / "csv" / "pruefid_3.csv"
+    assert (ahb_file.size, ahb_file.mtime_ns) == (ahb_file.path.stat().st_size, ahb_file.path.stat().st_mtime_ns)
+
+    with pytest.raises(TypeError):
+        catalog.formatversions["FV2310"] = {}  # type: ignore[index]
+
+
+def test_catalog_lookups(tmp_path: Path) -> None:
+    """
+    test matching files of two formatversions and the lookup of PIDs.
+    """
+    _write_files(
+        tmp_path,
+        {
+            "FV2504": {"nachrichtenformat_1": ["pruefid_1", "pruefid_2"], "nachrichtenformat_2": ["pruefid_4"]},
+            "FV2410": {"nachrichtenformat_1": ["pruefid_1"], "nachrichtenformat_2": ["pruefid_3"]},
+        },
+    )
+
+    catalog = AhbCatalog.scan(tmp_path)
+
+    matching_files = catalog.get_matching_files("FV2410", "FV2504")
+    assert [(nachrichtentyp, pruefid) for _, _, nachrichtentyp, pruefid in matching_files] == [
+        ("nachrichtenformat_1", "pruefid_1")
+    ]
+    assert matching_files[0][0].path.parent.parent.parent.name == "FV2410"
+    assert catalog.get_pruefids("FV2504") == ["pruefid_1", "pruefid_2", "pruefid_4"]
+    match = catalog.find_pruefid("FV2504", "pruefid_4")
+    assert match is not None and match[1] == "nachrichtenformat_2"
+    assert catalog.find_pruefid("FV2410", "pruefid_4") is None
+
+
+def test_scan_missing_root_dir(tmp_path: Path) -> None:
+    """
+    test that scanning a missing root directory raises FileNotFoundError.
+    """
+    with pytest.raises(FileNotFoundError):
+        AhbCatalog.scan(tmp_path / "does_not_exist")
+
+
+def test_catalog_filter(tmp_path: Path) -> None:
+    """
+    test that matching files are limited to nachrichtenformate and PIDs that match any of the glob patterns.
+    """
+    _write_files(
+        tmp_path,
+        {
+            "FV2504": {"UTILMD": ["55001", "55002", "55101"], "ORDERS": ["17001"]},
+            "FV2410": {"UTILMD": ["55001", "55002", "55101"], "ORDERS": ["17001"]},
+        },
+    )
+    catalog = AhbCatalog.scan(tmp_path)
+
+    def get_matches(catalog_filter: AhbCatalogFilter) -> list[tuple[str, str]]:
+        return [
+            (nachrichtentyp, pruefid)
+            for _, _, nachrichtentyp, pruefid in catalog.get_matching_files("FV2410", "FV2504", catalog_filter)
+        ]
+
+    assert len(get_matches(AhbCatalogFilter())) == 4
+    assert get_matches(AhbCatalogFilter(pruefids=("5500?", "17001"))) == [
+        ("ORDERS", "17001"),
+        ("UTILMD", "55001"),
+        ("UTILMD", "55002"),
+    ]
+    assert get_matches(AhbCatalogFilter(nachrichtenformate=("UTIL*",), pruefids=("*1",))) == [
+        ("UTILMD", "55001"),
+        ("UTILMD", "55101"),
+    ]
+    assert AhbCatalogFilter(formatversions=("FV25*",)).matches_formatversion("FV2504")
+    assert not AhbCatalogFilter(formatversions=("FV25*",)).matches_formatversion("FV2410")
@@ -2,12 +2,32 @@
 
 import pytest
 
-from ahlbatross.core.ahb_comparison import align_ahb_rows
+from ahlbatross.core import ahb_comparison
+from ahlbatross.core.ahb_comparison import align_ahb_rows, align_ahb_rows_compact, iter_align_ahb_rows
+from ahlbatross.enums.alignment_algorithms import AlignmentAlgorithm
 from ahlbatross.enums.diff_types import DiffType
-from ahlbatross.models.ahb import AhbRow
+from ahlbatross.models.ahb import AhbRow, AhbRowComparison
+from ahlbatross.utils.xlsx_formatting import AHB_COLUMN_NAMES
 from unittests.conftest import FormatVersions
 
 
+def _create_rows(formatversion: str, section_names: list[str]) -> list[AhbRow]:
+    """
+    creates rows of the same segment that only differ in their section_name.
+    """
+    return [
+        AhbRow(
+            formatversion=formatversion,
+            section_name=section_name,
+            segment_group_key="SG1",
+            segment_code="XXX",
+            value_pool_entry=None,
+            name=None,
+        )
+        for section_name in section_names
+    ]
+
+
 class TestSingleColumnComparisons:
     """
     Test cases for AHBs containing only `section_name` entries (Segmentname).
@@ -1191,3 +1211,404 @@ class TestMultiColumnComparisons:
         assert "segment_group_key" in str(changed_entries)
         assert "data_element" in str(changed_entries)
         assert "value_pool_entry" not in str(changed_entries)
+
+    def test_align_rows_repeated_keys_are_matched_in_order(self) -> None:
+        previous_ahb_rows = [
+            AhbRow(
+                formatversion=self.formatversions.previous_formatversion,
+                section_name="Referenz",
+                segment_group_key="SG6",
+                segment_code="RFF",
+                data_element="1154",
+                segment_id="00010",
+                value_pool_entry=None,
+                name=f"Referenz {idx}",
+            )
+            for idx in range(3)
+        ]
+        subsequent_ahb_rows = [
+            AhbRow(
+                formatversion=self.formatversions.subsequent_formatversion,
+                section_name="Referenz",
+                segment_group_key="SG6",
+                segment_code="RFF",
+                data_element="1154",
+                segment_id="00010",
+                value_pool_entry=None,
+                name=f"Referenz {idx}",
+            )
+            for idx in range(4)
+        ]
+
+        result = align_ahb_rows(previous_ahb_rows, subsequent_ahb_rows)
+
+        assert [comparison.diff.diff_type for comparison in result] == [
+            DiffType.UNCHANGED,
+            DiffType.UNCHANGED,
+            DiffType.UNCHANGED,
+            DiffType.ADDED,
+        ]
+        assert [comparison.subsequent_formatversion.name for comparison in result] == [
+            "Referenz 0",
+            "Referenz 1",
+            "Referenz 2",
+            "Referenz 3",
+        ]
+
+    def test_align_rows_keeps_common_suffix_unchanged(self) -> None:
+        def create_row(formatversion: str, data_element: str) -> AhbRow:
+            return AhbRow(
+                formatversion=formatversion,
+                section_name="Abschluss",
+                segment_group_key=None,
+                segment_code="UNT",
+                data_element=data_element,
+                value_pool_entry=None,
+                name=None,
+            )
+
+        previous_ahb_rows = [
+            create_row(self.formatversions.previous_formatversion, "0074"),
+            create_row(self.formatversions.previous_formatversion, "0074"),
+        ]
+        subsequent_ahb_rows = [
+            create_row(self.formatversions.subsequent_formatversion, "0062"),
+            create_row(self.formatversions.subsequent_formatversion, "0074"),
+        ]
+
+        result = align_ahb_rows(previous_ahb_rows, subsequent_ahb_rows)
+
+        # the identical last rows are not searched for a match of the first previous row
+        assert [comparison.diff.diff_type for comparison in result] == [DiffType.MODIFIED, DiffType.UNCHANGED]
+
+
+class TestMyersAlignment:
+    """
+    Test cases for the alignment along a shortest edit script (`AlignmentAlgorithm.MYERS`).
+    """
+
+    formatversions: FormatVersions
+
+    @pytest.fixture(autouse=True)
+    def setup(self, formatversions: FormatVersions) -> None:
+        self.formatversions = formatversions
+
+    def _create_row(self, formatversion: str, segment_code: str, name: str | None = None) -> AhbRow:
+        return AhbRow(
+            formatversion=formatversion,
+            section_name="Nachrichten-Kopfsegment",
+            segment_group_key="SG1",
+            segment_code=segment_code,
+            data_element="0062",
+            segment_id="00001",
+            value_pool_entry=None,
+            name=name,
+        )
+
+    def test_align_rows_with_inserted_and_removed_rows(self) -> None:
+        previous_ahb_rows = [
+            self._create_row(self.formatversions.previous_formatversion, segment_code)
+            for segment_code in ["UNH", "BGM", "DTM", "NAD"]
+        ]
+        subsequent_ahb_rows = [
+            self._create_row(self.formatversions.subsequent_formatversion, segment_code)
+            for segment_code in ["UNH", "DTM", "RFF", "NAD"]
+        ]
+
+        result = align_ahb_rows(previous_ahb_rows, subsequent_ahb_rows, AlignmentAlgorithm.MYERS)
+
+        assert [comparison.diff.diff_type for comparison in result] == [
+            DiffType.UNCHANGED,
+            DiffType.REMOVED,
+            DiffType.UNCHANGED,
+            DiffType.ADDED,
+            DiffType.UNCHANGED,
+        ]
+        assert result[1].previous_formatversion.segment_code == "BGM"
+        assert result[3].subsequent_formatversion.segment_code == "RFF"
+
+    def test_align_rows_detects_modified_rows(self) -> None:
+        previous_ahb_rows = [self._create_row(self.formatversions.previous_formatversion, "UNH", name="alt")]
+        subsequent_ahb_rows = [self._create_row(self.formatversions.subsequent_formatversion, "UNH", name="neu")]
+
+        result = align_ahb_rows(previous_ahb_rows, subsequent_ahb_rows, AlignmentAlgorithm.MYERS)
+
+        assert len(result) == 1
+        assert result[0].diff.diff_type == DiffType.MODIFIED
+        assert "name" in str(result[0].diff.changed_entries)
+
+    def test_align_rows_empty_ahbs(self) -> None:
+        previous_ahb_rows = [self._create_row(self.formatversions.previous_formatversion, "UNH")]
+
+        assert not align_ahb_rows([], [], AlignmentAlgorithm.MYERS)
+        result = align_ahb_rows(previous_ahb_rows, [], AlignmentAlgorithm.MYERS)
+        assert [comparison.diff.diff_type for comparison in result] == [DiffType.REMOVED]
+
+
+class TestPatienceAlignment:
+    """
+    Test cases for the alignment anchored on unique rows (`AlignmentAlgorithm.PATIENCE`).
+    """
+
+    formatversions: FormatVersions
+
+    @pytest.fixture(autouse=True)
+    def setup(self, formatversions: FormatVersions) -> None:
+        self.formatversions = formatversions
+
+    def _create_row(self, formatversion: str, section_name: str, segment_code: str | None) -> AhbRow:
+        return AhbRow(
+            formatversion=formatversion,
+            section_name=section_name,
+            segment_group_key=None,
+            segment_code=segment_code,
+            value_pool_entry=None,
+            name=None,
+        )
+
+    def test_align_rows_between_unique_anchors(self) -> None:
+        previous_ahb_rows = [
+            self._create_row(self.formatversions.previous_formatversion, "Kopf", "UNH"),
+            self._create_row(self.formatversions.previous_formatversion, "Datum", None),
+            self._create_row(self.formatversions.previous_formatversion, "Datum", None),
+            self._create_row(self.formatversions.previous_formatversion, "Ende", "UNT"),
+        ]
+        subsequent_ahb_rows = [
+            self._create_row(self.formatversions.subsequent_formatversion, "Kopf", "UNH"),
+            self._create_row(self.formatversions.subsequent_formatversion, "Datum", None),
+            self._create_row(self.formatversions.subsequent_formatversion, "Ende", "UNT"),
+        ]
+
+        result = align_ahb_rows(previous_ahb_rows, subsequent_ahb_rows, AlignmentAlgorithm.PATIENCE)
+
+        assert [comparison.diff.diff_type for comparison in result] == [
+            DiffType.UNCHANGED,
+            DiffType.UNCHANGED,
+            DiffType.REMOVED,
+            DiffType.UNCHANGED,
+        ]
+        assert result[-1].subsequent_formatversion.segment_code == "UNT"
+
+    def test_align_rows_does_not_jump_across_anchors(self) -> None:
+        previous_ahb_rows = [
+            self._create_row(self.formatversions.previous_formatversion, "Kopf", "UNH"),
+            self._create_row(self.formatversions.previous_formatversion, "Ende", "UNT"),
+        ]
+        subsequent_ahb_rows = [
+            self._create_row(self.formatversions.subsequent_formatversion, "Ende", "UNT"),
+            self._create_row(self.formatversions.subsequent_formatversion, "Kopf", "UNH"),
+        ]
+
+        result = align_ahb_rows(previous_ahb_rows, subsequent_ahb_rows, AlignmentAlgorithm.PATIENCE)
+
+        assert len(result) == 3
+        assert [comparison.diff.diff_type for comparison in result].count(DiffType.UNCHANGED) == 1
+
+
+class TestBlockwiseAlignment:
+    """
+    Test cases for the alignment of `section_name` blocks (`AlignmentAlgorithm.BLOCKWISE`).
+    """
+
+    formatversions: FormatVersions
+
+    @pytest.fixture(autouse=True)
+    def setup(self, formatversions: FormatVersions) -> None:
+        self.formatversions = formatversions
+
+    def test_align_rows_within_matching_blocks(self) -> None:
+        previous_ahb_rows = _create_rows(self.formatversions.previous_formatversion, ["A", "A", "B", "C", "C"])
+        subsequent_ahb_rows = _create_rows(self.formatversions.subsequent_formatversion, ["A", "D", "C", "C", "C"])
+
+        result = align_ahb_rows(previous_ahb_rows, subsequent_ahb_rows, AlignmentAlgorithm.BLOCKWISE)
+
+        assert [
+            (
+                comparison.previous_formatversion.section_name,
+                comparison.diff.diff_type,
+                comparison.subsequent_formatversion.section_name,
+            )
+            for comparison in result
+        ] == [
+            ("A", DiffType.UNCHANGED, "A"),
+            ("A", DiffType.REMOVED, ""),
+            ("B", DiffType.REMOVED, ""),
+            ("", DiffType.ADDED, "D"),
+            ("", DiffType.ADDED, "C"),
+            ("C", DiffType.UNCHANGED, "C"),
+            ("C", DiffType.UNCHANGED, "C"),
+        ]
+
+    def test_align_rows_in_worker_processes(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        previous_ahb_rows = _create_rows(self.formatversions.previous_formatversion, ["A", "B", "B", "C"])
+        subsequent_ahb_rows = _create_rows(self.formatversions.subsequent_formatversion, ["A", "B", "C", "D"])
+        sequential_result = align_ahb_rows(
+            previous_ahb_rows, subsequent_ahb_rows, AlignmentAlgorithm.BLOCKWISE, max_workers=1
+        )
+
+        monkeypatch.setattr(ahb_comparison, "_PARALLEL_BLOCK_ALIGNMENT_MIN_ROWS", 0)
+        parallel_result = align_ahb_rows(
+            previous_ahb_rows, subsequent_ahb_rows, AlignmentAlgorithm.BLOCKWISE, max_workers=2
+        )
+
+        assert parallel_result == sequential_result
+
+
+class TestCompactAlignment:
+    """
+    Test cases for the index-pair representation of alignment results (`AhbAlignment`).
+    """
+
+    formatversions: FormatVersions
+
+    @pytest.fixture(autouse=True)
+    def setup(self, formatversions: FormatVersions) -> None:
+        self.formatversions = formatversions
+
+    def test_compact_alignment_refers_to_loaded_rows(self) -> None:
+        previous_ahb_rows = [
+            AhbRow(
+                formatversion=self.formatversions.previous_formatversion,
+                section_name="Kopf",
+                segment_code=segment_code,
+                value_pool_entry=None,
+                name=name,
+            )
+            for segment_code, name in [("UNH", "alt"), ("BGM", None)]
+        ]
+        subsequent_ahb_rows = [
+            AhbRow(
+                formatversion=self.formatversions.subsequent_formatversion,
+                section_name=section_name,
+                segment_code="UNH",
+                value_pool_entry=None,
+                name="neu",
+            )
+            for section_name in ["Kopf", "Ende"]
+        ]
+
+        alignment = align_ahb_rows_compact(previous_ahb_rows, subsequent_ahb_rows)
+
+        assert list(alignment.previous_indices) == [0, 1, -1]
+        assert list(alignment.subsequent_indices) == [0, -1, 1]
+        assert [alignment.get_diff_type(position) for position in range(len(alignment))] == [
+            DiffType.MODIFIED,
+            DiffType.REMOVED,
+            DiffType.ADDED,
+        ]
+        assert alignment.changed_columns[0] == 1 << AHB_COLUMN_NAMES.index("name")
+
+        assert list(alignment) == align_ahb_rows(previous_ahb_rows, subsequent_ahb_rows)
+        assert alignment[0].previous_formatversion is previous_ahb_rows[0]
+        assert alignment[1].subsequent_formatversion.formatversion == self.formatversions.previous_formatversion
+
+
+class TestStreamingAlignment:
+    """
+    Test cases for the lazy alignment of two row iterables within a look-ahead window (`iter_align_ahb_rows`).
+    """
+
+    formatversions: FormatVersions
+
+    @pytest.fixture(autouse=True)
+    def setup(self, formatversions: FormatVersions) -> None:
+        self.formatversions = formatversions
+
+    def test_streaming_alignment_equals_greedy_alignment(self) -> None:
+        previous_ahb_rows = _create_rows(self.formatversions.previous_formatversion, ["A", "B", "C", "E"])
+        subsequent_ahb_rows = _create_rows(self.formatversions.subsequent_formatversion, ["A", "D", "B", "C"])
+
+        result = iter_align_ahb_rows(iter(previous_ahb_rows), iter(subsequent_ahb_rows))
+
+        assert not isinstance(result, list)
+        assert list(result) == align_ahb_rows(previous_ahb_rows, subsequent_ahb_rows)
+
+    def test_streaming_alignment_only_matches_within_window(self) -> None:
+        previous_ahb_rows = _create_rows(self.formatversions.previous_formatversion, ["A", "B"])
+        subsequent_ahb_rows = _create_rows(self.formatversions.subsequent_formatversion, ["X", "Y", "B"])
+
+        def _get_diff_types(window_size: int) -> list[tuple[str | None, DiffType, str | None]]:
+            return [
+                (
+                    comparison.previous_formatversion.section_name,
+                    comparison.diff.diff_type,
+                    comparison.subsequent_formatversion.section_name,
+                )
+                for comparison in iter_align_ahb_rows(previous_ahb_rows, subsequent_ahb_rows, window_size)
+            ]
+
+        assert _get_diff_types(window_size=3) == [
+            ("A", DiffType.REMOVED, ""),
+            ("", DiffType.ADDED, "X"),
+            ("", DiffType.ADDED, "Y"),
+            ("B", DiffType.UNCHANGED, "B"),
+        ]
+        assert _get_diff_types(window_size=2) == [
+            ("A", DiffType.REMOVED, ""),
+            ("B", DiffType.REMOVED, ""),
+            ("", DiffType.ADDED, "X"),
+            ("", DiffType.ADDED, "Y"),
+            ("", DiffType.ADDED, "B"),
+        ]
+
+
+class TestMovedRows:
+    """
+    Test cases for the detection of relocated rows (`DiffType.MOVED`).
+    """
+
+    formatversions: FormatVersions
+
+    @pytest.fixture(autouse=True)
+    def setup(self, formatversions: FormatVersions) -> None:
+        self.formatversions = formatversions
+
+    def _get_labels(self, comparisons: list[AhbRowComparison]) -> list[tuple[str | None, DiffType, str | None]]:
+        return [
+            (
+                comparison.previous_formatversion.section_name,
+                comparison.diff.diff_type,
+                comparison.subsequent_formatversion.section_name,
+            )
+            for comparison in comparisons
+        ]
+
+    def test_relocated_rows_are_labeled_as_moved(self) -> None:
+        previous_ahb_rows = _create_rows(self.formatversions.previous_formatversion, ["A", "B", "C", "D", "E"])
+        subsequent_ahb_rows = _create_rows(self.formatversions.subsequent_formatversion, ["A", "C", "D", "B", "F"])
+
+        assert self._get_labels(align_ahb_rows(previous_ahb_rows, subsequent_ahb_rows)) == [
+            ("A", DiffType.UNCHANGED, "A"),
+            ("", DiffType.ADDED, "C"),
+            ("", DiffType.ADDED, "D"),
+            ("B", DiffType.UNCHANGED, "B"),
+            ("C", DiffType.REMOVED, ""),
+            ("D", DiffType.REMOVED, ""),
+            ("E", DiffType.REMOVED, ""),
+            ("", DiffType.ADDED, "F"),
+        ]
+        assert self._get_labels(align_ahb_rows(previous_ahb_rows, subsequent_ahb_rows, detect_moved_rows=True)) == [
+            ("A", DiffType.UNCHANGED, "A"),
+            ("C", DiffType.MOVED, "C"),
+            ("D", DiffType.MOVED, "D"),
+            ("B", DiffType.UNCHANGED, "B"),
+            ("E", DiffType.REMOVED, ""),
+            ("", DiffType.ADDED, "F"),
+        ]
+
+    def test_moved_rows_are_paired_in_order(self) -> None:
+        previous_ahb_rows = _create_rows(self.formatversions.previous_formatversion, ["B", "A", "A"])
+        subsequent_ahb_rows = _create_rows(self.formatversions.subsequent_formatversion, ["A", "B"])
+
+        alignment = align_ahb_rows_compact(previous_ahb_rows, subsequent_ahb_rows, detect_moved_rows=True)
+
+        assert [
+            (previous_idx, alignment.get_diff_type(position), subsequent_idx)
+            for position, (previous_idx, subsequent_idx) in enumerate(
+                zip(alignment.previous_indices, alignment.subsequent_indices, strict=True)
+            )
+        ] == [
+            (1, DiffType.MOVED, 0),
+            (0, DiffType.UNCHANGED, 1),
+            (2, DiffType.REMOVED, -1),
+        ]
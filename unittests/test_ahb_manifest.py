@@ -0,0 +1,32 @@
+from pathlib import Path
+
+from ahlbatross.core.ahb_manifest import MANIFEST_FILE_NAME, AhbManifest, ManifestEntry
+
+
+def test_manifest_round_trip(tmp_path: Path) -> None:
+    """
+    test that a saved manifest is loaded again and that outdated entries or missing outputs are detected.
+    """
+    key = "FV2504_FV2410/UTILMD/55001"
+    entry = ManifestEntry(previous_hash="a", subsequent_hash="b", settings="ahlbatross", outputs=(f"{key}.csv",))
+    (tmp_path / "FV2504_FV2410" / "UTILMD").mkdir(parents=True)
+    (tmp_path / f"{key}.csv").write_text("")
+
+    AhbManifest({key: entry}).save(tmp_path)
+    manifest = AhbManifest.load(tmp_path)
+
+    assert manifest.entries == {key: entry}
+    assert manifest.is_up_to_date(key, ManifestEntry("a", "b", "ahlbatross"), tmp_path)
+    assert not manifest.is_up_to_date(key, ManifestEntry("a", "c", "ahlbatross"), tmp_path)
+    assert not manifest.is_up_to_date("FV2504_FV2410/UTILMD/55002", ManifestEntry("a", "b", "ahlbatross"), tmp_path)
+    (tmp_path / f"{key}.csv").unlink()
+    assert not manifest.is_up_to_date(key, ManifestEntry("a", "b", "ahlbatross"), tmp_path)
+
+
+def test_load_invalid_manifest(tmp_path: Path) -> None:
+    """
+    test that missing and invalid manifests are loaded as empty manifests.
+    """
+    assert not AhbManifest.load(tmp_path).entries
+    (tmp_path / MANIFEST_FILE_NAME).write_text("{")
+    assert not AhbManifest.load(tmp_path).entries
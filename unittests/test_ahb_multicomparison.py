@@ -16,9 +16,9 @@ AHB_CSV_ROW = "Nachrichten-Kopfsegment,SG1,TST,0001,00001,E_0001,,Description,Mu
 @pytest.fixture(autouse=True)
 def _clear_pid_cache() -> None:
     """
-    the module-level PID cache must not leak state between tests.
+    the module-level catalog cache must not leak state between tests.
     """
-    ahb_multicomparison._FORMATVERSION_PID_CACHE.clear()  # pylint: disable=protected-access
+    ahb_multicomparison._CATALOG_CACHE.clear()  # pylint: disable=protected-access
 
 
 def _write_ahb_csv(csv_dir: Path, pruefid: str) -> None:
@@ -1,10 +1,20 @@
+import csv
+import filecmp
 import logging
+import os
+from collections.abc import Sequence
 from pathlib import Path
+from typing import Any
 
 import pytest
 from efoli import EdifactFormatVersion
 
+from ahlbatross.core import ahb_comparison, ahb_processing
+from ahlbatross.core.ahb_catalog import AhbCatalogFilter
+from ahlbatross.core.ahb_manifest import AhbManifest
 from ahlbatross.core.ahb_processing import (
+    PipelineConcurrency,
+    _are_byte_identical,
     _get_formatversion_dirs,
     _get_nachrichtenformat_dirs,
     _is_formatversion_dir_empty,
@@ -12,6 +22,10 @@ from ahlbatross.core.ahb_processing import (
     get_matching_csv_files,
     process_ahb_files,
 )
+from ahlbatross.enums.alignment_algorithms import AlignmentAlgorithm
+from ahlbatross.formats.csv import close_mapped_file, read_csv_content
+from ahlbatross.formats.csv_cache import CsvParseCache
+from ahlbatross.models.ahb import AnyAhbRow
 
 AHB_CSV_HEADER = (
     "Segmentname,Segmentgruppe,Segment,Datenelement,Segment ID,"
@@ -133,9 +147,24 @@ def test_is_formatversion_dir_empty_missing_dir(tmp_path: Path) -> None:
     assert _is_formatversion_dir_empty(tmp_path, EdifactFormatVersion.FV2504) is True
 
 
-def _write_ahb_csv(csv_dir: Path, pruefid: str) -> None:
+def _write_ahb_csv(csv_dir: Path, pruefid: str, ahb_expression: str = "Muss") -> None:
     csv_dir.mkdir(parents=True, exist_ok=True)
-    (csv_dir / f"{pruefid}.csv").write_text(AHB_CSV_HEADER + AHB_CSV_ROW)
+    (csv_dir / f"{pruefid}.csv").write_text(AHB_CSV_HEADER + AHB_CSV_ROW.replace("Muss", ahb_expression))
+
+
+def _write_consecutive_ahb_csvs(input_dir: Path, pruefids: Sequence[str]) -> None:
+    """
+    writes the given PIDs of three consecutive formatversions, each with a different ahb_expression.
+    """
+    for formatversion, ahb_expression in [("FV2404", "Kann"), ("FV2410", "Soll"), ("FV2504", "Muss")]:
+        for pruefid in pruefids:
+            _write_ahb_csv(input_dir / formatversion / "nachrichtenformat_1" / "csv", pruefid, ahb_expression)
+
+
+def _assert_equal_csv_outputs(expected_output_dir: Path, output_dir: Path) -> None:
+    for expected_output_path in expected_output_dir.rglob("*.csv"):
+        output_path = output_dir / expected_output_path.relative_to(expected_output_dir)
+        assert output_path.read_text(encoding="utf-8") == expected_output_path.read_text(encoding="utf-8")
 
 
 def test_process_ahb_files_exports_matching_pairs(tmp_path: Path) -> None:
@@ -184,3 +213,328 @@ def test_process_ahb_files_no_consecutive_formatversions(tmp_path: Path, caplog:
     process_ahb_files(input_dir, output_dir)
 
     assert "No valid consecutive FVs subdirectories found to compare." in caplog.text
+
+
+def _fail_file_comparison(*args: Any, **kwargs: Any) -> bool:
+    raise AssertionError("files must not be compared byte by byte")
+
+
+def test_process_ahb_files_exports_identical_pids_as_unchanged(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    test that byte-identical pruefids are exported with all rows labeled as UNCHANGED
+    without comparing the files byte by byte.
+    """
+    monkeypatch.setattr(filecmp, "cmp", _fail_file_comparison)
+    input_dir = tmp_path / "input"
+    output_dir = tmp_path / "output"
+
+    _write_ahb_csv(input_dir / "FV2410" / "nachrichtenformat_1" / "csv", "pruefid_1")
+    _write_ahb_csv(input_dir / "FV2504" / "nachrichtenformat_1" / "csv", "pruefid_1")
+
+    process_ahb_files(input_dir, output_dir)
+
+    with open(output_dir / "FV2504_FV2410" / "nachrichtenformat_1" / "pruefid_1.csv", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert len(rows) == 2
+    assert rows[1][10] == ""
+
+
+def test_process_ahb_files_skip_unchanged(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """
+    test that pruefids which are identical or differ only in whitespaces are not exported with `skip_unchanged`.
+    """
+    caplog.set_level(logging.INFO)
+    input_dir = tmp_path / "input"
+    output_dir = tmp_path / "output"
+
+    _write_ahb_csv(input_dir / "FV2410" / "nachrichtenformat_1" / "csv", "pruefid_1")
+    _write_ahb_csv(input_dir / "FV2504" / "nachrichtenformat_1" / "csv", "pruefid_1")
+    _write_ahb_csv(input_dir / "FV2410" / "nachrichtenformat_1" / "csv", "pruefid_2")
+    (input_dir / "FV2504" / "nachrichtenformat_1" / "csv" / "pruefid_2.csv").write_text(
+        AHB_CSV_HEADER + AHB_CSV_ROW.replace("Nachrichten-Kopfsegment", "Nachrichten- Kopfsegment")
+    )
+
+    process_ahb_files(input_dir, output_dir, skip_unchanged=True)
+
+    assert "Skipping unchanged nachrichtenformat_1/pruefid_1" in caplog.text
+    assert "Skipping unchanged nachrichtenformat_1/pruefid_2" in caplog.text
+    assert not (output_dir / "FV2504_FV2410" / "nachrichtenformat_1" / "pruefid_1.csv").exists()
+    assert not (output_dir / "FV2504_FV2410" / "nachrichtenformat_1" / "pruefid_2.csv").exists()
+
+
+def test_are_byte_identical(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    test that files of different sizes and files with cached content hashes are not compared byte by byte.
+    """
+    csv_dir = tmp_path / "csv"
+    _write_ahb_csv(csv_dir, "pruefid_1")
+    _write_ahb_csv(csv_dir, "pruefid_2")
+    _write_ahb_csv(csv_dir, "pruefid_3", ahb_expression="Soll")
+    _write_ahb_csv(csv_dir, "pruefid_4", ahb_expression="Kann")
+    _write_ahb_csv(csv_dir, "pruefid_5", ahb_expression="Muss [1]")
+    parse_cache = CsvParseCache(tmp_path / "cache")
+    for pruefid in ("pruefid_1", "pruefid_2", "pruefid_4"):
+        read_csv_content(csv_dir / f"{pruefid}.csv", "FV2410", parse_cache=parse_cache)
+
+    assert _are_byte_identical(csv_dir / "pruefid_1.csv", csv_dir / "pruefid_2.csv", None)
+    assert not _are_byte_identical(csv_dir / "pruefid_3.csv", csv_dir / "pruefid_4.csv", None)
+
+    monkeypatch.setattr(filecmp, "cmp", _fail_file_comparison)
+    assert _are_byte_identical(csv_dir / "pruefid_1.csv", csv_dir / "pruefid_2.csv", parse_cache)
+    assert not _are_byte_identical(csv_dir / "pruefid_1.csv", csv_dir / "pruefid_4.csv", parse_cache)
+    assert not _are_byte_identical(csv_dir / "pruefid_3.csv", csv_dir / "pruefid_5.csv", None)
+    with pytest.raises(AssertionError):
+        _are_byte_identical(csv_dir / "pruefid_3.csv", csv_dir / "pruefid_4.csv", parse_cache)
+
+
+def test_process_ahb_files_trusted_input(tmp_path: Path) -> None:
+    """
+    test that trusted and memory-mapped input (aligned as lightweight rows) yield the same csv output as validated
+    input.
+    """
+    input_dir = tmp_path / "input"
+    test_data_dir = Path(__file__).parent / "test_data"
+    for formatversion in ["FV2410", "FV2504"]:
+        csv_dir = input_dir / formatversion / "nachrichtenformat_1" / "csv"
+        csv_dir.mkdir(parents=True)
+        (csv_dir / "55001.csv").write_bytes((test_data_dir / f"{formatversion}_55001.csv").read_bytes())
+
+    process_ahb_files(input_dir, tmp_path / "validated")
+    process_ahb_files(input_dir, tmp_path / "trusted", trusted_input=True)
+    process_ahb_files(input_dir, tmp_path / "mapped", memory_map=True)
+
+    result_path = Path("FV2504_FV2410") / "nachrichtenformat_1" / "55001.csv"
+    validated_output = (tmp_path / "validated" / result_path).read_text(encoding="utf-8")
+    assert "ENTFÄLLT" in validated_output
+    assert (tmp_path / "trusted" / result_path).read_text(encoding="utf-8") == validated_output
+    assert (tmp_path / "mapped" / result_path).read_text(encoding="utf-8") == validated_output
+
+
+def test_process_ahb_files_loads_each_formatversion_once(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """
+    test that the rows of a formatversion that is compared to both of its neighbours are only loaded once.
+    """
+    caplog.set_level(logging.INFO)
+    input_dir = tmp_path / "input"
+    output_dir = tmp_path / "output"
+    _write_consecutive_ahb_csvs(input_dir, ["pruefid_1"])
+
+    process_ahb_files(input_dir, output_dir)
+
+    assert "Loaded rows of 3 csv files, reused them 1 times" in caplog.text
+    assert (output_dir / "FV2504_FV2410" / "nachrichtenformat_1" / "pruefid_1.csv").exists()
+    assert (output_dir / "FV2410_FV2404" / "nachrichtenformat_1" / "pruefid_1.csv").exists()
+
+
+def test_process_ahb_files_with_prefetching(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """
+    test that loading upcoming PIDs in the background yields the same output and reports the waiting time.
+    """
+    caplog.set_level(logging.INFO)
+    input_dir = tmp_path / "input"
+    _write_consecutive_ahb_csvs(input_dir, ["pruefid_1", "pruefid_2", "pruefid_3"])
+
+    process_ahb_files(input_dir, tmp_path / "sequential")
+    process_ahb_files(input_dir, tmp_path / "prefetched", prefetch_depth=2)
+
+    assert "prefetch depth: 2" in caplog.text
+    assert "Loaded rows of 9 csv files, reused them 3 times" in caplog.text
+    _assert_equal_csv_outputs(tmp_path / "sequential", tmp_path / "prefetched")
+
+
+def test_process_ahb_files_in_worker_processes(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """
+    test that PIDs processed in worker processes yield the same output and log messages in the same order
+    and that a failing PID does not affect the others.
+    """
+    caplog.set_level(logging.INFO)
+    input_dir = tmp_path / "input"
+    _write_consecutive_ahb_csvs(input_dir, ["pruefid_1", "pruefid_2", "pruefid_3"])
+    (input_dir / "FV2410" / "nachrichtenformat_1" / "csv" / "pruefid_2.csv").write_text(
+        AHB_CSV_HEADER + "Kopf,SG1,UNH,,,,,,,"
+    )
+
+    process_ahb_files(input_dir, tmp_path / "sequential")
+    sequential_messages = [record.getMessage() for record in caplog.records if "Waited" not in record.getMessage()]
+    caplog.clear()
+    process_ahb_files(input_dir, tmp_path / "parallel", jobs=2)
+    parallel_messages = [record.getMessage() for record in caplog.records if "Waited" not in record.getMessage()]
+
+    assert parallel_messages == [message.replace("sequential", "parallel") for message in sequential_messages]
+    assert "❌ Error processing nachrichtenformat_1/pruefid_2" in caplog.text
+    _assert_equal_csv_outputs(tmp_path / "sequential", tmp_path / "parallel")
+    assert (tmp_path / "parallel" / "FV2504_FV2410" / "nachrichtenformat_1" / "pruefid_3.csv").exists()
+
+
+def test_process_ahb_files_in_pipeline(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """
+    test that PIDs processed in concurrent pipeline stages yield the same output and manifest
+    and that a failing PID does not affect the others.
+    """
+    caplog.set_level(logging.INFO)
+    input_dir = tmp_path / "input"
+    _write_consecutive_ahb_csvs(input_dir, ["pruefid_1", "pruefid_2", "pruefid_3"])
+    (input_dir / "FV2410" / "nachrichtenformat_1" / "csv" / "pruefid_2.csv").write_text(
+        AHB_CSV_HEADER + "Kopf,SG1,UNH,,,,,,,"
+    )
+
+    process_ahb_files(input_dir, tmp_path / "sequential")
+    caplog.clear()
+    process_ahb_files(input_dir, tmp_path / "pipeline", pipeline=PipelineConcurrency(load=2, align=2, export=3))
+
+    assert "❌ Error processing nachrichtenformat_1/pruefid_2" in caplog.text
+    assert caplog.text.count("✅ Successfully processed") == 4
+    _assert_equal_csv_outputs(tmp_path / "sequential", tmp_path / "pipeline")
+    assert AhbManifest.load(tmp_path / "pipeline").entries == AhbManifest.load(tmp_path / "sequential").entries
+
+
+def test_process_ahb_files_incremental(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    """
+    test that incremental runs only compare PIDs with changed inputs and that orphaned outputs are reported and pruned.
+    """
+    caplog.set_level(logging.INFO)
+    input_dir = tmp_path / "input"
+    output_dir = tmp_path / "output"
+    for formatversion in ["FV2410", "FV2504"]:
+        for pruefid in ["pruefid_1", "pruefid_2"]:
+            _write_ahb_csv(input_dir / formatversion / "nachrichtenformat_1" / "csv", pruefid)
+
+    # runs that are not incremental do not hash their inputs
+    process_ahb_files(input_dir, output_dir)
+    assert AhbManifest.load(output_dir).entries["FV2504_FV2410/nachrichtenformat_1/pruefid_1"].previous_hash is None
+
+    process_ahb_files(input_dir, output_dir, incremental=True)
+    manifest = AhbManifest.load(output_dir)
+    assert set(manifest.entries) == {
+        "FV2504_FV2410/nachrichtenformat_1/pruefid_1",
+        "FV2504_FV2410/nachrichtenformat_1/pruefid_2",
+    }
+    assert manifest.entries["FV2504_FV2410/nachrichtenformat_1/pruefid_1"].outputs == (
+        "FV2504_FV2410/nachrichtenformat_1/pruefid_1.csv",
+        "FV2504_FV2410/nachrichtenformat_1/pruefid_1.xlsx",
+    )
+
+    (input_dir / "FV2504" / "nachrichtenformat_1" / "csv" / "pruefid_2.csv").write_text(
+        AHB_CSV_HEADER + AHB_CSV_ROW.replace("Muss", "Kann")
+    )
+    orphan_path = output_dir / "FV2504_FV2410" / "nachrichtenformat_1" / "pruefid_3.csv"
+    orphan_path.write_text("")
+    caplog.clear()
+    process_ahb_files(input_dir, output_dir, incremental=True)
+
+    assert "Skipping 1 up-to-date PID comparisons" in caplog.text
+    assert "Processing FV2504 -> FV2410: nachrichtenformat_1 - pruefid_2" in caplog.text
+    assert "pruefid_1" not in caplog.text
+    assert f"Orphaned output file: {orphan_path}" in caplog.text
+    assert AhbManifest.load(output_dir).entries.keys() == manifest.entries.keys()
+
+    process_ahb_files(input_dir, output_dir, incremental=True, prune_orphans=True)
+    assert not orphan_path.exists()
+    assert (output_dir / "FV2504_FV2410" / "nachrichtenformat_1" / "pruefid_1.xlsx").exists()
+
+
+def test_process_ahb_files_keeps_outputs_of_failed_comparisons(tmp_path: Path) -> None:
+    """
+    test that the outputs of a failed PID comparison are no orphans and that it is compared again by the next run.
+    """
+    input_dir = tmp_path / "input"
+    output_dir = tmp_path / "output"
+    for formatversion in ["FV2410", "FV2504"]:
+        _write_ahb_csv(input_dir / formatversion / "nachrichtenformat_1" / "csv", "pruefid_1")
+    process_ahb_files(input_dir, output_dir, incremental=True)
+
+    # an empty ahb_expression is invalid
+    (input_dir / "FV2504" / "nachrichtenformat_1" / "csv" / "pruefid_1.csv").write_text(
+        AHB_CSV_HEADER + AHB_CSV_ROW.replace("Muss", " ")
+    )
+    process_ahb_files(input_dir, output_dir, incremental=True, prune_orphans=True)
+
+    manifest_entry = AhbManifest.load(output_dir).entries["FV2504_FV2410/nachrichtenformat_1/pruefid_1"]
+    assert manifest_entry.previous_hash is None and manifest_entry.subsequent_hash is None
+    assert manifest_entry.outputs == (
+        "FV2504_FV2410/nachrichtenformat_1/pruefid_1.csv",
+        "FV2504_FV2410/nachrichtenformat_1/pruefid_1.xlsx",
+    )
+    assert (output_dir / "FV2504_FV2410" / "nachrichtenformat_1" / "pruefid_1.xlsx").exists()
+
+
+def test_process_ahb_files_with_filter(tmp_path: Path) -> None:
+    """
+    test that a filtered run only compares the selected formatversion pairs and PIDs and keeps the manifest entries
+    and outputs of all other PIDs.
+    """
+    input_dir = tmp_path / "input"
+    output_dir = tmp_path / "output"
+    for formatversion in ["FV2404", "FV2410", "FV2504"]:
+        for pruefid in ["55001", "55002", "17001"]:
+            _write_ahb_csv(input_dir / formatversion / "nachrichtenformat_1" / "csv", pruefid)
+
+    assert get_formatversion_pairs(input_dir, catalog_filter=AhbCatalogFilter(formatversions=("FV2404",))) == [
+        (EdifactFormatVersion.FV2410, EdifactFormatVersion.FV2404)
+    ]
+
+    process_ahb_files(input_dir, output_dir, catalog_filter=AhbCatalogFilter(pruefids=("17001",)))
+    process_ahb_files(
+        input_dir,
+        output_dir,
+        prune_orphans=True,
+        catalog_filter=AhbCatalogFilter(formatversions=("FV2504",), pruefids=("5500?",)),
+    )
+
+    assert sorted(path.relative_to(output_dir).as_posix() for path in output_dir.rglob("*.csv")) == [
+        "FV2410_FV2404/nachrichtenformat_1/17001.csv",
+        "FV2504_FV2410/nachrichtenformat_1/17001.csv",
+        "FV2504_FV2410/nachrichtenformat_1/55001.csv",
+        "FV2504_FV2410/nachrichtenformat_1/55002.csv",
+    ]
+    assert len(AhbManifest.load(output_dir).entries) == 4
+
+
+def test_process_ahb_files_closes_mapped_files_of_failed_loads(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    test that the memory-mapped previous file of a PID is closed if its subsequent file cannot be loaded.
+    """
+    input_dir = tmp_path / "input"
+    _write_ahb_csv(input_dir / "FV2410" / "nachrichtenformat_1" / "csv", "pruefid_1")
+    subsequent_csv_dir = input_dir / "FV2504" / "nachrichtenformat_1" / "csv"
+    subsequent_csv_dir.mkdir(parents=True)
+    # not utf-8
+    (subsequent_csv_dir / "pruefid_1.csv").write_bytes(b"\xff" + AHB_CSV_HEADER.encode())
+    closed_formatversions = []
+
+    def record_closed_file(ahb_rows: Sequence[AnyAhbRow]) -> None:
+        closed_formatversions.append(ahb_rows[0].formatversion)
+        close_mapped_file(ahb_rows)
+
+    monkeypatch.setattr(ahb_processing, "close_mapped_file", record_closed_file)
+    process_ahb_files(input_dir, tmp_path / "output", memory_map=True)
+
+    assert closed_formatversions == ["FV2410"]
+
+
+@pytest.mark.parametrize("options", [{"prefetch_depth": 1}, {"pipeline": PipelineConcurrency()}])
+def test_process_ahb_files_does_not_fork_from_threads(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, options: dict[str, Any]
+) -> None:
+    """
+    test that blocks are not aligned in worker processes while loading or exporting threads are running.
+    """
+    input_dir = tmp_path / "input"
+    for formatversion in ["FV2410", "FV2504"]:
+        csv_dir = input_dir / formatversion / "nachrichtenformat_1" / "csv"
+        csv_dir.mkdir(parents=True)
+        # two blocks that both changed
+        ahb_csv_row = AHB_CSV_ROW.replace("Description", f"Description {formatversion}")
+        (csv_dir / "pruefid_1.csv").write_text(
+            AHB_CSV_HEADER + ahb_csv_row + "\n" + ahb_csv_row.replace("Nachrichten-Kopfsegment", "Ende")
+        )
+
+    def fail(*_: object, **__: object) -> None:
+        raise AssertionError("no worker processes expected")
+
+    monkeypatch.setattr(ahb_comparison, "_PARALLEL_BLOCK_ALIGNMENT_MIN_ROWS", 0)
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    monkeypatch.setattr(ahb_comparison, "ProcessPoolExecutor", fail)
+    process_ahb_files(input_dir, tmp_path / "output", algorithm=AlignmentAlgorithm.BLOCKWISE, **options)
+
+    assert (tmp_path / "output" / "FV2504_FV2410" / "nachrichtenformat_1" / "pruefid_1.csv").exists()
@@ -0,0 +1,65 @@
+import pickle
+
+from ahlbatross.core.ahb_comparison import align_ahb_rows
+from ahlbatross.enums.alignment_algorithms import AlignmentAlgorithm
+from ahlbatross.models.ahb import AhbRow
+from ahlbatross.models.ahb_row_data import AhbRowData
+
+
+def test_ahb_row_data_adapters() -> None:
+    """
+    test that rows converted between AhbRow and AhbRowData keep their entries and fingerprint.
+    """
+    ahb_row = AhbRow(
+        formatversion="FV2410",
+        section_name="Nachrichten- Kopfsegment",
+        segment_code="UNH",
+        value_pool_entry=None,
+        name="Nachrichten-Referenznummer",
+        ahb_expression="Muss",
+    )
+
+    row_data = AhbRowData.from_ahb_row(ahb_row)
+    converted_ahb_row = AhbRow.from_row_data(row_data)
+
+    assert row_data.section_name == ahb_row.section_name
+    assert row_data.normalized_entries == ahb_row.normalized_entries
+    assert row_data.fingerprint == ahb_row.fingerprint
+    assert row_data.get_key() == ahb_row.get_key()
+    assert converted_ahb_row == ahb_row
+    assert converted_ahb_row.fingerprint == ahb_row.fingerprint
+    assert AhbRowData.from_ahb_line(ahb_row, "FV2504").formatversion == "FV2504"
+    assert pickle.loads(pickle.dumps(row_data)) == row_data
+
+
+def test_align_ahb_row_data() -> None:
+    """
+    test that lightweight rows are aligned exactly like AhbRow's.
+    """
+    previous_ahb_rows = [
+        AhbRow(
+            formatversion="FV2410",
+            section_name=section_name,
+            segment_code=segment_code,
+            value_pool_entry=None,
+            name=None,
+        )
+        for section_name, segment_code in [("Kopf", "UNH"), ("Kopf", "BGM"), ("Ende", "UNT")]
+    ]
+    subsequent_ahb_rows = [
+        AhbRow(
+            formatversion="FV2504",
+            section_name=section_name,
+            segment_code=segment_code,
+            value_pool_entry=None,
+            name=None,
+        )
+        for section_name, segment_code in [("Kopf", "UNH"), ("Neu", "DTM"), ("Ende", "UNT")]
+    ]
+
+    for algorithm in AlignmentAlgorithm:
+        assert align_ahb_rows(
+            [AhbRowData.from_ahb_row(row) for row in previous_ahb_rows],
+            [AhbRowData.from_ahb_row(row) for row in subsequent_ahb_rows],
+            algorithm,
+        ) == align_ahb_rows(previous_ahb_rows, subsequent_ahb_rows, algorithm)
@@ -0,0 +1,83 @@
+from collections.abc import Sequence
+
+from ahlbatross.core.ahb_rows_cache import AhbRowsCache
+from ahlbatross.models.ahb import AnyAhbRow
+from ahlbatross.models.ahb_row_data import AhbRowData
+
+PREVIOUS_KEY = ("FV2410", "UTILMD", "55001")
+SUBSEQUENT_KEY = ("FV2504", "UTILMD", "55001")
+
+
+def test_ahb_rows_cache_evicts_after_last_use() -> None:
+    """
+    test that rows are kept until their last scheduled use and loaded only once.
+    """
+    ahb_rows = [AhbRowData("FV2410", "Kopf")]
+    rows_cache = AhbRowsCache([PREVIOUS_KEY, SUBSEQUENT_KEY, PREVIOUS_KEY])
+
+    assert rows_cache.get_rows(PREVIOUS_KEY, lambda: ahb_rows) is ahb_rows
+    assert rows_cache.get_rows(SUBSEQUENT_KEY, list) == []
+    assert len(rows_cache) == 1
+    rows_cache.release(PREVIOUS_KEY)
+    rows_cache.release(SUBSEQUENT_KEY)
+
+    assert rows_cache.get_rows(PREVIOUS_KEY, list) is ahb_rows
+    rows_cache.release(PREVIOUS_KEY)
+    assert len(rows_cache) == 0
+    assert (rows_cache.loads, rows_cache.hits) == (2, 1)
+
+
+def test_ahb_rows_cache_max_rows() -> None:
+    """
+    test that rows exceeding the maximum number of cached rows are loaded again.
+    """
+    rows_cache = AhbRowsCache([PREVIOUS_KEY, PREVIOUS_KEY], max_rows=1)
+
+    rows_cache.get_rows(PREVIOUS_KEY, lambda: [AhbRowData("FV2410"), AhbRowData("FV2410")])
+    rows_cache.release(PREVIOUS_KEY)
+    rows_cache.get_rows(PREVIOUS_KEY, list)
+
+    assert (rows_cache.loads, rows_cache.hits) == (2, 0)
+
+
+def test_ahb_rows_cache_closes_unused_rows() -> None:
+    """
+    test that rows are closed once they are neither cached nor used anymore.
+    """
+    closed_rows: list[Sequence[AnyAhbRow]] = []
+    rows_cache = AhbRowsCache([PREVIOUS_KEY, SUBSEQUENT_KEY, PREVIOUS_KEY], close_rows=closed_rows.append)
+    previous_rows = [AhbRowData("FV2410", "Kopf")]
+    subsequent_rows = [AhbRowData("FV2504", "Kopf")]
+
+    rows_cache.get_rows(PREVIOUS_KEY, lambda: previous_rows)
+    rows_cache.get_rows(SUBSEQUENT_KEY, lambda: subsequent_rows)
+    rows_cache.release(PREVIOUS_KEY, previous_rows)
+    rows_cache.release(SUBSEQUENT_KEY, subsequent_rows)
+    assert closed_rows == [subsequent_rows]
+
+    rows_cache.get_rows(PREVIOUS_KEY, list)
+    rows_cache.release(PREVIOUS_KEY, previous_rows)
+    assert closed_rows == [subsequent_rows, previous_rows]
+
+
+def test_ahb_rows_cache_closes_discarded_rows() -> None:
+    """
+    test that rows whose use is aborted are closed once they are not cached, and after the last use otherwise.
+    """
+    closed_rows: list[Sequence[AnyAhbRow]] = []
+    rows_cache = AhbRowsCache([PREVIOUS_KEY, SUBSEQUENT_KEY, SUBSEQUENT_KEY], close_rows=closed_rows.append)
+    previous_rows = [AhbRowData("FV2410", "Kopf")]
+    subsequent_rows = [AhbRowData("FV2504", "Kopf")]
+
+    rows_cache.get_rows(PREVIOUS_KEY, lambda: previous_rows)
+    rows_cache.discard(PREVIOUS_KEY, previous_rows)
+    rows_cache.release(PREVIOUS_KEY)
+    assert closed_rows == [previous_rows]
+
+    rows_cache.get_rows(SUBSEQUENT_KEY, lambda: subsequent_rows)
+    rows_cache.discard(SUBSEQUENT_KEY, subsequent_rows)
+    rows_cache.release(SUBSEQUENT_KEY)
+    assert closed_rows == [previous_rows]
+    rows_cache.get_rows(SUBSEQUENT_KEY, list)
+    rows_cache.release(SUBSEQUENT_KEY, subsequent_rows)
+    assert closed_rows == [previous_rows, subsequent_rows]
@@ -51,3 +51,29 @@ def test_invalid_input_output_path(tmp_path: Path, caplog: pytest.LogCaptureFixt
     assert "❌ Input directory does not exist:" in caplog.text
     assert str(invalid_dir) in caplog.text
     assert result.exit_code == 1
+
+
+def test_compare_with_alignment_algorithm(tmp_path: Path) -> None:
+    """
+    test CLI handling of the "--algorithm"/"-a" option.
+    """
+    header = (
+        "Segmentname,Segmentgruppe,Segment,Datenelement,Segment ID,Code,Beschreibung,Bedingungsausdruck,Bedingung\n"
+    )
+    for formatversion in ["FV2410", "FV2504"]:
+        csv_dir = tmp_path / "input" / formatversion / "Nachrichtenformat_1" / "csv"
+        csv_dir.mkdir(parents=True)
+        (csv_dir / "55001.csv").write_text(header + "Nachrichten-Kopfsegment,,UNH,,00001,,,Muss,\n")
+    output_dir = tmp_path / "output"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        app, ["compare", "-i", str(tmp_path / "input"), "-o", str(output_dir), "--algorithm", "myers"]
+    )
+    invalid_result = runner.invoke(
+        app, ["compare", "-i", str(tmp_path / "input"), "-o", str(output_dir), "--algorithm", "unknown"]
+    )
+
+    assert result.exit_code == 0
+    assert (output_dir / "FV2504_FV2410" / "Nachrichtenformat_1" / "55001.csv").exists()
+    assert invalid_result.exit_code != 0
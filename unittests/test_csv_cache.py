@@ -0,0 +1,118 @@
+import os
+import shutil
+from pathlib import Path
+
+from ahlbatross.formats.csv import load_csv_files, read_csv_content, read_csv_rows
+from ahlbatross.formats.csv_cache import CsvParseCache, _get_content_hash
+
+TEST_DATA_DIR = Path(__file__).parent / "test_data"
+
+
+def test_cached_load_equals_parsed_load(tmp_path: Path) -> None:
+    """
+    test that rows read from the parse cache equal parsed rows, including their fingerprints.
+    """
+    previous_csv, subsequent_csv = TEST_DATA_DIR / "FV2410_55001.csv", TEST_DATA_DIR / "FV2504_55001.csv"
+    parse_cache = CsvParseCache(tmp_path / "cache")
+
+    parsed_ahb_rows = load_csv_files(previous_csv, subsequent_csv, "FV2410", "FV2504", parse_cache=parse_cache)
+    cached_ahb_rows = load_csv_files(previous_csv, subsequent_csv, "FV2410", "FV2504", parse_cache=parse_cache)
+
+    assert (parse_cache.misses, parse_cache.hits) == (2, 2)
+    for parsed_rows, cached_rows in zip(parsed_ahb_rows, cached_ahb_rows, strict=True):
+        assert cached_rows == parsed_rows
+        assert [row.fingerprint for row in cached_rows] == [row.fingerprint for row in parsed_rows]
+    assert read_csv_rows(previous_csv, "FV2410", parse_cache=parse_cache)[0].formatversion == "FV2410"
+    assert parse_cache.hits == 3
+
+
+def test_parse_cache_invalidation(tmp_path: Path) -> None:
+    """
+    test that cache entries survive a changed mtime with unchanged content, but not a changed content
+    and that entries stored without validation are not used for validated reads.
+    """
+    ahb_csv = tmp_path / "55001.csv"
+    shutil.copyfile(TEST_DATA_DIR / "FV2410_55001.csv", ahb_csv)
+    parse_cache = CsvParseCache(tmp_path / "cache")
+
+    read_csv_content(ahb_csv, "FV2410", parse_cache=parse_cache)
+    file_stat = ahb_csv.stat()
+    os.utime(ahb_csv, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 10**9))
+    read_csv_content(ahb_csv, "FV2410", parse_cache=parse_cache)
+    assert (parse_cache.misses, parse_cache.hits) == (1, 1)
+
+    ahb_csv.write_text(ahb_csv.read_text(encoding="utf-8").replace("Muss", "Soll"), encoding="utf-8")
+    read_csv_content(ahb_csv, "FV2410", trusted=True, parse_cache=parse_cache)
+    assert (parse_cache.misses, parse_cache.hits) == (2, 1)
+
+    ahb_rows = read_csv_content(ahb_csv, "FV2410", parse_cache=parse_cache)
+    assert (parse_cache.misses, parse_cache.hits) == (3, 1)
+    assert "Muss" not in {row.ahb_expression for row in ahb_rows}
+
+
+def test_parse_cache_content_hash(tmp_path: Path) -> None:
+    """
+    test that the stored content hash is only returned for cached files with unchanged size and mtime.
+    """
+    ahb_csv = tmp_path / "55001.csv"
+    shutil.copyfile(TEST_DATA_DIR / "FV2410_55001.csv", ahb_csv)
+    parse_cache = CsvParseCache(tmp_path / "cache")
+    assert parse_cache.get_content_hash(ahb_csv) is None
+
+    read_csv_content(ahb_csv, "FV2410", parse_cache=parse_cache)
+    assert parse_cache.get_content_hash(ahb_csv) == _get_content_hash(ahb_csv)
+    assert (parse_cache.misses, parse_cache.hits) == (1, 0)
+
+    file_stat = ahb_csv.stat()
+    os.utime(ahb_csv, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 10**9))
+    assert parse_cache.get_content_hash(ahb_csv) is None
+
+
+def test_parse_cache_eviction(tmp_path: Path) -> None:
+    """
+    test that the least recently used entries are evicted if the cache exceeds its maximum size
+    and that corrupt entries are ignored.
+    """
+    csv_paths = []
+    for pruefid in ["55001", "55002", "55003"]:
+        csv_paths.append(tmp_path / f"{pruefid}.csv")
+        shutil.copyfile(TEST_DATA_DIR / "FV2410_55001.csv", csv_paths[-1])
+    parse_cache = CsvParseCache(tmp_path / "cache")
+    read_csv_rows(csv_paths[0], "FV2410", parse_cache=parse_cache)
+    entry_size = sum(entry.stat().st_size for entry in (tmp_path / "cache").iterdir())
+    parse_cache.max_size = 2 * entry_size + entry_size // 2
+
+    read_csv_rows(csv_paths[1], "FV2410", parse_cache=parse_cache)
+    entry_paths = sorted((tmp_path / "cache").iterdir(), key=lambda entry: entry.stat().st_mtime_ns)
+    os.utime(entry_paths[0], ns=(0, 0))
+    os.utime(entry_paths[1], ns=(1, 1))
+    read_csv_rows(csv_paths[0], "FV2410", parse_cache=parse_cache)
+    read_csv_rows(csv_paths[2], "FV2410", parse_cache=parse_cache)
+
+    assert len(list((tmp_path / "cache").iterdir())) == 2
+    read_csv_rows(csv_paths[0], "FV2410", parse_cache=parse_cache)
+    read_csv_rows(csv_paths[1], "FV2410", parse_cache=parse_cache)
+    assert (parse_cache.misses, parse_cache.hits) == (4, 2)
+
+    for entry_path in (tmp_path / "cache").iterdir():
+        entry_path.write_bytes(b"corrupt")
+    assert len(read_csv_rows(csv_paths[0], "FV2410", parse_cache=parse_cache)) > 0
+    assert parse_cache.misses == 5
+
+
+def test_parse_cache_tracks_its_size(tmp_path: Path) -> None:
+    """
+    test that the size of existing entries is determined when the cache is opened and that entries of another format
+    are ignored.
+    """
+    ahb_csv = TEST_DATA_DIR / "FV2410_55001.csv"
+    read_csv_rows(ahb_csv, "FV2410", parse_cache=CsvParseCache(tmp_path / "cache"))
+    (entry_path,) = (tmp_path / "cache").iterdir()
+
+    parse_cache = CsvParseCache(tmp_path / "cache")
+    assert parse_cache._cache_size == entry_path.stat().st_size  # pylint: disable=protected-access
+
+    entry_path.write_bytes(b"\x80\x05" + entry_path.read_bytes())
+    read_csv_rows(ahb_csv, "FV2410", parse_cache=parse_cache)
+    assert (parse_cache.misses, parse_cache.hits) == (1, 0)
+    assert parse_cache._cache_size == entry_path.stat().st_size  # pylint: disable=protected-access
@@ -4,9 +4,21 @@ from pathlib import Path
 
 import pytest
 
+from ahlbatross.core.ahb_comparison import iter_align_ahb_rows
 from ahlbatross.enums.diff_types import DiffType
-from ahlbatross.formats.csv import export_to_csv, get_csv_files, load_csv_files
+from ahlbatross.formats.csv import (
+    MappedCsvFile,
+    close_mapped_file,
+    export_to_csv,
+    get_csv_files,
+    iter_csv_content,
+    load_csv_files,
+    load_csv_mapped,
+    read_csv_content,
+    validate_ahb_rows,
+)
 from ahlbatross.models.ahb import AhbRow, AhbRowComparison, AhbRowDiff
+from ahlbatross.utils.string_pool import StringPool
 
 AHB_CSV_HEADER = (
     "Segmentname,Segmentgruppe,Segment,Datenelement,Segment ID,"
@@ -231,3 +243,237 @@ def test_load_csv_without_segmentname_column() -> None:
                 previous_formatversion="FV2410",
                 subsequent_formatversion="FV2504",
             )
+
+
+def test_load_csv_files_precomputes_fingerprints(tmp_path: Path) -> None:
+    """
+    test that loaded rows carry their normalized entries and a fingerprint that ignores whitespaces.
+    """
+    previous_ahb_csv = tmp_path / "previous_pruefid.csv"
+    previous_ahb_csv.write_text(
+        AHB_CSV_HEADER + "Nachrichten-Kopfsegment,SG1,TST,0001,00001,E_0001,,Description 1,Muss,[1] Condition"
+    )
+    subsequent_ahb_csv = tmp_path / "subsequent_pruefid.csv"
+    subsequent_ahb_csv.write_text(
+        AHB_CSV_HEADER + "Nachrichten- Kopfsegment,SG1,TST,0001,00001,E_0001,,Description 1,Muss,[1]  Condition"
+    )
+
+    previous_ahb_rows, subsequent_ahb_rows = load_csv_files(
+        previous_ahb_csv, subsequent_ahb_csv, previous_formatversion="FV2410", subsequent_formatversion="FV2504"
+    )
+
+    assert "fingerprint" in vars(previous_ahb_rows[0])
+    assert previous_ahb_rows[0].normalized_entries[0] == "Nachrichten-Kopfsegment"
+    assert previous_ahb_rows[0].normalized_entries[-1] == "[1]Condition"
+    assert previous_ahb_rows[0].fingerprint == subsequent_ahb_rows[0].fingerprint
+    other_ahb_row = AhbRow(formatversion="FV2410", section_name="Other", value_pool_entry=None, name=None)
+    assert previous_ahb_rows[0].fingerprint != other_ahb_row.fingerprint
+
+
+def test_export_to_csv_streams_comparisons(tmp_path: Path) -> None:
+    """
+    test that lazily read rows can be aligned and exported without materializing the comparisons.
+    """
+    previous_ahb_csv = tmp_path / "previous_pruefid.csv"
+    previous_ahb_csv.write_text(AHB_CSV_HEADER + "Kopf,SG1,UNH,,,,,,Muss,\nEnde,SG2,UNT,,,,,,Muss,")
+    subsequent_ahb_csv = tmp_path / "subsequent_pruefid.csv"
+    subsequent_ahb_csv.write_text(AHB_CSV_HEADER + "Kopf,SG1,UNH,,,,,,Muss,\nNeu,SG3,BGM,,,,,,Kann,")
+    csv_path = tmp_path / "export.csv"
+
+    export_to_csv(
+        iter_align_ahb_rows(
+            iter_csv_content(previous_ahb_csv, "FV2410"), iter_csv_content(subsequent_ahb_csv, "FV2504")
+        ),
+        csv_path,
+    )
+
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+
+    assert rows[0][1] == "Segmentname_FV2410"
+    assert [(row[1], row[10], row[11]) for row in rows[1:]] == [
+        ("Kopf", "", "Kopf"),
+        ("Ende", DiffType.REMOVED.value, ""),
+        ("", DiffType.ADDED.value, "Neu"),
+    ]
+
+
+def test_export_to_csv_without_comparisons(tmp_path: Path) -> None:
+    """
+    test that exporting no comparisons at all raises an error instead of writing a file without formatversions.
+    """
+    csv_path = tmp_path / "export.csv"
+
+    with pytest.raises(ValueError):
+        export_to_csv(iter([]), csv_path)
+
+    assert not csv_path.exists()
+
+
+def test_load_csv_files_shares_strings_within_string_pool(tmp_path: Path) -> None:
+    """
+    test that recurring cell values of both AHBs are loaded as a single shared string object.
+    """
+    previous_ahb_csv = tmp_path / "previous_pruefid.csv"
+    previous_ahb_csv.write_text(
+        AHB_CSV_HEADER + "Nachrichten-Kopfsegment,SG1,TST,0001,00001,E_0001,,Description 1,Muss,[1] Condition"
+    )
+    subsequent_ahb_csv = tmp_path / "subsequent_pruefid.csv"
+    subsequent_ahb_csv.write_text(
+        AHB_CSV_HEADER + "Nachrichten-Kopfsegment,SG1,TST,0002,00001,E_0002,,Description 2,Muss,[1] Condition"
+    )
+    string_pool = StringPool()
+
+    previous_ahb_rows, subsequent_ahb_rows = load_csv_files(
+        previous_ahb_csv, subsequent_ahb_csv, "FV2410", "FV2504", string_pool
+    )
+
+    assert previous_ahb_rows[0].section_name is subsequent_ahb_rows[0].section_name
+    assert previous_ahb_rows[0].conditions is subsequent_ahb_rows[0].conditions
+    assert previous_ahb_rows[0].name is not subsequent_ahb_rows[0].name
+    assert "[1] Condition" in string_pool
+    assert len(string_pool) == 15
+
+
+def test_trusted_load_equals_validated_load() -> None:
+    """
+    test that rows loaded without validation equal validated rows, including their fingerprints.
+    """
+    for csv_path in sorted((Path(__file__).parent / "test_data").glob("*.csv")):
+        validated_ahb_rows = read_csv_content(csv_path, "FV2410")
+        trusted_ahb_rows = read_csv_content(csv_path, "FV2410", trusted=True)
+
+        assert trusted_ahb_rows == validated_ahb_rows
+        assert [row.fingerprint for row in trusted_ahb_rows] == [row.fingerprint for row in validated_ahb_rows]
+        validate_ahb_rows(trusted_ahb_rows)
+
+
+def test_trusted_load_missing_columns(tmp_path: Path) -> None:
+    """
+    test that missing columns of trusted csv files are loaded as None and a missing Segmentname column still fails.
+    """
+    ahb_csv = tmp_path / "pruefid.csv"
+    ahb_csv.write_text("Segmentname,Qualifier,Bedingungsausdruck\nKopf,IC, Muss \nEnde\n")
+
+    previous_ahb_rows, subsequent_ahb_rows = load_csv_files(ahb_csv, ahb_csv, "FV2410", "FV2504", trusted=True)
+
+    assert previous_ahb_rows[0].value_pool_entry == "IC"
+    assert previous_ahb_rows[0].ahb_expression == "Muss"
+    assert previous_ahb_rows[0].segment_code is None
+    assert subsequent_ahb_rows[1].ahb_expression is None
+    assert subsequent_ahb_rows[1].formatversion == "FV2504"
+
+    ahb_csv.write_text("Segmentgruppe\nSG1")
+    with pytest.raises(KeyError):
+        read_csv_content(ahb_csv, "FV2410", trusted=True)
+
+
+@pytest.mark.parametrize("ahb_expression", ["", "  "])
+def test_trusted_load_rejects_empty_ahb_expression(tmp_path: Path, ahb_expression: str) -> None:
+    """
+    test that empty or whitespace-only ahb_expressions are rejected by trusted loading just like by validated loading.
+    """
+    ahb_csv = tmp_path / "pruefid.csv"
+    ahb_csv.write_text(AHB_CSV_HEADER + f"Kopf,SG1,UNH,,,,,,Muss,\nKopf,SG1,UNH,,,,,,{ahb_expression},")
+
+    with pytest.raises(ValueError):
+        read_csv_content(ahb_csv, "FV2410")
+    with pytest.raises(ValueError):
+        read_csv_content(ahb_csv, "FV2410", trusted=True)
+
+
+def test_validate_trusted_rows() -> None:
+    """
+    test that invalid rows constructed without validation are detected by the batched validation.
+    """
+    valid_ahb_row = AhbRow.model_construct(formatversion="FV2410", section_name="Kopf", ahb_expression="Muss")
+    invalid_ahb_row = AhbRow.model_construct(formatversion="FV2410", section_name="Kopf", ahb_expression="")
+
+    validate_ahb_rows([valid_ahb_row])
+    with pytest.raises(ValueError):
+        validate_ahb_rows([valid_ahb_row, invalid_ahb_row])
+
+
+def test_mapped_load_equals_trusted_load() -> None:
+    """
+    test that memory-mapped rows have the same entries and fingerprints as rows loaded without validation.
+    """
+    test_data_dir = Path(__file__).parent / "test_data"
+    previous_csv, subsequent_csv = test_data_dir / "FV2410_55001.csv", test_data_dir / "FV2504_55001.csv"
+
+    trusted_ahb_rows = load_csv_files(previous_csv, subsequent_csv, "FV2410", "FV2504", trusted=True)
+    mapped_ahb_rows = load_csv_mapped(previous_csv, subsequent_csv, "FV2410", "FV2504")
+
+    for trusted_rows, mapped_rows in zip(trusted_ahb_rows, mapped_ahb_rows, strict=True):
+        assert [AhbRow.from_row_data(row) for row in mapped_rows] == trusted_rows
+        assert [row.fingerprint for row in mapped_rows] == [row.fingerprint for row in trusted_rows]
+
+
+def test_mapped_csv_file_records(tmp_path: Path) -> None:
+    """
+    test that quoted line breaks, CRLF line endings and blank lines are indexed correctly
+    and that identical records are decoded only once across files with identical headers.
+    """
+    previous_csv = tmp_path / "previous.csv"
+    previous_csv.write_bytes(
+        (
+            AHB_CSV_HEADER + 'Kopf,SG1,UNH,,,,,"Nachrichten-\r\nReferenz, ""neu""", Muss ,\r\n\r\nEnde,,UNT,,,,,,,'
+        ).encode()
+    )
+    subsequent_csv = tmp_path / "subsequent.csv"
+    subsequent_csv.write_bytes(previous_csv.read_bytes() + b"\nEnde,,UNZ,,,,,,,\n")
+
+    previous_ahb_rows, subsequent_ahb_rows = load_csv_mapped(previous_csv, subsequent_csv, "FV2410", "FV2504")
+
+    assert len(previous_ahb_rows) == 2
+    assert previous_ahb_rows[0].name == 'Nachrichten-\r\nReferenz, "neu"'
+    assert previous_ahb_rows[0].ahb_expression == "Muss"
+    assert previous_ahb_rows[1].segment_code == "UNT"
+    assert [row.segment_code for row in subsequent_ahb_rows] == ["UNH", "UNT", "UNZ"]
+    assert subsequent_ahb_rows[0].formatversion == "FV2504"
+    mapped_csv_file = subsequent_ahb_rows[0].source
+    assert isinstance(mapped_csv_file, MappedCsvFile)
+    assert len(mapped_csv_file.records) == 3
+
+    previous_csv.write_bytes(b"")
+    with pytest.raises(KeyError):
+        MappedCsvFile(previous_csv, "FV2410")
+
+
+def test_mapped_csv_file_mid_entry_quotes(tmp_path: Path) -> None:
+    """
+    test that quotes within unquoted entries are taken literally like by `csv.reader`
+    instead of starting a quoted entry that swallows the following records.
+    """
+    ahb_csv = tmp_path / "mid_entry_quotes.csv"
+    ahb_csv.write_text(
+        AHB_CSV_HEADER + 'Kopf,SG1,UN"H,,,,,Nachrichten-Kopf,Muss,\nKopf,SG1,BGM,,,,,"Beginn ""der"" Nachricht",Muss,\n'
+        "Ende,,UNT,,,,,Nachrichten-Ende,Muss,\n",
+        encoding="utf-8",
+    )
+
+    trusted_ahb_rows, _ = load_csv_files(ahb_csv, ahb_csv, "FV2410", "FV2504", trusted=True)
+    mapped_ahb_rows, _ = load_csv_mapped(ahb_csv, ahb_csv, "FV2410", "FV2504")
+
+    assert [row.segment_code for row in trusted_ahb_rows] == ['UN"H', "BGM", "UNT"]
+    assert [AhbRow.from_row_data(row) for row in mapped_ahb_rows] == trusted_ahb_rows
+
+
+def test_close_mapped_csv_file() -> None:
+    """
+    test that closed memory-mapped files keep their decoded records, but cannot decode any further records.
+    """
+    ahb_csv = Path(__file__).parent / "test_data" / "FV2410_55001.csv"
+    with MappedCsvFile(ahb_csv, "FV2410") as mapped_csv_file:
+        ahb_rows = mapped_csv_file.get_rows()
+        segment_code = ahb_rows[0].segment_code
+
+    assert ahb_rows[0].segment_code == segment_code
+    with pytest.raises(ValueError):
+        _ = ahb_rows[1].segment_code
+
+    ahb_rows = MappedCsvFile(ahb_csv, "FV2410").get_rows()
+    close_mapped_file(ahb_rows)
+    close_mapped_file([])
+    with pytest.raises(ValueError):
+        _ = ahb_rows[0].segment_code
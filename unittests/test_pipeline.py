@@ -0,0 +1,66 @@
+import threading
+import time
+
+import pytest
+
+from ahlbatross.utils.pipeline import Pipeline, PipelineStage
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_pipeline_passes_items_through_all_stages(concurrency: int) -> None:
+    """
+    test that every item passes all stages and that items are dropped by stages returning None.
+    """
+    pipeline = Pipeline(
+        [
+            PipelineStage("double", lambda item: item * 2, concurrency),
+            PipelineStage("drop", lambda item: None if item % 4 == 0 else item, concurrency),
+            PipelineStage("format", str, concurrency),
+        ]
+    )
+
+    assert sorted(pipeline.run(range(10)), key=int) == ["2", "6", "10", "14", "18"]
+    assert all(wait_time >= 0 for wait_time in pipeline.wait_times)
+
+
+def test_pipeline_bounds_items_in_progress() -> None:
+    """
+    test that a slow stage holds back the previous stages, so that only a bounded number of items is in progress.
+    """
+    in_progress = 0
+    max_in_progress = 0
+    lock = threading.Lock()
+
+    def load(item: int) -> int:
+        nonlocal in_progress, max_in_progress
+        with lock:
+            in_progress += 1
+            max_in_progress = max(max_in_progress, in_progress)
+        return item
+
+    def export(item: int) -> int:
+        nonlocal in_progress
+        time.sleep(0.001)
+        with lock:
+            in_progress -= 1
+        return item
+
+    pipeline = Pipeline([PipelineStage("load", load, 2), PipelineStage("export", export, 1)])
+
+    assert sorted(pipeline.run(range(50))) == list(range(50))
+    # 2 loading + 1 queued + 1 exporting
+    assert max_in_progress <= 4
+
+
+def test_pipeline_raises_unexpected_errors() -> None:
+    """
+    test that an error raised by a stage aborts the run.
+    """
+
+    def align(item: int) -> int:
+        if item == 3:
+            raise RuntimeError("❌ alignment failed")
+        return item
+
+    with pytest.raises(RuntimeError):
+        Pipeline([PipelineStage("load", lambda item: item, 2), PipelineStage("align", align, 2)]).run(range(100))
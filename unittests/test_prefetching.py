@@ -0,0 +1,47 @@
+import threading
+
+import pytest
+
+from ahlbatross.utils.prefetching import Prefetcher
+
+
+@pytest.mark.parametrize("depth", [0, 1, 3])
+def test_prefetcher_yields_loaded_values_in_order(depth: int) -> None:
+    """
+    test that all items are yielded in order with their loaded values and that loading errors are raised on access.
+    """
+
+    def load(item: int) -> int:
+        if item == 3:
+            raise ValueError("❌ invalid item")
+        return item * 2
+
+    prefetcher = Prefetcher(load, depth)
+    loaded_values = []
+    for item, get_value in prefetcher.iter_loaded(range(5)):
+        if item == 3:
+            with pytest.raises(ValueError):
+                get_value()
+            continue
+        loaded_values.append(get_value())
+
+    assert loaded_values == [0, 2, 4, 8]
+    assert prefetcher.stall_time >= 0
+
+
+def test_prefetcher_loads_at_most_depth_items_ahead() -> None:
+    """
+    test that at most `depth` upcoming items are loaded while the current item is processed.
+    """
+    loaded_items: list[int] = []
+    lock = threading.Lock()
+
+    def load(item: int) -> int:
+        with lock:
+            loaded_items.append(item)
+        return item
+
+    for item, get_value in Prefetcher(load, depth=2).iter_loaded(range(10)):
+        assert get_value() == item
+        with lock:
+            assert max(loaded_items) <= item + 2
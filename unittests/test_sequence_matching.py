@@ -0,0 +1,40 @@
+from ahlbatross.utils.sequence_matching import get_myers_matches, get_patience_matches
+
+
+def test_myers_matches_follow_longest_common_subsequence() -> None:
+    """
+    test that all equal elements along a shortest edit script are matched in ascending order.
+    """
+    matches = get_myers_matches(list("ABCABBA"), list("CBABAC"))
+
+    assert matches is not None
+    assert len(matches) == 4
+    assert all("ABCABBA"[i] == "CBABAC"[j] for i, j in matches)
+    assert matches == sorted(matches)
+
+
+def test_myers_matches_identical_and_empty_sequences() -> None:
+    """
+    test the trivial cases without any edits.
+    """
+    assert get_myers_matches([1, 2, 3], [1, 2, 3]) == [(0, 0), (1, 1), (2, 2)]
+    assert get_myers_matches([], []) == []
+    assert get_myers_matches([1, 2], []) == []
+
+
+def test_myers_matches_exceeding_max_edit_distance() -> None:
+    """
+    test that None is returned if the sequences differ by more edits than allowed.
+    """
+    assert get_myers_matches([1, 2, 3], [4, 5, 6], max_edit_distance=5) is None
+    assert get_myers_matches([1, 2, 3], [4, 5, 6], max_edit_distance=6) == []
+
+
+def test_patience_matches_only_unique_elements_in_order() -> None:
+    """
+    test that only elements occurring once in both sequences become anchors and crossing anchors are dropped.
+    """
+    previous = ["a", "x", "b", "x", "c", "d"]
+    subsequent = ["c", "a", "b", "x", "d"]
+
+    assert get_patience_matches(previous, subsequent) == [(0, 1), (2, 2), (5, 4)]
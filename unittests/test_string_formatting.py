@@ -0,0 +1,40 @@
+import pytest
+
+from ahlbatross.utils import string_formatting
+from ahlbatross.utils.string_formatting import get_intra_cell_diff
+
+
+def test_intra_cell_diff_marks_changed_words() -> None:
+    """
+    test that only inserted/removed words are marked as changed while whitespaces are never marked.
+    """
+    result = get_intra_cell_diff("[1] Wenn A vorhanden", "[1] Wenn B  vorhanden [2]")
+
+    assert result == (
+        (("[1] Wenn ", False), ("A", True), (" vorhanden", False)),
+        (("[1] Wenn ", False), ("B", True), ("  vorhanden ", False), ("[2]", True)),
+    )
+
+
+def test_intra_cell_diff_is_memoized() -> None:
+    """
+    test that repeated text changes are served from the cache.
+    """
+    get_intra_cell_diff.cache_clear()
+
+    first_result = get_intra_cell_diff("Bedingung alt", "Bedingung neu")
+    second_result = get_intra_cell_diff("Bedingung alt", "Bedingung neu")
+
+    assert first_result is second_result
+    assert get_intra_cell_diff.cache_info().hits == 1
+
+
+def test_intra_cell_diff_exceeding_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    test that texts exceeding the per-cell budget are not diffed word by word.
+    """
+    get_intra_cell_diff.cache_clear()
+    monkeypatch.setattr(string_formatting, "_MAX_INTRA_CELL_DIFF_EDITS", 2)
+
+    assert get_intra_cell_diff("a b c", "d e f") is None
+    assert get_intra_cell_diff("a " * 1001, "b") is None
@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import NamedTuple
 
 import openpyxl  # type: ignore
+from openpyxl.cell.rich_text import CellRichText, TextBlock  # type: ignore
 
 from ahlbatross.enums.diff_types import DiffType
 from ahlbatross.formats.xlsx import export_to_xlsx
@@ -169,3 +170,114 @@ def test_xlsx_export_large_dataset(temp_excel_file: Path, formatversions: Format
     workbook = openpyxl.load_workbook(temp_excel_file)
     sheet = workbook.active
     assert sheet.max_row == len(comparisons) + 1  # data rows + 1 (header)
+
+
+def test_xlsx_export_highlights_changed_columns(
+    temp_excel_file: Path, ahb_row_comparison_multiple_columns: list[AhbRowComparison]
+) -> None:
+    """
+    Test that only the columns set in the `changed_columns` bitmask are highlighted as modified.
+    """
+    export_to_xlsx(ahb_row_comparison_multiple_columns, str(temp_excel_file))
+    workbook = openpyxl.load_workbook(temp_excel_file)
+    sheet = workbook.active
+
+    def _fill_color(column: int) -> str:
+        return str(sheet.cell(row=2, column=column).fill.fgColor.rgb)
+
+    # previous formatversion: `name` (column 8) and `conditions` (column 10) changed, `ahb_expression` did not
+    assert _fill_color(8).endswith("F5DC98")
+    assert _fill_color(10).endswith("F5DC98")
+    assert not _fill_color(9).endswith("F5DC98")
+
+
+def test_ahb_row_diff_changed_entries_bitmask_roundtrip(formatversions: Formatversions) -> None:
+    """
+    Test that a list of changed entries is encoded as a column bitmask and derived back in column order.
+    """
+    changed_entries = [
+        f"conditions_{formatversions.previous_formatversion}",
+        f"conditions_{formatversions.subsequent_formatversion}",
+        f"name_{formatversions.previous_formatversion}",
+        f"name_{formatversions.subsequent_formatversion}",
+    ]
+    diff = AhbRowDiff(diff_type=DiffType.MODIFIED, changed_entries=changed_entries)
+
+    assert diff.changed_columns == (1 << 6) | (1 << 8)
+    assert diff.model_dump()["changed_entries"] == changed_entries
+    derived_diff = AhbRowDiff.from_changed_columns(
+        DiffType.MODIFIED,
+        diff.changed_columns,
+        (formatversions.previous_formatversion, formatversions.subsequent_formatversion),
+    )
+    assert derived_diff.changed_entries == changed_entries[2:] + changed_entries[:2]
+    assert AhbRowDiff(diff_type=DiffType.UNCHANGED).changed_columns == 0
+    assert "changed_columns" not in diff.model_dump()
+
+    # the bitmask follows changes of the entries and ignores entries of unknown columns
+    diff.changed_entries.append("unknown_FV2504")
+    diff.changed_entries.remove(f"name_{formatversions.subsequent_formatversion}")
+    diff.changed_entries.remove(f"name_{formatversions.previous_formatversion}")
+    assert diff.changed_columns == 1 << 8
+
+
+def test_xlsx_export_highlights_moved_rows(temp_excel_file: Path, basic_ahb_row: AhbRow) -> None:
+    """
+    Test that MOVED rows are labeled and highlighted on both formatversion sides.
+    """
+    comparisons = [
+        AhbRowComparison(
+            previous_formatversion=basic_ahb_row,
+            diff=AhbRowDiff(diff_type=DiffType.MOVED),
+            subsequent_formatversion=basic_ahb_row,
+        )
+    ]
+
+    export_to_xlsx(comparisons, str(temp_excel_file))
+    workbook = openpyxl.load_workbook(temp_excel_file)
+    sheet = workbook.active
+
+    assert sheet.cell(row=2, column=11).value == DiffType.MOVED.value
+    assert str(sheet.cell(row=2, column=3).fill.fgColor.rgb).endswith("DDEBF7")
+    assert str(sheet.cell(row=2, column=13).fill.fgColor.rgb).endswith("DDEBF7")
+
+
+def test_xlsx_export_highlights_changed_words(temp_excel_file: Path, formatversions: Formatversions) -> None:
+    """
+    Test that modified text cells are exported as rich strings that keep the complete cell text.
+    """
+    comp = AhbRowComparison(
+        previous_formatversion=AhbRow(
+            formatversion=formatversions.previous_formatversion,
+            section_name="Nachrichten-Kopfsegment",
+            value_pool_entry=None,
+            name=None,
+            conditions="[1] Wenn Bedingung alt erfüllt",
+        ),
+        diff=AhbRowDiff.from_changed_columns(
+            DiffType.MODIFIED,
+            1 << 8,
+            (formatversions.previous_formatversion, formatversions.subsequent_formatversion),
+        ),
+        subsequent_formatversion=AhbRow(
+            formatversion=formatversions.subsequent_formatversion,
+            section_name="Nachrichten-Kopfsegment",
+            value_pool_entry=None,
+            name=None,
+            conditions="[1] Wenn Bedingung neu erfüllt",
+        ),
+    )
+
+    export_to_xlsx([comp], str(temp_excel_file))
+    workbook = openpyxl.load_workbook(temp_excel_file, rich_text=True)
+    sheet = workbook.active
+
+    previous_conditions = sheet.cell(row=2, column=10).value
+    subsequent_conditions = sheet.cell(row=2, column=20).value
+
+    assert isinstance(previous_conditions, CellRichText)
+    assert str(previous_conditions) == comp.previous_formatversion.conditions
+    assert str(subsequent_conditions) == comp.subsequent_formatversion.conditions
+    assert [block.text for block in previous_conditions if isinstance(block, TextBlock) and block.font.strike] == [
+        "alt"
+    ]